@@ -8,11 +8,30 @@
 import pygame, sys
 from pygame.locals import *
 import random
+import importlib
 
 
 #Number of frames per second
 FPS = 10
 
+# step engines, name -> module (the 'dict' engine is the functions below)
+ENGINES = {
+    'numpy' : 'life_numpy',
+    'active' : 'life_active',
+}
+ENGINE = 'numpy'
+# 'surfarray', 'dirty' (life_render.py) or 'rect' (one draw.rect per cell)
+RENDERER = 'surfarray'
+# 'dirty' repaints everything when more than this fraction of the board changed
+DIRTY_FRACTION = 0.25
+# serve the generations of a detected cycle from a cache instead of computing them
+DETECT_CYCLES = True
+# None steps in the display loop, 'thread' or 'process' steps in a background
+# worker at SIM_RATE generations per second (None: as fast as possible)
+PRODUCER = None
+SIM_RATE = None
+renderer = None # cached life_render renderer
+
 screen_width = 800
 screen_height = 800
 CellSize = 10
@@ -56,7 +75,23 @@ def colourGrid(surface, item, life):
         pygame.draw.rect(surface, GREEN, (x, y, CellSize, CellSize))
     return None
 
+# returns the rectangles to update, None for the whole window
 def showLife(surface, life):
+    global renderer
+    if RENDERER == 'dirty':
+        if renderer is None:
+            import life_render
+            renderer = life_render.dirty_renderer(surface, cell_width, cell_height, CellSize,
+                                                  [WHITE, GREEN], DARKGRAY, DIRTY_FRACTION)
+        # engines that track flips (life_active) report them as life.changed
+        return renderer.draw(life, getattr(life, 'changed', None))
+    if RENDERER == 'surfarray':
+        if renderer is None:
+            import life_render
+            renderer = life_render.surfarray_renderer(surface, cell_width, cell_height, CellSize,
+                                                      [WHITE, GREEN], DARKGRAY)
+        renderer.draw(life)
+        return
     for cell in life:
         colourGrid(surface, cell, life)
 
@@ -104,21 +139,59 @@ def main():
     surface.fill(WHITE)
     fpsClock = pygame.time.Clock()
     
-    life = blankGrid()
-    initLife(life) # Assign random life
+    if ENGINE == 'dict':
+        life = blankGrid()
+        initLife(life) # Assign random life
+        nextGeneration = NextGeneration
+    else:
+        stepper = importlib.import_module(ENGINES[ENGINE])
+        life = stepper.blankGrid(cell_width, cell_height)
+        stepper.initLife(life) # Assign random life
+        nextGeneration = stepper.NextGeneration
+    cycle = None
+    if DETECT_CYCLES:
+        import life_cycle
+        cycle = life_cycle.cycle_detector()
+
+    def advance(life):
+        if cycle:
+            life = cycle.step(life, nextGeneration)
+            if cycle.period and cycle.generation == cycle.start:
+                print(f'cycle of period {cycle.period} from generation {cycle.onset}')
+            return life
+        return nextGeneration(life)
+
+    producer = None
+    if PRODUCER:
+        import life_producer
+        producer = life_producer.frame_producer(life, advance, cell_width, cell_height,
+                                                PRODUCER, SIM_RATE)
 
     #main game loop
     while True:
         for event in pygame.event.get():
             if event.type == QUIT:
+                if producer:
+                    producer.stop()
                 pygame.quit()
                 sys.exit()
-        # runs next iteration
-        life = NextGeneration(life)
+        if producer:
+            # newest frame from the worker, nothing to draw if none arrived
+            life = producer.latest()
+            if life is None:
+                fpsClock.tick(FPS)
+                continue
+        else:
+            # runs next iteration
+            life = advance(life)
         # show life status
-        showLife(surface, life)
-        drawGrid(surface)
-        pygame.display.update()
+        dirty = showLife(surface, life)
+        if RENDERER == 'rect': # life_render renderers draw a cached grid
+            drawGrid(surface)
+        if dirty is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(dirty)
         fpsClock.tick(FPS)
 
 if __name__ == '__main__':
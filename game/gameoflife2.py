@@ -5,29 +5,128 @@
 #     http://trevorappleton.blogspot.com/2013/07/python-game-of-life.html
 #  python gameoflife2.py
 
+import os
+# no pygame banner on stdout, it may carry raw frames (--headless --export -)
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
 import pygame, sys
 from pygame.locals import *
 import random
+import importlib
+import argparse
+import json
+import time
 
 
 #Number of frames per second
 FPS = 10
 
+# step engines, name -> module (the 'dict' engine is game_of_life itself)
+ENGINES = {
+    'numpy' : 'life_numpy',
+    'bitpack' : 'life_bitpack',
+    'active' : 'life_active',
+    'hashlife' : 'life_hashlife',
+    'parallel' : 'life_parallel',
+    'sparse' : 'life_sparse',
+    'memmap' : 'life_memmap',
+    'rule' : 'life_rule',
+    'incremental' : 'life_incremental',
+}
+ENGINE = 'numpy'
+# 'surfarray', 'dirty' (life_render.py), 'viewport' (life_viewport.py, zoom
+# with the mouse wheel, pan by dragging) or 'rect' (one draw.rect per cell)
+RENDERER = 'surfarray'
+# board size in cells (width, height), None fills the window at CellSize;
+# a board bigger than the window needs the 'viewport' renderer
+BOARD_SIZE = None
+# 'dirty' repaints everything when more than this fraction of the board changed
+DIRTY_FRACTION = 0.25
+# serve the generations of a detected cycle from a cache instead of computing them
+DETECT_CYCLES = True
+# None steps in the display loop, 'thread' or 'process' steps in a background
+# worker at SIM_RATE generations per second (None: as fast as possible)
+PRODUCER = None
+SIM_RATE = None
+# keep a rewindable history (life_history.py) of HISTORY_BUDGET bytes at most;
+# space pauses, ',' and '.' step back and forward while paused. off for the
+# 'sparse' and 'hashlife' planes and memmap boards bigger than the window
+HISTORY = True
+HISTORY_BUDGET = 64 << 20
+# count the objects on the board (life_census.py) every CENSUS_EVERY
+# generations, None never; a few hundred, a census of an 800x800 board
+# takes about 0.25 s
+CENSUS_EVERY = None
+# B/S rule string (life_rule.py), e.g. 'B36/S23' or 'B2/S345/C4', None for
+# B3/S23 on the engine above; WRAP joins the edges of the board into a torus
+RULE = None
+WRAP = False
+
 class game_of_life:
 
-    def __init__(self, surface, width, height, cell_size, cell_color, cell_blank, grid_color):
+    def __init__(self, surface, width, height, cell_size, cell_color, cell_blank, grid_color, **kwargs):
         self.surface = surface
         self.width = width
         self.height = height
         self.cell_size = cell_size
         self.cell_width = width // cell_size # number of cells wide
         self.cell_height = height // cell_size # Number of cells high
+        if kwargs.get('board_size'): # independent of the window, for the 'viewport' renderer
+            self.cell_width, self.cell_height = kwargs['board_size']
         self.cell_color = cell_color
         self.cell_blank_color = cell_blank
         self.grid_color = grid_color
+        self.engine = kwargs.get('engine', 'dict')
+        self.engine_options = kwargs.get('engine_options', {}) # e.g. {'workers': 4} for 'parallel'
+        self.palette = [cell_blank, cell_color] # colour of each cell state
+        rule = kwargs.get('rule', None)
+        wrap = kwargs.get('wrap', False)
+        if rule is not None or wrap:
+            # any rule, and the torus, run on the lookup table engine
+            import life_rule
+            rule = rule or 'B3/S23'
+            self.engine = 'rule'
+            self.engine_options = dict(self.engine_options, rule=rule, wrap=wrap)
+            self.palette = life_rule.palette(cell_blank, cell_color, len(life_rule.compileRule(rule)))
+        self.stepper = None # engine module, None for the dict engine
+        if self.engine != 'dict':
+            self.stepper = importlib.import_module(ENGINES[self.engine])
+        self.renderer = kwargs.get('renderer', 'rect')
+        self.painter = None
+        if self.renderer == 'surfarray':
+            import life_render
+            self.painter = life_render.surfarray_renderer(surface, self.cell_width, self.cell_height,
+                                    cell_size, self.palette, grid_color)
+        elif self.renderer == 'dirty':
+            import life_render
+            self.painter = life_render.dirty_renderer(surface, self.cell_width, self.cell_height,
+                                    cell_size, self.palette, grid_color,
+                                    kwargs.get('dirty_fraction', 0.25))
+        elif self.renderer == 'viewport':
+            import life_viewport
+            self.painter = life_viewport.viewport(surface, self.cell_width, self.cell_height,
+                                    cell_size, self.palette, grid_color)
+        self.dirty = None # rectangles painted by the last showLife, None for the whole window
         self.life = {}
+        self.changed = None # cells flipped by the last step, None if the engine does not track them
+        self.cycle = None # life_cycle detector, serves the generations of a cycle once found
+        if kwargs.get('detect_cycles', False):
+            import life_cycle
+            self.cycle = life_cycle.cycle_detector(kwargs.get('cycle_window', life_cycle.WINDOW))
+        self.history = None # life_history of the visible cells, to step back through the run
+        if kwargs.get('history', False):
+            import life_history
+            self.history = life_history.generation_history(self.cell_width, self.cell_height,
+                                    kwargs.get('keyframe_interval', life_history.KEYFRAME_INTERVAL),
+                                    kwargs.get('history_budget', life_history.BUDGET))
+        self.census_every = kwargs.get('census_every', None)
+        self.census = None # (names, unknown) Counters of life_census.census, see takeCensus
+        self.generation = 0
         self.blankGrid()
-        self.initLife() # Assign random life
+        if not self.rewindable():
+            self.history = None
+        if kwargs.get('init_life', True): # False leaves the board blank, for loadStripes
+            self.initLife() # Assign random life
+        self.recordLife(0)
 
     def drawGrid(self):
         for x in range(0, self.width, self.cell_size): # draw vertical lines
@@ -36,29 +135,199 @@ class game_of_life:
             pygame.draw.line(self.surface, self.grid_color, (0,y), (self.width, y))
 
     def blankGrid(self):
+        if self.stepper:
+            self.life = self.stepper.blankGrid(self.cell_width, self.cell_height, **self.engine_options)
+            return
         for y in range (self.cell_height):
             for x in range (self.cell_width):
                 self.life[x,y] = 0
 
     def initLife(self):
+        if self.stepper:
+            self.stepper.initLife(self.life)
+            return
         for cell in self.life:
             self.life[cell] = random.randint(0,1)
 
-    def colourGrid(self, cell):
+    def loadCells(self, cells):
+        # replace the board with a 2D array [y, x] of states, a new run starts
+        self.setCells(cells, 0)
+        self.generation = 0
+        self.recordLife(0)
+
+    def loadStripes(self, stripes):
+        # like loadCells, from (y0, 2D array [y, x]) stripes of the board,
+        # written straight into the engine's storage (numpy arrays, bitpack
+        # words, memmap files) so the whole board is never built
+        life = self.life
+        board = getattr(life, 'board', None)
+        if getattr(life, 'cells', None) is None and not hasattr(life, 'words') and \
+           (board is None or (life.board_height, life.board_width) != (self.cell_height, self.cell_width)):
+            import numpy as np
+            self.loadCells(np.concatenate([rows for y0, rows in stripes]))
+            return
+        import life_bitpack
+        for y0, rows in stripes:
+            y1 = y0 + rows.shape[0]
+            if hasattr(life, 'cells'):
+                life.cells[y0:y1] = rows
+            elif hasattr(life, 'words'):
+                life.words[y0:y1] = life_bitpack.pack(rows).words
+            else:
+                life.setRegion(0, y0, rows)
+        if board is not None:
+            life.flush()
+        if hasattr(life, 'everything'): # life_incremental counts the board again
+            life.everything = True
+        self.changed = None
+        if self.cycle:
+            self.cycle.reset()
+        self.generation = 0
+        self.recordLife(0)
+
+    def setCells(self, cells, generation=None):
+        self.changed = None
+        if self.cycle:
+            self.cycle.reset()
+        if self.stepper:
+            if not self.restoreCells(cells, generation):
+                self.life = self.stepper.fromCells(cells, **self.cellOptions())
+            return
+        rows = cells.tolist()
+        self.life = {}
+        for y in range (self.cell_height):
+            for x in range (self.cell_width):
+                self.life[x,y] = rows[y][x]
+
+    def restoreCells(self, cells, generation=None):
+        # writes cells into the engine's storage (shared memory for 'parallel',
+        # the files of 'memmap'), False if the board is not the same size
+        board = getattr(self.life, 'cells', None)
+        if board is not None:
+            if board.shape != cells.shape:
+                return False
+            board[...] = cells
+            if hasattr(self.life, 'everything'): # life_incremental counts the board again
+                self.life.everything = True
+            return True
+        if hasattr(self.life, 'words'):
+            if (self.life.cell_height, self.life.cell_width) != cells.shape:
+                return False
+            import life_bitpack
+            self.life.words[...] = life_bitpack.pack(cells).words
+            return True
+        if hasattr(self.life, 'board'):
+            if (self.life.board_height, self.life.board_width) != cells.shape:
+                return False
+            self.life.setRegion(0, 0, cells)
+            self.life.flush()
+            if generation is not None: # a rewind, the sidecar tells a resumed run where it is
+                self.life.generation = generation
+                self.life.publish(self.life.current, generation, True)
+            return True
+        return False
+
+    def rewindable(self):
+        # the history keeps the visible cells, they restore the whole board
+        # unless it is a window on a bigger board ('memmap') or an unbounded
+        # plane ('sparse', 'hashlife')
+        if not hasattr(self.life, 'windowCells'):
+            return True
+        board = (getattr(self.life, 'board_width', None), getattr(self.life, 'board_height', None))
+        return board == (self.cell_width, self.cell_height)
+
+    def cellOptions(self):
+        # the engine options fromCells takes, blankGrid may take more
+        # (board_width for 'memmap')
+        import inspect
+        accepted = inspect.signature(self.stepper.fromCells).parameters
+        return {k: v for k, v in self.engine_options.items() if k in accepted}
+
+    def recordLife(self, generation=None):
+        if self.history is not None:
+            import life_render
+            self.history.record(life_render.boardCells(self.life, self.cell_width, self.cell_height),
+                                generation)
+
+    def stepBack(self):
+        # back one generation in the history, False at the oldest one kept
+        cells = self.history.stepBack() if self.history is not None else None
+        if cells is None:
+            return False
+        self.setCells(cells.copy(), self.history.cursor)
+        self.generation = self.history.cursor
+        return True
+
+    def stepForward(self):
+        # forward one generation, replayed from the history or computed
+        cells = self.history.stepForward() if self.history is not None else None
+        if cells is None:
+            self.NextGeneration()
+        else:
+            self.setCells(cells.copy(), self.history.cursor)
+            self.generation = self.history.cursor
+
+    def seekGeneration(self, generation):
+        cells = self.history.seek(generation) if self.history is not None else None
+        if cells is None:
+            return False
+        self.setCells(cells.copy(), generation)
+        self.generation = generation
+        return True
+
+    def takeCensus(self):
+        # names and unknown canonical forms of the objects on the board
+        import numpy as np
+        import life_census
+        import life_render
+        cells = life_render.boardCells(self.life, self.cell_width, self.cell_height)
+        self.census = life_census.census((cells == 1).view(np.uint8))
+        return self.census
+
+    def load_pattern(self, path, position=None):
+        # RLE, Life 1.06 or plaintext .cells, centred on the board unless
+        # position (top left cell) is given
+        import life_pattern
+        life_pattern.loadPattern(self.life, path, self.cell_width, self.cell_height, position)
+        self.changed = None
+        if self.cycle:
+            self.cycle.reset()
+        self.generation = 0
+        self.recordLife(0)
+
+    def save_pattern(self, path, fmt=None):
+        # format from the extension (.rle, .lif/.life, .cells) unless fmt is given
+        import life_pattern
+        life_pattern.savePattern(self.life, path, self.cell_width, self.cell_height, fmt)
+
+    def colourGrid(self, cell, life=None):
+        if life is None:
+            life = self.life
         x = cell[0]
         y = cell[1]
         y = y * self.cell_size # translates array into grid size
         x = x * self.cell_size # translates array into grid size
         rect = pygame.Rect(x, y, self.cell_size, self.cell_size)
-        if self.life[cell] == 0:
+        if life[cell] == 0:
             pygame.draw.rect(self.surface, self.cell_blank_color, rect)
-        if self.life[cell] == 1:
+        if life[cell] == 1:
             pygame.draw.rect(self.surface, self.cell_color, rect)
+        if life[cell] > 1: # dying state of a Generations rule
+            pygame.draw.rect(self.surface, self.palette[life[cell]], rect)
 
 
-    def showLife(self):
-        for cell in self.life:
-            self.colourGrid(cell)
+    def showLife(self, life=None):
+        # draws the board, or a frame from life_producer
+        if life is None:
+            life = self.life
+        if self.renderer == 'dirty':
+            self.dirty = self.painter.draw(life, self.changed if life is self.life else None)
+            return
+        if self.painter:
+            self.painter.draw(life)
+            return
+        for cell in life:
+            self.colourGrid(cell, life)
         self.drawGrid()
 
     def getNeighbours(self, cell):
@@ -75,12 +344,36 @@ class game_of_life:
                                 neighbours += 1
         return neighbours
 
+    def NextGeneration(self):
+        if self.history is not None:
+            self.history.truncate() # after a rewind the run goes on from here
+        self.nextLife()
+        self.generation += 1
+        self.recordLife()
+        if self.census_every and self.generation % self.census_every == 0:
+            self.takeCensus()
+
+    def nextLife(self):
+        if self.cycle:
+            cached = self.cycle.cached(self.life)
+            if cached is not None:
+                self.life = cached
+                self.changed = getattr(self.life, 'changed', None)
+                return
+        self.stepLife()
+        if self.cycle:
+            self.cycle.observe(self.life)
+
     # rules
     # 1. Any live cell with fewer than two live neighbours dies, as if by underpopulation.
     # 2. Any live cell with two or three live neighbours lives on to the next generation.
     # 3. Any live cell with more than three live neighbours dies, as if by overpopulation.
     # 4. Any dead cell with exactly three live neighbours becomes a live cell, as if by reproduction.
-    def NextGeneration(self):
+    def stepLife(self):
+        if self.stepper:
+            self.life = self.stepper.NextGeneration(self.life)
+            self.changed = getattr(self.life, 'changed', None)
+            return
         newlife = {}
         for cell in self.life:
             numberNeighbours = self.getNeighbours(cell)
@@ -101,8 +394,9 @@ class game_of_life:
 screen_width = 800
 screen_height = 800
 CellSize = 10
-assert screen_width % CellSize == 0, "Window width must be a multiple of cell size"
-assert screen_height % CellSize == 0, "Window height must be a multiple of cell size"
+# the viewport draws any part of any board, other renderers fill the window
+assert RENDERER == 'viewport' or screen_width % CellSize == 0, "Window width must be a multiple of cell size"
+assert RENDERER == 'viewport' or screen_height % CellSize == 0, "Window height must be a multiple of cell size"
 
 # set up the colours
 BLACK = (0, 0, 0)
@@ -111,6 +405,16 @@ DARKGRAY = (40, 40, 40)
 GREEN = (0, 255, 0)
 
 
+def report(game, reported):
+    # prints the cycle once found and the census, True once the cycle was printed
+    if game.cycle and game.cycle.period and not reported:
+        print(f'cycle of period {game.cycle.period} from generation {game.cycle.onset}')
+        reported = True
+    if game.census and game.generation % CENSUS_EVERY == 0:
+        names, unknown = game.census
+        print(f'generation {game.generation}:', ', '.join(f'{n} {name}' for name, n in names.most_common()))
+    return reported
+
 def main():
     pygame.init()
     pygame.display.set_caption('game of life') 
@@ -119,22 +423,226 @@ def main():
     fpsClock = pygame.time.Clock()
     
     # init game of life object
-    game = game_of_life(surface, screen_width, screen_height, CellSize, GREEN, WHITE, DARKGRAY)
+    game = game_of_life(surface, screen_width, screen_height, CellSize, GREEN, WHITE, DARKGRAY,
+                        engine=ENGINE, renderer=RENDERER, dirty_fraction=DIRTY_FRACTION,
+                        detect_cycles=DETECT_CYCLES, history=HISTORY and not PRODUCER,
+                        history_budget=HISTORY_BUDGET, census_every=CENSUS_EVERY,
+                        rule=RULE, wrap=WRAP, board_size=BOARD_SIZE)
+    reported = False
+    paused = False
+
+    producer = None
+    if PRODUCER:
+        import life_producer
+        # the worker steps a game of its own and prints its reports, the
+        # display only gets the frames
+        worker = game_of_life(None, screen_width, screen_height, CellSize, GREEN, WHITE, DARKGRAY,
+                              engine=ENGINE, detect_cycles=DETECT_CYCLES, census_every=CENSUS_EVERY,
+                              rule=RULE, wrap=WRAP, board_size=BOARD_SIZE)
+        worker_reported = False
+        def advance(life):
+            nonlocal worker_reported
+            worker.NextGeneration()
+            worker_reported = report(worker, worker_reported)
+            return worker.life
+        producer = life_producer.frame_producer(worker.life, advance, game.cell_width, game.cell_height,
+                                                PRODUCER, SIM_RATE)
 
     #main game loop
     while True:
         for event in pygame.event.get():
             if event.type == QUIT:
+                if producer:
+                    producer.stop()
                 pygame.quit()
                 sys.exit()
+            elif game.renderer == 'viewport' and game.painter.handleEvent(event):
+                if paused:
+                    game.showLife()
+                    pygame.display.update()
+            elif event.type == KEYDOWN and event.key == K_SPACE and not producer:
+                paused = not paused
+            elif event.type == KEYDOWN and paused and event.key in (K_COMMA, K_PERIOD):
+                # scrub through the history
+                if event.key == K_COMMA:
+                    game.stepBack()
+                else:
+                    game.stepForward()
+                game.showLife()
+                pygame.display.update()
+            elif event.type == KEYDOWN and hasattr(game.life, 'moveViewport') and not producer:
+                # pan the viewport of an unbounded board
+                step = 8
+                if event.key == K_LEFT:
+                    game.life.moveViewport(-step, 0)
+                elif event.key == K_RIGHT:
+                    game.life.moveViewport(step, 0)
+                elif event.key == K_UP:
+                    game.life.moveViewport(0, -step)
+                elif event.key == K_DOWN:
+                    game.life.moveViewport(0, step)
 
-        # runs next iteration
-        game.NextGeneration()
+        if producer:
+            # newest frame from the worker, nothing to draw if none arrived
+            frame = producer.latest()
+            if frame is None:
+                fpsClock.tick(FPS)
+                continue
+        elif paused:
+            fpsClock.tick(FPS)
+            continue
+        else:
+            # runs next iteration
+            game.NextGeneration()
+            frame = None
+        reported = report(game, reported)
         # show life status
-        game.showLife()
+        game.showLife(frame)
 
-        pygame.display.update()
+        if game.dirty is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(game.dirty)
         fpsClock.tick(FPS)
 
+SEED_CELLS = 1 << 20 # cells drawn per stripe when the headless benchmark seeds a board
+
+# headless benchmark, e.g.
+#  python gameoflife2.py --headless --size 1024 --engine bitpack --generations 200
+def headless(argv):
+    parser = argparse.ArgumentParser(prog='gameoflife2.py --headless',
+                                     description='game of life benchmark without a window, prints a JSON report')
+    parser.add_argument('--size', default='256', help='board size in cells, N or WxH (default 256)')
+    parser.add_argument('--density', type=float, default=0.5, help='initial live fraction (default 0.5)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default 0)')
+    parser.add_argument('--generations', type=int, default=100, help='generations to run (default 100)')
+    parser.add_argument('--engine', default=ENGINE, choices=['dict'] + sorted(ENGINES))
+    parser.add_argument('--workers', type=int, default=None, help="worker processes for the 'parallel' engine")
+    parser.add_argument('--rule', default=None, help="B/S rule string, runs on the 'rule' engine (default B3/S23)")
+    parser.add_argument('--wrap', action='store_true', help="toroidal board, runs on the 'rule' engine")
+    parser.add_argument('--render', default='none', choices=['none', 'rect', 'surfarray', 'dirty', 'viewport'],
+                        help='render every generation through the SDL dummy video driver')
+    parser.add_argument('--window', default=None,
+                        help="window size in pixels, WxH, for the 'viewport' renderer (default: the board)")
+    parser.add_argument('--cell-size', type=int, default=2, help='pixels per cell when rendering (default 2)')
+    parser.add_argument('--export', default=None,
+                        help="write every rendered generation: a directory of PNGs, or a file / '-' (stdout) for raw RGB")
+    parser.add_argument('--export-format', default='png', choices=['png', 'raw'])
+    args = parser.parse_args(argv)
+    if args.workers is not None and (args.engine != 'parallel' or args.rule or args.wrap):
+        # --rule and --wrap run on the 'rule' engine
+        parser.error("--workers needs --engine parallel, without --rule or --wrap")
+    if args.export and args.render == 'none':
+        args.render = 'surfarray' # frames need a renderer
+
+    if 'x' in args.size:
+        cell_width, cell_height = (int(n) for n in args.size.split('x'))
+    else:
+        cell_width = cell_height = int(args.size)
+    engine_options = {}
+    if args.workers is not None:
+        engine_options['workers'] = args.workers
+
+    window = (cell_width * args.cell_size, cell_height * args.cell_size)
+    if args.window and args.render == 'viewport':
+        window = tuple(int(n) for n in args.window.split('x'))
+    surface = None
+    renderer = 'rect'
+    if args.render != 'none':
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        pygame.display.init()
+        surface = pygame.display.set_mode(window)
+        renderer = args.render
+
+    random.seed(args.seed)
+    game = game_of_life(surface, window[0], window[1], args.cell_size,
+                        GREEN, WHITE, DARKGRAY, engine=args.engine, engine_options=engine_options,
+                        renderer=renderer, rule=args.rule, wrap=args.wrap,
+                        board_size=(cell_width, cell_height), init_life=False)
+    import numpy as np
+    rng = np.random.default_rng(args.seed)
+    # about SEED_CELLS cells at a time, so seeding does not dominate the peak RSS
+    rows = max(1, SEED_CELLS // cell_width)
+    game.loadStripes((y0, (rng.random((min(rows, cell_height - y0), cell_width)) < args.density).view(np.uint8))
+                     for y0 in range(0, cell_height, rows))
+
+    writer = None
+    if args.export:
+        # util/frame_export.py
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'util'))
+        import frame_export
+        writer = frame_export.frame_writer(args.export, args.export_format)
+
+    step = render = display = export = 0.0
+    start = time.perf_counter()
+    for generation in range(args.generations):
+        t0 = time.perf_counter()
+        game.NextGeneration()
+        t1 = time.perf_counter()
+        step += t1 - t0
+        if surface is not None:
+            game.showLife()
+            t2 = time.perf_counter()
+            if game.dirty is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(game.dirty)
+            t3 = time.perf_counter()
+            render += t2 - t1
+            display += t3 - t2
+            if writer:
+                writer.write(surface)
+                export += time.perf_counter() - t3
+    if writer:
+        t0 = time.perf_counter()
+        writer.close()
+        export += time.perf_counter() - t0
+    total = time.perf_counter() - start
+
+    import life_render
+    population = 0
+    if hasattr(game.life, 'words') or hasattr(game.life, 'board'):
+        # stripe by stripe, unpacking or paging in the whole board would be the peak
+        import life_bitpack
+        for y0 in range(0, cell_height, rows):
+            y1 = min(y0 + rows, cell_height)
+            if hasattr(game.life, 'words'):
+                cells = life_bitpack.unpack(life_bitpack.life_bits(game.life.words[y0:y1], cell_width))
+            else:
+                cells = game.life.region(0, y0, cell_width, y1 - y0)
+            population += int(cells.sum(dtype=np.int64))
+    else:
+        population = int(life_render.boardCells(game.life, cell_width, cell_height).sum(dtype=np.int64))
+    if hasattr(game.life, 'close'):
+        game.life.close()
+    import resource
+    # ru_maxrss is in kilobytes on linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    report = {
+        'engine': game.engine,
+        'rule': args.rule or 'B3/S23',
+        'wrap': args.wrap,
+        'render': args.render,
+        'width': cell_width,
+        'height': cell_height,
+        'density': args.density,
+        'seed': args.seed,
+        'generations': args.generations,
+        'seconds': total,
+        'gens_per_sec': args.generations / total if total else None,
+        'cells_per_sec': args.generations * cell_width * cell_height / total if total else None,
+        'peak_rss_kb': peak,
+        'peak_rss_children_kb': peak_children,
+        'phases': {'step': step, 'render': render, 'display': display, 'export': export},
+        'final_population': population,
+    }
+    # raw frames on stdout keep it for themselves
+    out = sys.stderr if args.export == '-' else sys.stdout
+    print(json.dumps(report, indent=2), file=out)
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    if '--headless' in sys.argv[1:]:
+        headless([arg for arg in sys.argv[1:] if arg != '--headless'])
+    else:
+        main()
\ No newline at end of file
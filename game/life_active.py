@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# active-region step engine for the game of life
+#   a cell can only flip if it or one of its neighbours flipped in the last
+#   step, so only the cells around the last changes are re-evaluated and the
+#   cost of a step follows the activity instead of the board area.
+#   life_active is a plain {(x,y): state} dict which also reports the cells
+#   that flipped in the last step as life.changed.
+
+import random
+
+
+class life_active(dict):
+
+    def __init__(self, cell_width, cell_height):
+        super().__init__()
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.changed = set() # cells flipped by the last step (or set by hand since)
+        self.everything = True # re-evaluate every cell on the next step
+
+    def __setitem__(self, cell, state):
+        # cells edited from outside must be re-evaluated on the next step
+        if self.get(cell) != state:
+            self.changed.add(cell)
+        super().__setitem__(cell, state)
+
+    def copy(self):
+        life = life_active(self.cell_width, self.cell_height)
+        dict.update(life, self)
+        life.changed = set(self.changed)
+        life.everything = self.everything
+        return life
+
+def blankGrid(cell_width, cell_height):
+    life = life_active(cell_width, cell_height)
+    for y in range (cell_height):
+        for x in range (cell_width):
+            dict.__setitem__(life, (x, y), 0)
+    return life
+
+def initLife(life):
+    for cell in life:
+        dict.__setitem__(life, cell, random.randint(0,1))
+    life.everything = True
+    return life
+
+def fromDict(life, cell_width, cell_height):
+    board = life_active(cell_width, cell_height)
+    dict.update(board, life)
+    return board
+
+def fromCells(cells):
+    # 2D array [y, x] of states
+    cell_height, cell_width = cells.shape
+    board = life_active(cell_width, cell_height)
+    rows = cells.tolist()
+    for y in range (cell_height):
+        for x in range (cell_width):
+            dict.__setitem__(board, (x, y), rows[y][x])
+    return board
+
+def activeCells(life):
+    # the changed cells and their neighbours, clipped to the board
+    active = set()
+    for (cx, cy) in life.changed:
+        for x in range (cx-1, cx+2):
+            if x < 0 or x >= life.cell_width: #boundary condition
+                continue
+            for y in range (cy-1, cy+2):
+                if y < 0 or y >= life.cell_height: #boundary condition
+                    continue
+                active.add((x, y))
+    return active
+
+def getNeighbours(cell, life):
+    # cells outside the board are not in the dict, so they count as dead
+    x, y = cell
+    get = life.get
+    return (get((x-1, y-1), 0) + get((x, y-1), 0) + get((x+1, y-1), 0) +
+            get((x-1, y), 0) + get((x+1, y), 0) +
+            get((x-1, y+1), 0) + get((x, y+1), 0) + get((x+1, y+1), 0))
+
+# rules
+# 1. Any live cell with fewer than two live neighbours dies, as if by underpopulation.
+# 2. Any live cell with two or three live neighbours lives on to the next generation.
+# 3. Any live cell with more than three live neighbours dies, as if by overpopulation.
+# 4. Any dead cell with exactly three live neighbours becomes a live cell, as if by reproduction.
+def NextGeneration(life):
+    if life.everything:
+        candidates = list(life)
+    else:
+        candidates = activeCells(life)
+    # decide every flip from the old states before writing any of them
+    flips = []
+    for cell in candidates:
+        numberNeighbours = getNeighbours(cell, life)
+        if life[cell] == 1:
+            if numberNeighbours < 2 or numberNeighbours > 3: # case (1) and (3)
+                flips.append((cell, 0))
+        elif numberNeighbours == 3: # cell reproduces, case (4)
+            flips.append((cell, 1))
+    for cell, state in flips:
+        dict.__setitem__(life, cell, state)
+    life.changed = set(cell for cell, state in flips)
+    life.everything = False
+    return life
@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# bit-packed (SWAR) step engine for the game of life
+#   every row is packed into uint64 words, bit i of word w is cell x = 64*w + i.
+#   the 8 neighbour bit-planes are added with full-adder logic, so one word
+#   operation updates 64 cells at once. the board costs 1 bit per cell and
+#   rows are stepped in bands to bound the temporaries.
+
+from collections.abc import MutableMapping
+import random
+
+import numpy as np
+
+
+WORD_BITS = 64
+BAND_ROWS = 1024 # rows stepped per band
+
+ONE = np.uint64(1)
+HIGH = np.uint64(WORD_BITS - 1)
+
+
+def wordCount(cell_width):
+    return (cell_width + WORD_BITS - 1) // WORD_BITS
+
+def tailMask(cell_width):
+    # valid bits of the last word of a row
+    bits = cell_width % WORD_BITS
+    if bits == 0:
+        return ~np.uint64(0)
+    return np.uint64((1 << bits) - 1)
+
+class life_bits(MutableMapping):
+
+    def __init__(self, words, cell_width):
+        self.words = words # 2D uint64 array, words[y, x // 64]
+        self.cell_width = cell_width
+
+    @property
+    def cell_height(self):
+        return self.words.shape[0]
+
+    def __getitem__(self, cell):
+        x, y = cell
+        if x < 0 or y < 0 or x >= self.cell_width or y >= self.cell_height:
+            raise KeyError(cell)
+        return int(self.words[y, x // WORD_BITS] >> np.uint64(x % WORD_BITS)) & 1
+
+    def __setitem__(self, cell, state):
+        x, y = cell
+        if x < 0 or y < 0 or x >= self.cell_width or y >= self.cell_height:
+            raise KeyError(cell)
+        bit = ONE << np.uint64(x % WORD_BITS)
+        if state:
+            self.words[y, x // WORD_BITS] |= bit
+        else:
+            self.words[y, x // WORD_BITS] &= ~bit
+
+    def __delitem__(self, cell):
+        raise TypeError("cells of a fixed size board can not be deleted")
+
+    def __iter__(self):
+        # same order as blankGrid(): row by row
+        for y in range(self.cell_height):
+            for x in range(self.cell_width):
+                yield (x, y)
+
+    def __len__(self):
+        return self.cell_width * self.cell_height
+
+    def __contains__(self, cell):
+        try:
+            x, y = cell
+        except (TypeError, ValueError):
+            return False
+        return 0 <= x < self.cell_width and 0 <= y < self.cell_height
+
+    def copy(self):
+        return life_bits(self.words.copy(), self.cell_width)
+
+def blankGrid(cell_width, cell_height):
+    words = np.zeros((cell_height, wordCount(cell_width)), dtype=np.uint64)
+    return life_bits(words, cell_width)
+
+def initLife(life):
+    # seed numpy from the random module so random.seed() still reproduces a board
+    rng = np.random.default_rng(random.getrandbits(64))
+    raw = rng.bytes(life.words.size * 8)
+    life.words[...] = np.frombuffer(raw, dtype=np.uint64).reshape(life.words.shape)
+    life.words[:, -1] &= tailMask(life.cell_width)
+    return life
+
+def pack(cells):
+    # 2D uint8 array [y, x] -> life_bits
+    height, width = cells.shape
+    padded = np.zeros((height, wordCount(width) * WORD_BITS), dtype=np.uint8)
+    padded[:, :width] = cells != 0
+    packed = np.packbits(padded, axis=1, bitorder='little')
+    words = packed.view(np.dtype('<u8')).astype(np.uint64)
+    return life_bits(words, width)
+
+def unpack(life):
+    # life_bits -> 2D uint8 array [y, x]
+    raw = life.words.astype(np.dtype('<u8')).view(np.uint8)
+    cells = np.unpackbits(raw, axis=1, bitorder='little')
+    return cells[:, :life.cell_width]
+
+def fromDict(life, cell_width, cell_height):
+    cells = np.zeros((cell_height, cell_width), dtype=np.uint8)
+    for (x, y), state in life.items():
+        cells[y, x] = state
+    return pack(cells)
+
+def fromCells(cells):
+    # 2D array [y, x] of states
+    return pack(np.asarray(cells))
+
+def toDict(life):
+    cells = unpack(life)
+    height, width = cells.shape
+    states = cells.ravel().tolist()
+    return {(x, y): states[y * width + x] for y in range(height) for x in range(width)}
+
+def west(rows):
+    # bit x holds cell x-1 (a zero enters at the left border)
+    out = rows << ONE
+    out[:, 1:] |= rows[:, :-1] >> HIGH
+    return out
+
+def east(rows):
+    # bit x holds cell x+1 (a zero enters at the right border)
+    out = rows >> ONE
+    out[:, :-1] |= rows[:, 1:] << HIGH
+    return out
+
+def fullAdd(a, b, c):
+    s = a ^ b
+    return s ^ c, (a & b) | (s & c) # sum, carry
+
+def stepRows(up, mid, down):
+    # add the 8 neighbour bit-planes, 3 from the row above, 2 from the row itself
+    # and 3 from the row below, keeping the count as bit-sliced s0, s1, s2
+    u0, u1 = fullAdd(west(up), up, east(up))
+    d0, d1 = fullAdd(west(down), down, east(down))
+    left = west(mid)
+    right = east(mid)
+    m0 = left ^ right
+    m1 = left & right
+    s0, c0 = fullAdd(u0, d0, m0) # weight 1, carry into weight 2
+    t1, c1 = fullAdd(u1, d1, m1) # weight 2, carry into weight 4
+    s1 = t1 ^ c0
+    c2 = t1 & c0
+    # count 2 or 3: s1 set and nothing at weight 4 (a count of 8 clears s1 too)
+    # case (4) needs s0, case (2) keeps a live cell with s0 clear
+    return s1 & ~(c1 | c2) & (s0 | mid)
+
+# rules
+# 1. Any live cell with fewer than two live neighbours dies, as if by underpopulation.
+# 2. Any live cell with two or three live neighbours lives on to the next generation.
+# 3. Any live cell with more than three live neighbours dies, as if by overpopulation.
+# 4. Any dead cell with exactly three live neighbours becomes a live cell, as if by reproduction.
+def nextWords(words, cell_width):
+    height = words.shape[0]
+    newwords = np.empty_like(words)
+    zero = np.zeros((1, words.shape[1]), dtype=np.uint64)
+    for y0 in range(0, height, BAND_ROWS):
+        y1 = min(y0 + BAND_ROWS, height)
+        # one halo row on each side, dead outside the board
+        top = words[y0 - 1:y0] if y0 > 0 else zero
+        bottom = words[y1:y1 + 1] if y1 < height else zero
+        band = np.concatenate((top, words[y0:y1], bottom))
+        newwords[y0:y1] = stepRows(band[:-2], band[1:-1], band[2:])
+    newwords[:, -1] &= tailMask(cell_width)
+    return newwords
+
+def NextGeneration(life):
+    return life_bits(nextWords(life.words, life.cell_width), life.cell_width)
@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# object census for the game of life
+#   live cells are labelled into 8-connected components with a vectorized
+#   label propagation (every cell takes the largest label around it, then
+#   jumps to the label of the cell its label points at, until nothing
+#   changes). each component is cut out at its bounding box and looked up in
+#   a hashed catalog holding all 8 rotations/reflections of the components
+#   of every phase of the known objects; unknown components are counted by
+#   their canonical form (the smallest key over the 8 symmetries).
+#   a phase can fall apart into several components (the beacon's second
+#   phase is two L-shaped triominoes): each part is catalogued with the
+#   number of parts, and k such parts count as one object.
+#   a census of an 800x800 soup (6,500 components) takes about 0.25 s, the
+#   labelling 0.15 s of it: it is meant to run every few hundred generations
+#   (census_every), not every frame.
+
+from collections import Counter
+
+import numpy as np
+
+import life_numpy
+
+
+# known objects, plaintext rows ('O' live), one phase each
+OBJECTS = {
+    'block' : ['OO', 'OO'],
+    'beehive' : ['.OO.', 'O..O', '.OO.'],
+    'loaf' : ['.OO.', 'O..O', '.O.O', '..O.'],
+    'boat' : ['OO.', 'O.O', '.O.'],
+    'ship' : ['OO.', 'O.O', '.OO'],
+    'tub' : ['.O.', 'O.O', '.O.'],
+    'pond' : ['.OO.', 'O..O', 'O..O', '.OO.'],
+    'barge' : ['.O..', 'O.O.', '.O.O', '..O.'],
+    'blinker' : ['OOO'],
+    'toad' : ['.OOO', 'OOO.'],
+    'beacon' : ['OO..', 'OO..', '..OO', '..OO'],
+    'glider' : ['.O.', '..O', 'OOO'],
+}
+MAX_PHASES = 4 # phases stepped per object for the catalog
+
+def key(pattern):
+    # hashable form of a 2D 0/1 array
+    return (pattern.shape, np.packbits(pattern, axis=None).tobytes())
+
+def symmetries(pattern):
+    # the 8 rotations/reflections, as flips of the pattern and its transpose
+    for p in (pattern, pattern.T):
+        yield p
+        yield p[::-1]
+        yield p[:, ::-1]
+        yield p[::-1, ::-1]
+
+def canonical(pattern):
+    return min(key(np.ascontiguousarray(p)) for p in symmetries(pattern))
+
+def crop(cells):
+    ys, xs = np.nonzero(cells)
+    if len(ys) == 0:
+        return cells[:0, :0]
+    return cells[ys.min():ys.max() + 1, xs.min():xs.max() + 1]
+
+def fromRows(rows):
+    return np.array([[c == 'O' for c in row] for row in rows], dtype=np.uint8)
+
+def buildCatalog(objects=OBJECTS, max_phases=MAX_PHASES):
+    # key of every orientation of every component of every phase -> (name,
+    # number of components of that phase); a whole object wins over a part
+    catalog = {}
+    for name, rows in objects.items():
+        pattern = fromRows(rows)
+        # room around the pattern so the border never touches it
+        cells = np.pad(pattern, 2 * max_phases)
+        for phase in range(max_phases):
+            parts = [pattern for _, _, _, pattern in components(cells)]
+            for part in parts:
+                for p in symmetries(part):
+                    k = key(np.ascontiguousarray(p))
+                    if k not in catalog or catalog[k][1] > len(parts):
+                        catalog[k] = (name, len(parts))
+            cells = life_numpy.nextCells(cells)
+    return catalog
+
+def label(cells):
+    # 2D int32 array of component labels (0 for dead cells), 8-connectivity
+    live = np.asarray(cells) != 0
+    height, width = live.shape
+    labels = np.where(live, np.arange(1, live.size + 1, dtype=np.int32).reshape(live.shape), 0)
+    while True:
+        padded = np.pad(labels, 1)
+        best = labels.copy()
+        for dy in range(3):
+            for dx in range(3):
+                np.maximum(best, padded[dy:dy + height, dx:dx + width], out=best)
+        best *= live
+        # pointer jumping: a label is the flat index + 1 of a cell of the same component
+        flat = best.reshape(-1)
+        jumped = np.where(live, flat[np.maximum(flat - 1, 0)].reshape(live.shape), 0)
+        np.maximum(best, jumped, out=best)
+        if np.array_equal(best, labels):
+            return labels
+        labels = best
+
+def components(cells):
+    # (label, x0, y0, pattern) for every component, pattern cut at its bounding box
+    labels = label(cells)
+    ys, xs = np.nonzero(labels)
+    if len(ys) == 0:
+        return
+    ids = labels[ys, xs]
+    order = np.argsort(ids, kind='stable')
+    ids, ys, xs = ids[order], ys[order], xs[order]
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(ids)]
+    # bounding boxes of all components at once
+    x0s, x1s = np.minimum.reduceat(xs, starts), np.maximum.reduceat(xs, starts)
+    y0s, y1s = np.minimum.reduceat(ys, starts), np.maximum.reduceat(ys, starts)
+    widths = x1s - x0s + 1
+    heights = y1s - y0s + 1
+    # every pattern cut into one buffer, one after the other
+    offsets = np.r_[0, np.cumsum(widths * heights)]
+    sizes = ends - starts
+    buffer = np.zeros(offsets[-1], dtype=np.uint8)
+    buffer[np.repeat(offsets[:-1], sizes) + (ys - np.repeat(y0s, sizes)) * np.repeat(widths, sizes)
+           + xs - np.repeat(x0s, sizes)] = 1
+    for start, x0, y0, w, h, offset in zip(starts.tolist(), x0s.tolist(), y0s.tolist(),
+                                           widths.tolist(), heights.tolist(), offsets.tolist()):
+        yield int(ids[start]), x0, y0, buffer[offset:offset + w * h].reshape(h, w)
+
+CATALOG = buildCatalog()
+
+def objects(cells, catalog=CATALOG):
+    # (name, x0, y0, pattern) for every component, name is None when unknown;
+    # the parts of a phase that falls apart carry the object's name
+    for _, x0, y0, pattern in components(cells):
+        yield catalog.get(key(pattern), (None, 1))[0], x0, y0, pattern
+
+def census(cells, catalog=CATALOG):
+    # Counter of object names; unknown objects count under 'other' and, by
+    # canonical form, in the second Counter. parts of objects short of a
+    # whole one count as unknown
+    names = Counter()
+    unknown = Counter()
+    forms = {} # key -> canonical form, soups repeat their debris
+    pieces = {} # (name, parts) -> patterns of the parts seen
+    for _, _, _, pattern in components(cells):
+        k = key(pattern)
+        name, parts = catalog.get(k, (None, 1))
+        if name is None:
+            if k not in forms:
+                forms[k] = canonical(pattern)
+            names['other'] += 1
+            unknown[forms[k]] += 1
+        elif parts == 1:
+            names[name] += 1
+        else:
+            pieces.setdefault((name, parts), []).append(pattern)
+    for (name, parts), patterns in pieces.items():
+        whole, rest = divmod(len(patterns), parts)
+        if whole:
+            names[name] += whole
+        for pattern in patterns[len(patterns) - rest:]:
+            names['other'] += 1
+            unknown[canonical(pattern)] += 1
+    return names, unknown
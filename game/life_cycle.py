@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# cycle detection for the game of life
+#   a digest of every generation is kept for a window of recent generations.
+#   when a digest comes back after p generations the board has entered a
+#   period-p cycle (p = 1 for still lifes): the p states of the cycle are
+#   captured while stepping once more around it, and every later generation
+#   is restored from them instead of being computed.
+
+from collections import deque
+import hashlib
+
+import numpy as np
+
+
+WINDOW = 1024 # generations kept for the search, the longest period found
+
+def stripes(life):
+    # (y0, y1) row ranges of a life_memmap board, STRIPE_ROWS at a time
+    import life_memmap
+    height = life.board.shape[0]
+    for y0 in range(0, height, life_memmap.STRIPE_ROWS):
+        yield y0, min(y0 + life_memmap.STRIPE_ROWS, height)
+
+def snapshot(life):
+    # copy of the board's state, in its own storage
+    if hasattr(life, 'cells'):
+        return life.cells.copy()
+    if hasattr(life, 'words'):
+        return life.words.copy()
+    if hasattr(life, 'universe'):
+        u = life.universe
+        return (u.root, u.x0, u.y0) # nodes are immutable
+    if hasattr(life, 'live'):
+        return frozenset(life.live)
+    if hasattr(life, 'board'): # life_memmap, read stripe by stripe
+        state = np.empty(life.board.shape, dtype=life.board.dtype)
+        for y0, y1 in stripes(life):
+            state[y0:y1] = life.board[y0:y1]
+        return state
+    return dict(life)
+
+def restore(life, state):
+    # write a snapshot back into the board
+    if hasattr(life, 'cells'):
+        if hasattr(life, 'changed'): # life_incremental, the flips since the last generation
+            ys, xs = np.nonzero(life.cells != state)
+            life.changed = list(zip(xs.tolist(), ys.tolist()))
+            life.everything = True
+        life.cells[...] = state
+    elif hasattr(life, 'words'):
+        life.words[...] = state
+    elif hasattr(life, 'universe'):
+        life.universe.root, life.universe.x0, life.universe.y0 = state
+        life.window = None
+    elif hasattr(life, 'live'):
+        life.live = set(state)
+    elif hasattr(life, 'board'):
+        for y0, y1 in stripes(life):
+            life.board[y0:y1] = state[y0:y1]
+        life.flush()
+        # the files hold the next generation now, a resumed run starts from it
+        life.generation += 1
+        life.publish(life.current, life.generation, True)
+    else:
+        changed = set(cell for cell, s in state.items() if life[cell] != s)
+        dict.update(life, state)
+        if hasattr(life, 'changed'): # life_active, the flips since the last generation
+            life.changed = changed
+            life.everything = False
+    return life
+
+def digest(life):
+    h = hashlib.blake2b(digest_size=16)
+    if hasattr(life, 'cells'):
+        h.update(np.ascontiguousarray(life.cells).tobytes())
+    elif hasattr(life, 'words'):
+        h.update(np.ascontiguousarray(life.words).tobytes())
+    elif hasattr(life, 'universe') or hasattr(life, 'live'):
+        if hasattr(life, 'universe'):
+            live = life.universe.liveCells()
+        else:
+            live = life.live
+        h.update(np.array(sorted(live), dtype=np.int64).tobytes())
+    elif hasattr(life, 'board'):
+        # the whole board, not only the viewport
+        for y0, y1 in stripes(life):
+            h.update(np.ascontiguousarray(life.board[y0:y1]).tobytes())
+    else:
+        h.update(bytes(life.values()))
+    return h.digest()
+
+class cycle_detector:
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.generation = 0 # generation of the board last seen
+        self.seen = {}  # digest -> generation
+        self.order = deque() # digests in generation order
+        self.onset = None  # first generation of the cycle
+        self.period = None
+        self.start = None  # generation of states[0]
+        self.states = []
+        self.capturing = False
+
+    def reset(self):
+        # the board was changed from outside
+        self.__init__(self.window)
+
+    def record(self, life):
+        key = digest(life)
+        first = self.seen.get(key)
+        if first is not None:
+            self.onset = first
+            self.period = self.generation - first
+            self.start = self.generation
+            self.states = [snapshot(life)]
+            self.capturing = self.period > 1
+            self.seen = {}
+            self.order.clear()
+            return
+        self.seen[key] = self.generation
+        self.order.append(key)
+        if len(self.order) > self.window:
+            del self.seen[self.order.popleft()]
+
+    def cached(self, life):
+        # the next generation restored from the cycle, None when it must be computed
+        if self.generation == 0 and not self.seen and self.period is None:
+            self.record(life)
+        if self.period is None or self.capturing:
+            return None
+        self.generation += 1
+        return restore(life, self.states[(self.generation - self.start) % self.period])
+
+    def observe(self, life):
+        # a computed generation
+        self.generation += 1
+        if self.capturing:
+            self.states.append(snapshot(life))
+            self.capturing = len(self.states) < self.period
+        elif self.period is None:
+            self.record(life)
+
+    def step(self, life, nextGeneration):
+        # the next generation of life, computed or restored from the cycle
+        cached = self.cached(life)
+        if cached is not None:
+            return cached
+        life = nextGeneration(life)
+        self.observe(life)
+        return life
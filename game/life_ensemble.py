@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# ensemble of random soups for the game of life
+#   N independent boards are stacked into one (N, height, width) uint8 array
+#   and stepped together with one vectorized update. every board has its own
+#   seed, so a soup can be reproduced on its own. only the last few
+#   generations are kept (bit-packed) to detect when a board has settled into
+#   a still life or an oscillator of period <= max_period; the statistics are
+#   collected on the way:
+#     population  (N, generations + 1) population curve
+#     settled     generation at which each board entered its cycle, -1 if never
+#     period      period of that cycle, 0 if never settled
+#     census      objects on each board at the end of the run, as counted
+#                 by life_census.census
+
+import numpy as np
+
+
+MAX_PERIOD = 2 # ash is still lifes and blinkers
+
+def randomBoards(seeds, cell_width, cell_height, density=0.5):
+    boards = np.empty((len(seeds), cell_height, cell_width), dtype=np.uint8)
+    for i, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        boards[i] = rng.random((cell_height, cell_width)) < density
+    return boards
+
+def countNeighbours(boards):
+    # dead border around every board, boards never see each other
+    count, height, width = boards.shape
+    padded = np.pad(boards, ((0, 0), (1, 1), (1, 1)))
+    neighbours = np.zeros(boards.shape, dtype=np.uint8)
+    for dy in range(3):
+        for dx in range(3):
+            if dx == 1 and dy == 1: # self
+                continue
+            neighbours += padded[:, dy:dy + height, dx:dx + width]
+    return neighbours
+
+# B3/S23, as in life_numpy.nextCells
+def nextBoards(boards):
+    neighbours = countNeighbours(boards)
+    alive = (neighbours == 3) | ((boards == 1) & (neighbours == 2))
+    return alive.astype(np.uint8)
+
+class ensemble:
+
+    def __init__(self, count, cell_width, cell_height, density=0.5, seeds=None, max_period=MAX_PERIOD):
+        if seeds is None:
+            seeds = range(count)
+        self.seeds = list(seeds)
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.density = density
+        self.max_period = max_period
+        self.boards = randomBoards(self.seeds, cell_width, cell_height, density)
+        self.generation = 0
+        count = len(self.seeds)
+        self.settled = np.full(count, -1, dtype=np.int64)
+        self.period = np.zeros(count, dtype=np.int64)
+        self.population = None
+
+    def populations(self):
+        return self.boards.sum(axis=(1, 2), dtype=np.int64)
+
+    def run(self, generations, stop_when_settled=True):
+        # steps every board, returns the population curves
+        count = len(self.seeds)
+        population = np.zeros((count, generations + 1), dtype=np.int64)
+        population[:, 0] = self.populations()
+        # ring of the last max_period generations, bit-packed per board
+        history = [None] * self.max_period
+        history[0] = np.packbits(self.boards, axis=-1)
+        done = generations
+        for g in range(1, generations + 1):
+            self.boards = nextBoards(self.boards)
+            self.generation += 1
+            population[:, g] = self.populations()
+            packed = np.packbits(self.boards, axis=-1)
+            unsettled = self.settled < 0
+            for p in range(1, self.max_period + 1):
+                old = history[(g - p) % self.max_period]
+                if old is None:
+                    break
+                same = unsettled & (packed == old).all(axis=(1, 2))
+                # the first repeat found is the shortest period
+                self.settled[same] = self.generation - p
+                self.period[same] = p
+                unsettled &= ~same
+            history[g % self.max_period] = packed
+            if stop_when_settled and (self.settled >= 0).all():
+                done = g
+                break
+        if done < generations:
+            # every board repeats from here on, extend the curves by their periods
+            for g in range(done + 1, generations + 1):
+                population[:, g] = population[np.arange(count), g - self.period]
+        self.population = population
+        return population
+
+    def census(self):
+        # (names, unknown) Counters of life_census.census for every board
+        import life_census
+        return [life_census.census(board) for board in self.boards]
+
+    def board(self, i):
+        # one board as a {(x,y): state} board for the viewer
+        import life_numpy
+        return life_numpy.life_array(self.boards[i].copy())
+
+    def stats(self):
+        return {
+            'seeds': self.seeds,
+            'generation': self.generation,
+            'population': self.population,
+            'settled': self.settled,
+            'period': self.period,
+            'census': self.census(),
+        }
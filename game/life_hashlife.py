@@ -0,0 +1,389 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# HashLife engine for the game of life
+# ref https://en.wikipedia.org/wiki/Hashlife
+#     Gosper, "Exploiting regularities in large cellular spaces" (1984)
+#
+#   the plane is a quadtree of canonical (hash-consed) nodes, a node of level k
+#   covers 2^k x 2^k cells and equal subtrees are shared. the centre of every
+#   node advanced by 2^j generations is memoized, so a pattern can jump 2^k
+#   generations in one call. the universe is unbounded, the {(x,y): state}
+#   mapping is a cell_width x cell_height window on it for the viewer.
+
+from collections.abc import MutableMapping
+import random
+
+import numpy as np
+
+
+MAX_NODES = 1 << 22 # node cache ceiling, collected between steps
+
+class node:
+    __slots__ = ('k', 'nw', 'ne', 'sw', 'se', 'population')
+
+    def __init__(self, k, nw, ne, sw, se, population):
+        self.k = k # level, covers 2^k x 2^k cells
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+OFF = node(0, None, None, None, None, 0)
+ON = node(0, None, None, None, None, 1)
+
+class hashlife:
+
+    def __init__(self, max_nodes=MAX_NODES):
+        self.max_nodes = max_nodes
+        self.nodes = {} # (nw, ne, sw, se) -> canonical node
+        self.memo = {}  # (node, j) -> centre advanced by 2^j generations
+        self.empties = [OFF]
+        self.root = self.empty(3)
+        self.x0 = 0 # coordinates of the root's top left cell
+        self.y0 = 0
+        self.generation = 0
+
+    # -- node construction --
+
+    def join(self, nw, ne, sw, se):
+        key = (nw, ne, sw, se)
+        n = self.nodes.get(key)
+        if n is None:
+            n = node(nw.k + 1, nw, ne, sw, se,
+                     nw.population + ne.population + sw.population + se.population)
+            self.nodes[key] = n
+        return n
+
+    def empty(self, k):
+        while len(self.empties) <= k:
+            e = self.empties[-1]
+            self.empties.append(self.join(e, e, e, e))
+        return self.empties[k]
+
+    def centre(self, m):
+        # m in the centre of a node one level up, padded with empty space
+        e = self.empty(m.k - 1)
+        return self.join(self.join(e, e, e, m.nw), self.join(e, e, m.ne, e),
+                         self.join(e, m.sw, e, e), self.join(m.se, e, e, e))
+
+    def inner(self, m):
+        # the centre half of m, one level down
+        return self.join(m.nw.se, m.ne.sw, m.sw.ne, m.se.nw)
+
+    # -- evolution --
+
+    def life4x4(self, m):
+        # level 2 node -> its centre 2x2 after one generation
+        cells = [[0] * 4 for _ in range(4)]
+        for qy, (left, right) in enumerate(((m.nw, m.ne), (m.sw, m.se))):
+            for qx, quad in enumerate((left, right)):
+                for cy, (a, b) in enumerate(((quad.nw, quad.ne), (quad.sw, quad.se))):
+                    cells[qy*2 + cy][qx*2] = a.population
+                    cells[qy*2 + cy][qx*2 + 1] = b.population
+        out = []
+        for y in (1, 2):
+            for x in (1, 2):
+                neighbours = 0
+                for dy in (-1, 0, 1):
+                    for dx in (-1, 0, 1):
+                        if dx or dy:
+                            neighbours += cells[y+dy][x+dx]
+                if neighbours == 3 or (neighbours == 2 and cells[y][x]):
+                    out.append(ON)
+                else:
+                    out.append(OFF)
+        return self.join(*out)
+
+    def successor(self, m, j):
+        # centre of m (level k) advanced by 2^j generations, j <= k-2
+        if m.population == 0:
+            return self.empty(m.k - 1)
+        key = (m, j)
+        res = self.memo.get(key)
+        if res is not None:
+            return res
+        if m.k == 2:
+            res = self.life4x4(m)
+        else:
+            # nine overlapping level k-1 nodes
+            c1 = self.join(m.nw.nw, m.nw.ne, m.nw.sw, m.nw.se)
+            c2 = self.join(m.nw.ne, m.ne.nw, m.nw.se, m.ne.sw)
+            c3 = self.join(m.ne.nw, m.ne.ne, m.ne.sw, m.ne.se)
+            c4 = self.join(m.nw.sw, m.nw.se, m.sw.nw, m.sw.ne)
+            c5 = self.join(m.nw.se, m.ne.sw, m.sw.ne, m.se.nw)
+            c6 = self.join(m.ne.sw, m.ne.se, m.se.nw, m.se.ne)
+            c7 = self.join(m.sw.nw, m.sw.ne, m.sw.sw, m.sw.se)
+            c8 = self.join(m.sw.ne, m.se.nw, m.sw.se, m.se.sw)
+            c9 = self.join(m.se.nw, m.se.ne, m.se.sw, m.se.se)
+            if j < m.k - 2:
+                # advance the nine parts by 2^j and take their centres
+                s1, s2, s3, s4, s5, s6, s7, s8, s9 = (self.successor(c, j)
+                    for c in (c1, c2, c3, c4, c5, c6, c7, c8, c9))
+                res = self.join(self.join(s1.se, s2.sw, s4.ne, s5.nw),
+                                self.join(s2.se, s3.sw, s5.ne, s6.nw),
+                                self.join(s4.se, s5.sw, s7.ne, s8.nw),
+                                self.join(s5.se, s6.sw, s8.ne, s9.nw))
+            else:
+                # two half steps of 2^(k-3) generations
+                s1, s2, s3, s4, s5, s6, s7, s8, s9 = (self.successor(c, j - 1)
+                    for c in (c1, c2, c3, c4, c5, c6, c7, c8, c9))
+                res = self.join(self.successor(self.join(s1, s2, s4, s5), j - 1),
+                                self.successor(self.join(s2, s3, s5, s6), j - 1),
+                                self.successor(self.join(s4, s5, s7, s8), j - 1),
+                                self.successor(self.join(s5, s6, s8, s9), j - 1))
+        self.memo[key] = res
+        return res
+
+    def advance(self, j):
+        # jump 2^j generations
+        root = self.root
+        half = 1 << (root.k - 1)
+        # room for the pattern to grow by 2^j cells on every side
+        while root.k < j + 2:
+            root = self.centre(root)
+            self.x0 -= half
+            self.y0 -= half
+            half = 1 << (root.k - 1)
+        for _ in range(2):
+            root = self.centre(root)
+            self.x0 -= half
+            self.y0 -= half
+            half = 1 << (root.k - 1)
+        self.root = self.successor(root, j)
+        # the result is the centre of the padded root
+        self.x0 += 1 << (root.k - 2)
+        self.y0 += 1 << (root.k - 2)
+        self.generation += 1 << j
+        self.crop()
+        if len(self.nodes) > self.max_nodes:
+            self.collect()
+
+    def step(self, generations):
+        # any number of generations as a sum of powers of two
+        j = 0
+        while generations:
+            if generations & 1:
+                self.advance(j)
+            generations >>= 1
+            j += 1
+
+    def crop(self):
+        # drop empty border rings so the root stays small
+        root = self.root
+        while root.k > 3:
+            centre = self.inner(root)
+            if centre.population != root.population:
+                break
+            self.x0 += 1 << (root.k - 2)
+            self.y0 += 1 << (root.k - 2)
+            root = centre
+        self.root = root
+
+    def collect(self):
+        # keep the nodes reachable from the root (and the empty nodes),
+        # drop every memoized result that refers to a dropped node
+        live = set()
+        stack = [self.root] + self.empties
+        while stack:
+            n = stack.pop()
+            if n.k == 0 or n in live:
+                continue
+            live.add(n)
+            stack.extend((n.nw, n.ne, n.sw, n.se))
+        self.nodes = {key: n for key, n in self.nodes.items() if n in live}
+        self.memo = {key: res for key, res in self.memo.items()
+                     if key[0] in live and (res.k == 0 or res in live)}
+
+    # -- cells --
+
+    def build(self, cells):
+        # quadtree from an iterable of live (x, y), paired up level by level
+        cells = list(cells)
+        if not cells:
+            self.root = self.empty(3)
+            self.x0 = self.y0 = 0
+            return
+        self.x0 = min(x for x, y in cells)
+        self.y0 = min(y for x, y in cells)
+        level = {(x - self.x0, y - self.y0): ON for x, y in cells}
+        k = 0
+        while k < 3 or len(level) > 1 or (0, 0) not in level:
+            e = self.empty(k)
+            parents = {}
+            for (x, y) in level:
+                parents[x >> 1, y >> 1] = None
+            for (px, py) in parents:
+                x = px << 1
+                y = py << 1
+                parents[px, py] = self.join(level.get((x, y), e), level.get((x+1, y), e),
+                                            level.get((x, y+1), e), level.get((x+1, y+1), e))
+            level = parents
+            k += 1
+        self.root = level[0, 0]
+
+    def liveCells(self, x0=None, y0=None, x1=None, y1=None):
+        # live (x, y), optionally clipped to the window [x0, x1) x [y0, y1)
+        stack = [(self.root, self.x0, self.y0)]
+        while stack:
+            n, x, y = stack.pop()
+            if n.population == 0:
+                continue
+            size = 1 << n.k
+            if x0 is not None and (x + size <= x0 or y + size <= y0 or x >= x1 or y >= y1):
+                continue
+            if n.k == 0:
+                yield (x, y)
+                continue
+            half = size >> 1
+            stack.append((n.nw, x, y))
+            stack.append((n.ne, x + half, y))
+            stack.append((n.sw, x, y + half))
+            stack.append((n.se, x + half, y + half))
+
+    def getCell(self, x, y):
+        n = self.root
+        x -= self.x0
+        y -= self.y0
+        size = 1 << n.k
+        if x < 0 or y < 0 or x >= size or y >= size:
+            return 0
+        while n.k > 0:
+            if n.population == 0:
+                return 0
+            size >>= 1
+            if y < size:
+                n = n.nw if x < size else n.ne
+            else:
+                n = n.sw if x < size else n.se
+            x %= size
+            y %= size
+        return n.population
+
+    def setCell(self, x, y, state):
+        # grow the root until it holds (x, y), then rebuild the path to the leaf
+        while not (self.x0 <= x < self.x0 + (1 << self.root.k) and
+                   self.y0 <= y < self.y0 + (1 << self.root.k)):
+            half = 1 << (self.root.k - 1)
+            self.root = self.centre(self.root)
+            self.x0 -= half
+            self.y0 -= half
+        self.root = self.setPath(self.root, x - self.x0, y - self.y0, state)
+
+    def setPath(self, n, x, y, state):
+        if n.k == 0:
+            return ON if state else OFF
+        half = 1 << (n.k - 1)
+        nw, ne, sw, se = n.nw, n.ne, n.sw, n.se
+        if y < half:
+            if x < half:
+                nw = self.setPath(nw, x, y, state)
+            else:
+                ne = self.setPath(ne, x - half, y, state)
+        else:
+            if x < half:
+                sw = self.setPath(sw, x, y - half, state)
+            else:
+                se = self.setPath(se, x - half, y - half, state)
+        return self.join(nw, ne, sw, se)
+
+class life_hash(MutableMapping):
+    # {(x,y): state} window of cell_width x cell_height cells on a hashlife universe
+
+    def __init__(self, cell_width, cell_height, universe=None):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.universe = universe if universe is not None else hashlife()
+        self.window = None # live cells in the window, refreshed after a step
+
+    def liveWindow(self):
+        if self.window is None:
+            self.window = set(self.universe.liveCells(0, 0, self.cell_width, self.cell_height))
+        return self.window
+
+    def windowCells(self):
+        # 2D uint8 array [y, x] of the window
+        cells = np.zeros((self.cell_height, self.cell_width), dtype=np.uint8)
+        live = self.liveWindow()
+        if live:
+            xs, ys = zip(*live)
+            cells[list(ys), list(xs)] = 1
+        return cells
+
+    def __getitem__(self, cell):
+        x, y = cell
+        if x < 0 or y < 0 or x >= self.cell_width or y >= self.cell_height:
+            raise KeyError(cell)
+        return 1 if cell in self.liveWindow() else 0
+
+    def __setitem__(self, cell, state):
+        x, y = cell
+        if x < 0 or y < 0 or x >= self.cell_width or y >= self.cell_height:
+            raise KeyError(cell)
+        self.universe.setCell(x, y, state)
+        self.window = None
+
+    def __delitem__(self, cell):
+        raise TypeError("cells of the window can not be deleted")
+
+    def __iter__(self):
+        # same order as blankGrid(): row by row
+        for y in range(self.cell_height):
+            for x in range(self.cell_width):
+                yield (x, y)
+
+    def __len__(self):
+        return self.cell_width * self.cell_height
+
+    def __contains__(self, cell):
+        try:
+            x, y = cell
+        except (TypeError, ValueError):
+            return False
+        return 0 <= x < self.cell_width and 0 <= y < self.cell_height
+
+    def advance(self, j):
+        # jump 2^j generations
+        self.universe.advance(j)
+        self.window = None
+
+    def step(self, generations):
+        self.universe.step(generations)
+        self.window = None
+
+def blankGrid(cell_width, cell_height, max_nodes=MAX_NODES):
+    return life_hash(cell_width, cell_height, hashlife(max_nodes))
+
+def initLife(life):
+    # same random draws, in the same order, as the dict engine
+    cells = []
+    for y in range(life.cell_height):
+        for x in range(life.cell_width):
+            if random.randint(0,1):
+                cells.append((x, y))
+    life.universe.build(cells)
+    life.window = None
+    return life
+
+def fromDict(life, cell_width, cell_height, max_nodes=MAX_NODES):
+    board = blankGrid(cell_width, cell_height, max_nodes)
+    board.universe.build(cell for cell, state in life.items() if state == 1)
+    return board
+
+def fromCells(cells, max_nodes=MAX_NODES):
+    # 2D array [y, x] of states
+    cell_height, cell_width = cells.shape
+    board = blankGrid(cell_width, cell_height, max_nodes)
+    ys, xs = np.nonzero(cells)
+    board.universe.build(zip(xs.tolist(), ys.tolist()))
+    return board
+
+def toDict(life):
+    live = life.liveWindow()
+    return {(x, y): 1 if (x, y) in live else 0
+            for y in range(life.cell_height) for x in range(life.cell_width)}
+
+def NextGeneration(life):
+    life.advance(0)
+    return life
@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# generation history for the game of life, for rewinding a run
+#   every generation is recorded as the cells flipped since the one before, a
+#   delta that works both ways (state XOR delta), so stepping back or forward
+#   costs O(delta). every keyframe_interval generations a full bit-packed
+#   keyframe is kept too, random access starts from the nearest keyframe or
+#   from the cursor, whichever needs fewer deltas.
+#   a delta is a list of flat cell indices, or the packed XOR of the two
+#   boards when that is smaller; boards with more than two states (Generations
+#   rules) keep raw keyframes and (index, XOR) deltas. when the history
+#   outgrows its budget (bytes) the oldest keyframe is dropped with the
+#   deltas that depend on it.
+
+from bisect import bisect_right
+
+import numpy as np
+
+
+KEYFRAME_INTERVAL = 32 # generations between keyframes
+BUDGET = 64 << 20 # bytes kept for keyframes and deltas
+
+def pack(cells):
+    if cells.max(initial=0) > 1:
+        return cells.copy() # multi-state, kept 2D
+    return np.packbits(cells, axis=None)
+
+def unpack(packed, shape):
+    if packed.ndim == 2:
+        return packed.copy()
+    return np.unpackbits(packed, count=shape[0] * shape[1]).reshape(shape)
+
+def encodeDelta(old, new):
+    # the cells flipped from old to new
+    flips = old ^ new
+    changed = np.flatnonzero(flips)
+    if flips.max(initial=0) > 1:
+        # index << 8 | XOR of the states
+        return (changed.astype(np.int64) << 8) | flips.reshape(-1)[changed]
+    changed = changed.astype(np.uint32)
+    packed_size = (old.size + 7) // 8
+    if changed.nbytes <= packed_size:
+        return changed
+    return pack(flips)
+
+def applyDelta(cells, delta):
+    # flips the cells of a delta in place, forward or backward
+    if delta.dtype == np.uint32:
+        cells.reshape(-1)[delta] ^= 1
+    elif delta.dtype == np.int64:
+        cells.reshape(-1)[delta >> 8] ^= (delta & 0xff).astype(np.uint8)
+    else:
+        cells ^= unpack(delta, cells.shape)
+    return cells
+
+class entry:
+
+    __slots__ = ('generation', 'delta', 'key')
+
+    def __init__(self, generation, delta, key):
+        self.generation = generation
+        self.delta = delta # from generation - 1, None for the oldest one kept
+        self.key = key # packed cells, None between keyframes
+
+    def size(self):
+        size = 0
+        if self.delta is not None:
+            size += self.delta.nbytes
+        if self.key is not None:
+            size += self.key.nbytes
+        return size
+
+class generation_history:
+
+    def __init__(self, cell_width, cell_height, keyframe_interval=KEYFRAME_INTERVAL, budget=BUDGET):
+        self.shape = (cell_height, cell_width)
+        self.keyframe_interval = keyframe_interval
+        self.budget = budget
+        self.clear()
+
+    def clear(self):
+        self.entries = [] # one per generation, oldest first
+        self.keys = [] # generations of the keyframes, oldest first
+        self.size = 0 # bytes
+        self.newest = None # cells of the newest generation
+        self.cursor = None # generation of self.cells
+        self.cells = None
+
+    # -- recording --
+
+    def first(self):
+        return self.entries[0].generation if self.entries else None
+
+    def last(self):
+        return self.entries[-1].generation if self.entries else None
+
+    def record(self, cells, generation=None):
+        # appends the next generation, generation restarts the history when it
+        # does not follow the newest one
+        cells = np.array(cells, dtype=np.uint8)
+        if generation is None:
+            generation = 0 if not self.entries else self.last() + 1
+        if not self.entries or generation != self.last() + 1:
+            self.clear()
+            delta = None
+        else:
+            delta = encodeDelta(self.newest, cells)
+        key = None
+        if not self.keys or generation - self.keys[-1] >= self.keyframe_interval:
+            key = pack(cells)
+            self.keys.append(generation)
+        e = entry(generation, delta, key)
+        self.entries.append(e)
+        self.size += e.size()
+        self.newest = cells
+        self.cursor = generation
+        self.cells = cells.copy()
+        self.evict()
+
+    def evict(self):
+        # drops the oldest keyframe and its deltas, the newest keyframe stays
+        while self.size > self.budget and len(self.keys) > 1:
+            drop = self.keys[1] - self.keys[0]
+            for e in self.entries[:drop]:
+                self.size -= e.size()
+            del self.entries[:drop]
+            del self.keys[0]
+            self.size -= self.entries[0].delta.nbytes
+            self.entries[0].delta = None
+        if self.cursor is not None and self.cursor < self.first():
+            self.cursor = self.last()
+            self.cells = self.newest.copy()
+
+    def truncate(self, generation=None):
+        # forgets everything after generation (default: the cursor), to branch
+        # off a new run from there
+        if generation is None:
+            generation = self.cursor
+        if not self.entries or generation >= self.last():
+            return
+        self.seek(generation)
+        keep = generation - self.first() + 1
+        for e in self.entries[keep:]:
+            self.size -= e.size()
+        del self.entries[keep:]
+        del self.keys[bisect_right(self.keys, generation):]
+        self.newest = self.cells.copy()
+
+    # -- playback --
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, generation):
+        return bool(self.entries) and self.first() <= generation <= self.last()
+
+    def stepBack(self):
+        # cells of the generation before the cursor, None at the oldest one
+        if self.cursor is None or self.cursor <= self.first():
+            return None
+        applyDelta(self.cells, self.entries[self.cursor - self.first()].delta)
+        self.cursor -= 1
+        return self.cells
+
+    def stepForward(self):
+        # cells of the generation after the cursor, None at the newest one
+        if self.cursor is None or self.cursor >= self.last():
+            return None
+        self.cursor += 1
+        applyDelta(self.cells, self.entries[self.cursor - self.first()].delta)
+        return self.cells
+
+    def seek(self, generation):
+        # cells of any generation kept, None if it is not
+        if generation not in self:
+            return None
+        # from the cursor, or forward from the nearest keyframe
+        key = self.keys[bisect_right(self.keys, generation) - 1]
+        if abs(generation - self.cursor) > generation - key:
+            self.cells = unpack(self.entries[key - self.first()].key, self.shape)
+            self.cursor = key
+        while self.cursor < generation:
+            self.stepForward()
+        while self.cursor > generation:
+            self.stepBack()
+        return self.cells
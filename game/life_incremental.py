@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# incremental step engine for the game of life
+#   the live-neighbour count of every cell is kept from one generation to the
+#   next. only cells that flipped last generation, or have a neighbour that
+#   did, can change: those candidates are looked up in the rule table
+#   (life_rule) with their kept counts, and each flip adds +1/-1 to the 8
+#   counts around it. the work per generation follows the number of flips.
+#   cells set through life[x, y] update the counts at once. writers of .cells
+#   as a whole (loadCells, pattern loading, cycle restore) set .everything,
+#   as for life_active, and the next step counts the whole board again.
+
+import numpy as np
+
+import life_numpy
+import life_rule
+
+
+class life_incremental(life_numpy.life_array):
+
+    def __init__(self, cells, rule='B3/S23'):
+        super().__init__(cells)
+        self.rule = rule
+        self.table = life_rule.compileRule(rule)
+        height, width = cells.shape
+        self.stride = width + 2
+        # neighbour counts with a one cell border, so the 8 offsets never leave the array
+        self.counts = np.zeros((height + 2, width + 2), dtype=np.int8)
+        self.counts[1:-1, 1:-1] = life_rule.countNeighbours(cells)
+        inside = np.zeros(self.counts.shape, dtype=bool)
+        inside[1:-1, 1:-1] = True
+        self.inside = inside.reshape(-1)
+        s = self.stride
+        self.offsets = np.array([-s - 1, -s, -s + 1, -1, 1, s - 1, s, s + 1])
+        self.flips = None # padded indices flipped last generation, None for every cell
+        self.edits = [] # padded indices set through life[x, y] since the last step
+        self.everything = False # .cells written from outside, counted again at the next step
+        self.changed = None # (x, y) flipped last generation, for the dirty renderer
+
+    def copy(self):
+        return life_incremental(self.cells.copy(), self.rule)
+
+    def padded(self, ys, xs):
+        return (ys + 1) * self.stride + xs + 1
+
+    def flip(self, index, old, new):
+        # updates the counts around the padded indices whose live state changed
+        delta = (new == 1).astype(np.int8) - (old == 1).astype(np.int8)
+        moved = delta != 0
+        index, delta = index[moved], delta[moved]
+        counts = self.counts.reshape(-1)
+        for offset in self.offsets:
+            np.add.at(counts, index + offset, delta)
+
+    def __setitem__(self, cell, state):
+        old = self[cell] # KeyError outside the board
+        super().__setitem__(cell, state)
+        x, y = cell
+        index = (y + 1) * self.stride + x + 1
+        delta = int(state == 1) - int(old == 1)
+        if delta:
+            self.counts.reshape(-1)[index + self.offsets] += delta
+        self.edits.append(index)
+
+    def candidates(self):
+        if self.flips is None:
+            return np.flatnonzero(self.inside)
+        flips = self.flips
+        if self.edits:
+            flips = np.concatenate((flips, np.array(self.edits, dtype=flips.dtype)))
+        around = (flips[:, None] + np.r_[0, self.offsets][None, :]).reshape(-1)
+        around = np.unique(around)
+        return around[self.inside[around]]
+
+    def step(self):
+        if self.everything:
+            self.counts[1:-1, 1:-1] = life_rule.countNeighbours(self.cells)
+            self.flips = None
+            self.everything = False
+        index = self.candidates()
+        ys = index // self.stride - 1
+        xs = index % self.stride - 1
+        old = self.cells[ys, xs]
+        new = self.table[old, self.counts.reshape(-1)[index]]
+        flipped = new != old
+        index, ys, xs, old, new = index[flipped], ys[flipped], xs[flipped], old[flipped], new[flipped]
+        self.cells[ys, xs] = new
+        self.flip(index, old, new)
+        self.flips = index
+        self.edits = []
+        self.changed = list(zip(xs.tolist(), ys.tolist()))
+
+def blankGrid(cell_width, cell_height, rule='B3/S23'):
+    return life_incremental(np.zeros((cell_height, cell_width), dtype=np.uint8), rule)
+
+def initLife(life):
+    life_numpy.initLife(life)
+    life.everything = True
+    return life
+
+def fromDict(life, cell_width, cell_height, rule='B3/S23'):
+    return life_incremental(life_numpy.fromDict(life, cell_width, cell_height).cells, rule)
+
+def fromCells(cells, rule='B3/S23'):
+    # 2D array [y, x] of states
+    return life_incremental(np.array(cells, dtype=np.uint8), rule)
+
+def toDict(life):
+    return life_numpy.toDict(life)
+
+def NextGeneration(life):
+    life.step()
+    return life
+
+def verify(cells, generations):
+    # steps a board with this engine and with the reference dict engine,
+    # game_of_life.stepLife (B3/S23), returns the first generation where
+    # they differ, None when they always agree
+    from gameoflife2 import game_of_life
+    height, width = cells.shape
+    reference = game_of_life(None, width, height, 1, None, None, None, init_life=False)
+    reference.setCells(cells)
+    life = fromCells(cells)
+    for generation in range(1, generations + 1):
+        life = NextGeneration(life)
+        reference.stepLife()
+        if toDict(life) != reference.life:
+            return generation
+    return None
@@ -0,0 +1,256 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# out-of-core step engine for the game of life
+#   the board lives in a numpy.memmap backed .npy file, one uint8 per cell or
+#   bit-packed like life_bitpack. a step streams the board stripe by stripe
+#   (with a one-row halo) into a second file, so only a few rows are in memory
+#   at once, then the two files swap roles.
+#   each file has a small .json sidecar with its generation, written after the
+#   file is complete, so a run resumes from whichever file is newest.
+#   the {(x,y): state} mapping is a cell_width x cell_height viewport on the
+#   board and only the visible rows are paged in to draw it.
+
+from collections.abc import MutableMapping
+import json
+import os
+import random
+import tempfile
+
+import numpy as np
+
+import life_numpy
+import life_bitpack
+
+
+STRIPE_ROWS = 256 # rows stepped per stripe
+
+def sidecar(path):
+    return path + '.json'
+
+def readSidecar(path):
+    try:
+        with open(sidecar(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def writeSidecar(path, info):
+    tmp = sidecar(path) + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(info, f)
+    os.replace(tmp, sidecar(path))
+
+class life_memmap(MutableMapping):
+
+    def __init__(self, base, board_width, board_height, cell_width=None, cell_height=None,
+                 bits=False, create=True):
+        # base is the path prefix of the two board files, base.a.npy and base.b.npy
+        self.base = base
+        self.board_width = board_width
+        self.board_height = board_height
+        self.cell_width = board_width if cell_width is None else min(cell_width, board_width) # viewport size
+        self.cell_height = board_height if cell_height is None else min(cell_height, board_height)
+        self.x0 = 0 # board coordinates of the viewport's top left cell
+        self.y0 = 0
+        self.bits = bits
+        self.tmp = None # TemporaryDirectory of a board made without a path, removed with the board
+        self.paths = [base + '.a.npy', base + '.b.npy']
+        if bits:
+            shape = (board_height, life_bitpack.wordCount(board_width))
+            dtype = np.uint64
+        else:
+            shape = (board_height, board_width)
+            dtype = np.uint8
+        if create:
+            for path in self.paths:
+                np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape).flush()
+            self.current = 0
+            self.generation = 0
+            self.publish(self.current, self.generation, True)
+        else:
+            self.current, self.generation = self.newest()
+        self.board = np.load(self.paths[self.current], mmap_mode='r+')
+
+    def newest(self):
+        # (file index, generation) of the newest complete file
+        best = None
+        for i, path in enumerate(self.paths):
+            info = readSidecar(path)
+            if info and info.get('complete') and (best is None or info['generation'] > best[1]):
+                best = (i, info['generation'])
+        if best is None:
+            raise ValueError("no complete board file for " + self.base)
+        return best
+
+    def publish(self, index, generation, complete):
+        writeSidecar(self.paths[index], {
+            'generation': generation, 'complete': complete, 'bits': self.bits,
+            'width': self.board_width, 'height': self.board_height})
+
+    # -- stepping --
+
+    def nextRows(self, band):
+        if self.bits:
+            return life_bitpack.nextWords(band, self.board_width)
+        return life_numpy.nextCells(band)
+
+    def step(self):
+        src = self.board
+        target = 1 - self.current
+        # the target is incomplete until the whole generation is written
+        self.publish(target, self.generation + 1, False)
+        dst = np.load(self.paths[target], mmap_mode='r+')
+        height = self.board_height
+        for y0 in range(0, height, STRIPE_ROWS):
+            y1 = min(y0 + STRIPE_ROWS, height)
+            # one halo row above and below, none outside the board
+            top = max(y0 - 1, 0)
+            bottom = min(y1 + 1, height)
+            dst[y0:y1] = self.nextRows(np.array(src[top:bottom]))[y0 - top:y1 - top]
+        dst.flush()
+        del dst
+        self.current = target
+        self.generation += 1
+        self.publish(self.current, self.generation, True)
+        self.board = np.load(self.paths[self.current], mmap_mode='r+')
+
+    def flush(self):
+        self.board.flush()
+
+    # -- viewport --
+
+    def setViewport(self, x0, y0):
+        self.x0 = max(0, min(x0, self.board_width - self.cell_width))
+        self.y0 = max(0, min(y0, self.board_height - self.cell_height))
+
+    def moveViewport(self, dx, dy):
+        self.setViewport(self.x0 + dx, self.y0 + dy)
+
+    def region(self, x0, y0, width, height):
+        # 2D uint8 array [y, x] of a board region, paging in only its rows
+        rows = self.board[y0:y0 + height]
+        if not self.bits:
+            return np.array(rows[:, x0:x0 + width])
+        w0 = x0 // life_bitpack.WORD_BITS
+        w1 = life_bitpack.wordCount(x0 + width)
+        words = np.array(rows[:, w0:w1])
+        cells = life_bitpack.unpack(life_bitpack.life_bits(words, (w1 - w0) * life_bitpack.WORD_BITS))
+        start = x0 - w0 * life_bitpack.WORD_BITS
+        return cells[:, start:start + width]
+
+    def setRegion(self, x0, y0, cells):
+        # writes a 2D array [y, x] of states into the board at x0, y0
+        height, width = cells.shape
+        if not self.bits:
+            self.board[y0:y0 + height, x0:x0 + width] = cells
+            return
+        w0 = x0 // life_bitpack.WORD_BITS
+        w1 = life_bitpack.wordCount(x0 + width)
+        words = np.array(self.board[y0:y0 + height, w0:w1])
+        span = life_bitpack.unpack(life_bitpack.life_bits(words, (w1 - w0) * life_bitpack.WORD_BITS))
+        start = x0 - w0 * life_bitpack.WORD_BITS
+        span[:, start:start + width] = cells
+        self.board[y0:y0 + height, w0:w1] = life_bitpack.pack(span).words
+
+    def windowCells(self):
+        return self.region(self.x0, self.y0, self.cell_width, self.cell_height)
+
+    # -- {(x,y): state} view of the viewport --
+
+    def boardCell(self, x, y):
+        if self.bits:
+            word = self.board[y, x // life_bitpack.WORD_BITS]
+            return int(word >> np.uint64(x % life_bitpack.WORD_BITS)) & 1
+        return int(self.board[y, x])
+
+    def __getitem__(self, cell):
+        x, y = cell
+        if x < 0 or y < 0 or x >= self.cell_width or y >= self.cell_height:
+            raise KeyError(cell)
+        return self.boardCell(x + self.x0, y + self.y0)
+
+    def __setitem__(self, cell, state):
+        x, y = cell
+        if x < 0 or y < 0 or x >= self.cell_width or y >= self.cell_height:
+            raise KeyError(cell)
+        x += self.x0
+        y += self.y0
+        if self.bits:
+            bit = np.uint64(1) << np.uint64(x % life_bitpack.WORD_BITS)
+            if state:
+                self.board[y, x // life_bitpack.WORD_BITS] |= bit
+            else:
+                self.board[y, x // life_bitpack.WORD_BITS] &= ~bit
+        else:
+            self.board[y, x] = state
+
+    def __delitem__(self, cell):
+        raise TypeError("cells of the viewport can not be deleted")
+
+    def __iter__(self):
+        # same order as blankGrid(): row by row
+        for y in range(self.cell_height):
+            for x in range(self.cell_width):
+                yield (x, y)
+
+    def __len__(self):
+        return self.cell_width * self.cell_height
+
+    def __contains__(self, cell):
+        try:
+            x, y = cell
+        except (TypeError, ValueError):
+            return False
+        return 0 <= x < self.cell_width and 0 <= y < self.cell_height
+
+def blankGrid(cell_width, cell_height, path=None, bits=False, board_width=None, board_height=None):
+    # the board defaults to the viewport size, the files to a temporary
+    # directory that goes when the board is collected, or at exit
+    tmp = None
+    if path is None:
+        tmp = tempfile.TemporaryDirectory(prefix='life_memmap_', ignore_cleanup_errors=True)
+        path = os.path.join(tmp.name, 'board')
+    board_width = cell_width if board_width is None else board_width
+    board_height = cell_height if board_height is None else board_height
+    life = life_memmap(path, board_width, board_height, cell_width, cell_height, bits)
+    life.tmp = tmp
+    return life
+
+def resume(path, cell_width=None, cell_height=None):
+    # reopen the newest complete file of a run
+    info = None
+    for suffix in ('.a.npy', '.b.npy'):
+        info = info or readSidecar(path + suffix)
+    if info is None:
+        raise ValueError("no board files for " + path)
+    return life_memmap(path, info['width'], info['height'], cell_width, cell_height,
+                       info['bits'], create=False)
+
+def initLife(life):
+    # random fill, stripe by stripe, seeded from the random module
+    rng = np.random.default_rng(random.getrandbits(64))
+    for y0 in range(0, life.board_height, STRIPE_ROWS):
+        y1 = min(y0 + STRIPE_ROWS, life.board_height)
+        cells = rng.integers(0, 2, size=(y1 - y0, life.board_width), dtype=np.uint8)
+        if life.bits:
+            life.board[y0:y1] = life_bitpack.pack(cells).words
+        else:
+            life.board[y0:y1] = cells
+    life.flush()
+    return life
+
+def fromCells(cells, path=None, bits=False):
+    # 2D array [y, x] of states
+    cell_height, cell_width = cells.shape
+    life = blankGrid(cell_width, cell_height, path, bits)
+    if bits:
+        life.board[...] = life_bitpack.pack(np.asarray(cells)).words
+    else:
+        life.board[...] = cells
+    life.flush()
+    return life
+
+def NextGeneration(life):
+    life.step()
+    return life
@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# NumPy step engine for the game of life
+#   the board is a 2D uint8 array indexed [y, x], neighbours are counted with
+#   shifted-array sums and the B3/S23 rules are applied as array masks.
+#   life_array exposes the same {(x,y): state} interface as the dict board
+#   so showLife / colourGrid keep working unchanged.
+
+from collections.abc import MutableMapping
+import random
+
+import numpy as np
+
+
+class life_array(MutableMapping):
+
+    def __init__(self, cells):
+        self.cells = cells # 2D uint8 array, cells[y, x]
+
+    @property
+    def cell_width(self):
+        return self.cells.shape[1]
+
+    @property
+    def cell_height(self):
+        return self.cells.shape[0]
+
+    def __getitem__(self, cell):
+        x, y = cell
+        if x < 0 or y < 0 or x >= self.cell_width or y >= self.cell_height:
+            raise KeyError(cell)
+        return int(self.cells[y, x])
+
+    def __setitem__(self, cell, state):
+        x, y = cell
+        if x < 0 or y < 0 or x >= self.cell_width or y >= self.cell_height:
+            raise KeyError(cell)
+        self.cells[y, x] = state
+
+    def __delitem__(self, cell):
+        raise TypeError("cells of a fixed size board can not be deleted")
+
+    def __iter__(self):
+        # same order as blankGrid(): row by row
+        for y in range(self.cell_height):
+            for x in range(self.cell_width):
+                yield (x, y)
+
+    def __len__(self):
+        return self.cells.size
+
+    def __contains__(self, cell):
+        try:
+            x, y = cell
+        except (TypeError, ValueError):
+            return False
+        return 0 <= x < self.cell_width and 0 <= y < self.cell_height
+
+    def copy(self):
+        return life_array(self.cells.copy())
+
+def blankGrid(cell_width, cell_height):
+    return life_array(np.zeros((cell_height, cell_width), dtype=np.uint8))
+
+def initLife(life):
+    # seed numpy from the random module so random.seed() still reproduces a board
+    rng = np.random.default_rng(random.getrandbits(64))
+    life.cells[...] = rng.integers(0, 2, size=life.cells.shape, dtype=np.uint8)
+    return life
+
+def fromDict(life, cell_width, cell_height):
+    board = blankGrid(cell_width, cell_height)
+    for (x, y), state in life.items():
+        board.cells[y, x] = state
+    return board
+
+def fromCells(cells):
+    # 2D array [y, x] of states
+    return life_array(np.array(cells, dtype=np.uint8))
+
+def toDict(life):
+    height, width = life.cells.shape
+    states = life.cells.ravel().tolist()
+    return {(x, y): states[y * width + x] for y in range(height) for x in range(width)}
+
+def countNeighbours(cells):
+    # pad with a dead border, so cells outside the board never count as alive
+    padded = np.pad(cells, 1).astype(np.uint8)
+    height, width = cells.shape
+    neighbours = np.zeros(cells.shape, dtype=np.uint8)
+    for dy in range(3):
+        for dx in range(3):
+            if dx == 1 and dy == 1: # self
+                continue
+            neighbours += padded[dy:dy + height, dx:dx + width]
+    return neighbours
+
+# rules
+# 1. Any live cell with fewer than two live neighbours dies, as if by underpopulation.
+# 2. Any live cell with two or three live neighbours lives on to the next generation.
+# 3. Any live cell with more than three live neighbours dies, as if by overpopulation.
+# 4. Any dead cell with exactly three live neighbours becomes a live cell, as if by reproduction.
+def nextCells(cells):
+    neighbours = countNeighbours(cells)
+    # case (4) and case (2), every other cell dies or stays dead
+    alive = (neighbours == 3) | ((cells == 1) & (neighbours == 2))
+    return alive.astype(np.uint8)
+
+def NextGeneration(life):
+    return life_array(nextCells(life.cells))
@@ -0,0 +1,122 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# multi-process step engine for the game of life
+#   the board is split into horizontal strips, one per worker process. the
+#   current and the next generation live in two multiprocessing.shared_memory
+#   blocks, so nothing is pickled per step: after the start barrier every
+#   worker reads its strip plus the one-row halos of the strips above and below
+#   from the current block and writes its rows of the next block, the finish
+#   barrier publishes them and the blocks swap roles.
+#   the strips are stepped with life_numpy, so the output is bit-identical to
+#   the serial engine.
+
+import atexit
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import life_numpy
+from life_numpy import life_array
+
+
+def strips(cell_height, workers):
+    # [y0, y1) rows of every strip
+    bounds = [cell_height * i // workers for i in range(workers + 1)]
+    return [(bounds[i], bounds[i+1]) for i in range(workers)]
+
+def worker(names, shape, y0, y1, barrier, current, stop):
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    boards = [np.ndarray(shape, dtype=np.uint8, buffer=block.buf) for block in blocks]
+    height = shape[0]
+    # one halo row above and below, none outside the board
+    top = max(y0 - 1, 0)
+    bottom = min(y1 + 1, height)
+    src = dst = None
+    try:
+        while True:
+            barrier.wait() # start of a generation
+            if stop.value:
+                break
+            src = boards[current.value]
+            dst = boards[1 - current.value]
+            if y1 > y0:
+                dst[y0:y1] = life_numpy.nextCells(src[top:bottom])[y0 - top:y1 - top]
+            barrier.wait() # every strip written
+    finally:
+        del src, dst, boards
+        for block in blocks:
+            block.close()
+
+class life_parallel(life_array):
+
+    def __init__(self, cell_width, cell_height, workers=None):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, cell_height))
+        shape = (cell_height, cell_width)
+        size = max(1, cell_width * cell_height)
+        self.blocks = [shared_memory.SharedMemory(create=True, size=size) for _ in range(2)]
+        self.boards = [np.ndarray(shape, dtype=np.uint8, buffer=block.buf) for block in self.blocks]
+        for board in self.boards:
+            board[...] = 0
+        self.current = multiprocessing.Value('i', 0, lock=False)
+        self.stop = multiprocessing.Value('b', 0, lock=False)
+        self.barrier = multiprocessing.Barrier(workers + 1)
+        self.workers = []
+        names = [block.name for block in self.blocks]
+        for y0, y1 in strips(cell_height, workers):
+            p = multiprocessing.Process(target=worker, daemon=True,
+                    args=(names, shape, y0, y1, self.barrier, self.current, self.stop))
+            p.start()
+            self.workers.append(p)
+        atexit.register(self.close)
+        super().__init__(self.boards[0])
+
+    def step(self):
+        self.barrier.wait() # release the workers
+        self.barrier.wait() # wait for every strip
+        self.current.value = 1 - self.current.value
+        self.cells = self.boards[self.current.value]
+
+    def close(self):
+        if not self.workers:
+            return
+        self.stop.value = 1
+        self.barrier.wait()
+        for p in self.workers:
+            p.join()
+        self.workers = []
+        self.cells = self.cells.copy() # keep the last generation readable
+        self.boards = []
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+        atexit.unregister(self.close)
+
+def blankGrid(cell_width, cell_height, workers=None):
+    return life_parallel(cell_width, cell_height, workers)
+
+def initLife(life):
+    life_numpy.initLife(life)
+    return life
+
+def fromDict(life, cell_width, cell_height, workers=None):
+    board = blankGrid(cell_width, cell_height, workers)
+    for (x, y), state in life.items():
+        board.cells[y, x] = state
+    return board
+
+def fromCells(cells, workers=None):
+    # 2D array [y, x] of states
+    cell_height, cell_width = cells.shape
+    board = blankGrid(cell_width, cell_height, workers)
+    board.cells[...] = cells
+    return board
+
+def NextGeneration(life):
+    life.step()
+    return life
@@ -0,0 +1,333 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# pattern files for the game of life
+# ref https://conwaylife.com/wiki/Run_Length_Encoded
+#     https://conwaylife.com/wiki/Life_1.06
+#     https://conwaylife.com/wiki/Plaintext
+#
+#   the readers stream the file line by line and report runs of live cells
+#   (x, y, n) in pattern coordinates, which are decoded straight into the
+#   board's storage: array slices for the numpy boards, packed rows for the
+#   bit-packed board, rows of the viewport for the memmap board and live
+#   cell sets for the dict and hashlife boards.
+#   the writers emit the board row by row.
+
+import os
+import re
+
+import numpy as np
+
+
+RLE_HEADER = re.compile(r'\s*x\s*=\s*(-?\d+)\s*,\s*y\s*=\s*(-?\d+)')
+RLE_RULE = re.compile(r'.*rule\s*=\s*([^,\s]+)')
+RLE_TOKEN = re.compile(r'(\d+)|([^\d\s])')
+RLE_PREFIXES = 'pqrstuvwxy' # multi-state RLE, states above 24 are a prefix and a letter
+RLE_LINE = 70 # maximum line length of written RLE
+CELLS_LIVE = re.compile(r'[O*]+') # live cells of a plaintext row, anything else is dead
+EXTENSIONS = {'.rle': 'rle', '.lif': 'life106', '.life': 'life106', '.cells': 'cells'}
+
+def patternFormat(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in EXTENSIONS:
+        return EXTENSIONS[ext]
+    with open(path) as f:
+        first = f.readline()
+    if first.startswith('#Life 1.06'):
+        return 'life106'
+    if first.startswith('!'):
+        return 'cells'
+    return 'rle'
+
+# -- readers --
+
+def ruleStates(line):
+    # states of the rule in an RLE header line, 2 when there is none
+    import life_rule
+    m = RLE_RULE.match(line)
+    if not m:
+        return 2
+    try:
+        return life_rule.parseRule(m.group(1))[2]
+    except ValueError: # a rule life_rule does not know, read as two states
+        return 2
+
+def readRLE(f):
+    # runs of live cells. with two states any state other than b / . counts
+    # as alive, with a Generations rule only A (state 1) does: dying states
+    # load as dead cells
+    x = y = 0
+    count = ''
+    states = 2
+    prefix = False
+    for line in f:
+        if line.startswith('#'):
+            continue
+        if RLE_HEADER.match(line):
+            states = ruleStates(line)
+            continue
+        for number, tag in RLE_TOKEN.findall(line):
+            if number:
+                count += number # a run count can continue on the next line
+                continue
+            if states > 2 and tag in RLE_PREFIXES:
+                prefix = True
+                continue
+            n = int(count) if count else 1
+            count = ''
+            if tag == '!':
+                return
+            if tag == '$':
+                x = 0
+                y += n
+            elif tag in 'b.' or states > 2 and (prefix or tag != 'A'):
+                x += n
+            else:
+                yield (x, y, n)
+                x += n
+            prefix = False
+
+def readLife106(f):
+    for line in f:
+        if line.startswith('#') or not line.strip():
+            continue
+        x, y = line.split()[:2]
+        yield (int(x), int(y), 1)
+
+def readCells(f):
+    y = 0
+    for line in f:
+        if line.startswith('!'):
+            continue
+        line = line.rstrip('\r\n')
+        for m in CELLS_LIVE.finditer(line):
+            yield (m.start(), y, m.end() - m.start())
+        y += 1
+
+READERS = {'rle': readRLE, 'life106': readLife106, 'cells': readCells}
+
+def readRuns(path, fmt=None):
+    fmt = fmt or patternFormat(path)
+    with open(path) as f:
+        for run in READERS[fmt](f):
+            yield run
+
+def patternBounds(path, fmt=None):
+    # (x0, y0, x1, y1) of the live cells, from the RLE header when there is one
+    fmt = fmt or patternFormat(path)
+    if fmt == 'rle':
+        with open(path) as f:
+            for line in f:
+                if line.startswith('#'):
+                    continue
+                m = RLE_HEADER.match(line)
+                if m:
+                    return (0, 0, int(m.group(1)), int(m.group(2)))
+                break
+    x0 = y0 = None
+    x1 = y1 = 0
+    for x, y, n in readRuns(path, fmt):
+        if x0 is None:
+            x0, y0, x1, y1 = x, y, x + n, y + 1
+            continue
+        x0 = min(x0, x)
+        y0 = min(y0, y)
+        x1 = max(x1, x + n)
+        y1 = max(y1, y + 1)
+    if x0 is None:
+        return (0, 0, 0, 0)
+    return (x0, y0, x1, y1)
+
+# -- decoding into a board --
+
+def clipRuns(runs, dx, dy, cell_width, cell_height):
+    # move runs by (dx, dy) and clip them to the board
+    for x, y, n in runs:
+        x += dx
+        y += dy
+        if y < 0 or y >= cell_height:
+            continue
+        if x < 0:
+            n += x
+            x = 0
+        n = min(n, cell_width - x)
+        if n > 0:
+            yield (x, y, n)
+
+def clearLife(life):
+    if hasattr(life, 'cells'):
+        life.cells[...] = 0
+    elif hasattr(life, 'words'):
+        life.words[...] = 0
+    elif hasattr(life, 'universe'):
+        life.universe.build([])
+        life.window = None
+    elif hasattr(life, 'live'):
+        life.live.clear()
+    elif hasattr(life, 'board'): # life_memmap, the whole board
+        life.board[...] = 0
+        life.flush()
+    else:
+        for cell in life:
+            dict.__setitem__(life, cell, 0)
+    if hasattr(life, 'everything'): # life_active and life_incremental re-evaluate the whole board
+        life.everything = True
+
+def decodeRuns(life, runs):
+    if hasattr(life, 'cells'):
+        cells = life.cells
+        for x, y, n in runs:
+            cells[y, x:x+n] = 1
+    elif hasattr(life, 'words'):
+        import life_bitpack
+        # runs arrive row by row in RLE and plaintext, pack one row at a time
+        row = np.zeros((1, life.cell_width), dtype=np.uint8)
+        current = None
+        for x, y, n in runs:
+            if y != current:
+                if current is not None:
+                    life.words[current] |= life_bitpack.pack(row).words[0]
+                    row[...] = 0
+                current = y
+            row[0, x:x+n] = 1
+        if current is not None:
+            life.words[current] |= life_bitpack.pack(row).words[0]
+    elif hasattr(life, 'universe'):
+        life.universe.build((x + i, y) for x, y, n in runs for i in range(n))
+        life.window = None
+    elif hasattr(life, 'live'):
+        # viewport coordinates -> plane coordinates
+        for x, y, n in runs:
+            for i in range(n):
+                life.live.add((x + i + life.x0, y + life.y0))
+    elif hasattr(life, 'board'):
+        # viewport rows -> board rows, one row at a time
+        row = np.zeros((1, life.cell_width), dtype=np.uint8)
+        current = None
+        for x, y, n in runs:
+            if y != current:
+                if current is not None:
+                    life.setRegion(life.x0, life.y0 + current, row)
+                    row[...] = 0
+                current = y
+            row[0, x:x+n] = 1
+        if current is not None:
+            life.setRegion(life.x0, life.y0 + current, row)
+        life.flush()
+    else:
+        for x, y, n in runs:
+            for i in range(n):
+                dict.__setitem__(life, (x + i, y), 1)
+
+def loadPattern(life, path, cell_width, cell_height, position=None):
+    # position is the board cell of the pattern's top left corner,
+    # by default the pattern is centred on the board
+    fmt = patternFormat(path)
+    x0, y0, x1, y1 = patternBounds(path, fmt)
+    if position is None:
+        position = ((cell_width - (x1 - x0)) // 2, (cell_height - (y1 - y0)) // 2)
+    clearLife(life)
+    dx = position[0] - x0
+    dy = position[1] - y0
+    if hasattr(life, 'live') or hasattr(life, 'universe'):
+        # unbounded plane, nothing to clip
+        runs = ((x + dx, y + dy, n) for x, y, n in readRuns(path, fmt))
+    else:
+        runs = clipRuns(readRuns(path, fmt), dx, dy, cell_width, cell_height)
+    decodeRuns(life, runs)
+    return life
+
+# -- writers --
+
+def boardRows(life, cell_width, cell_height):
+    # rows of the board as uint8 arrays
+    if hasattr(life, 'cells'):
+        for y in range(cell_height):
+            yield life.cells[y]
+    elif hasattr(life, 'words'):
+        import life_bitpack
+        for y in range(cell_height):
+            yield life_bitpack.unpack(life_bitpack.life_bits(life.words[y:y+1], life.cell_width))[0]
+    else:
+        for y in range(cell_height):
+            yield np.fromiter((life[x, y] for x in range(cell_width)), dtype=np.uint8, count=cell_width)
+
+def rowRuns(row):
+    # (start, end, state) of the runs of equal non-zero states of a row
+    row = np.asarray(row)
+    edges = np.flatnonzero(np.diff(row)) + 1
+    starts = np.concatenate(([0], edges))
+    ends = np.concatenate((edges, [len(row)]))
+    live = row[starts] != 0
+    return zip(starts[live].tolist(), ends[live].tolist(), row[starts[live]].tolist())
+
+def stateTag(state, states):
+    # o for a live cell with two states, A .. X, pA .. yO with more
+    if states == 2:
+        return 'o'
+    prefix, letter = divmod(state - 1, 24)
+    return (RLE_PREFIXES[prefix - 1] if prefix else '') + chr(ord('A') + letter)
+
+def writeRLE(f, rows, cell_width, cell_height, rule='B3/S23', states=2):
+    # multi-state RLE (. for dead cells, letters for the states) when the rule has dying states
+    f.write('x = %d, y = %d, rule = %s\n' % (cell_width, cell_height, rule))
+    blank = 'b' if states == 2 else '.'
+    line = ''
+    last = 0 # row of the last written run
+
+    def emit(token):
+        nonlocal line
+        if len(line) + len(token) > RLE_LINE:
+            f.write(line + '\n')
+            line = ''
+        line += token
+
+    def run(n, tag):
+        emit(('%d%s' % (n, tag)) if n > 1 else tag)
+
+    for y, row in enumerate(rows):
+        runs = list(rowRuns(row))
+        if not runs:
+            continue
+        if y > last:
+            run(y - last, '$')
+        last = y
+        x = 0
+        for start, end, state in runs:
+            if start > x:
+                run(start - x, blank)
+            run(end - start, stateTag(state, states))
+            x = end
+    emit('!')
+    f.write(line + '\n')
+
+def writeLife106(f, rows):
+    f.write('#Life 1.06\n')
+    for y, row in enumerate(rows):
+        for x in np.flatnonzero(row).tolist():
+            f.write('%d %d\n' % (x, y))
+
+def writeCells(f, rows, name=None):
+    if name:
+        f.write('!Name: %s\n' % name)
+    for row in rows:
+        line = ''.join('O' if state else '.' for state in row.tolist())
+        f.write(line.rstrip('.') + '\n')
+
+def savePattern(life, path, cell_width, cell_height, fmt=None):
+    # the rule of a life_rule or life_incremental board goes into the RLE
+    # header, Life 1.06 and plaintext have no rule nor dying states
+    import life_rule
+    if fmt is None:
+        fmt = EXTENSIONS.get(os.path.splitext(path)[1].lower(), 'rle')
+    births, survivals, states = life_rule.parseRule(getattr(life, 'rule', 'B3/S23'))
+    if states > 2 and fmt != 'rle':
+        raise ValueError("a Generations rule needs RLE, %s can not hold dying states" % fmt)
+    rows = boardRows(life, cell_width, cell_height)
+    with open(path, 'w') as f:
+        if fmt == 'rle':
+            writeRLE(f, rows, cell_width, cell_height, life_rule.ruleString(births, survivals, states), states)
+        elif fmt == 'life106':
+            writeLife106(f, rows)
+        else:
+            writeCells(f, rows, os.path.splitext(os.path.basename(path))[0])
@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# background simulation for the game of life viewer
+#   a worker thread (or process) steps the board at its own rate and pushes
+#   frames, copies of the visible cells, into a small bounded queue. when the
+#   queue is full the oldest frame is dropped, so the simulation never waits
+#   for the display. the pygame loop shows the newest frame and skips the
+#   stale ones, so simulation speed and display FPS are set independently.
+
+import multiprocessing
+import queue
+import threading
+import time
+
+from life_numpy import life_array
+from life_render import boardCells
+
+
+QUEUE_SIZE = 2
+
+def push(frames, frame):
+    # put without waiting, dropping the oldest frame when the queue is full
+    while True:
+        try:
+            frames.put_nowait(frame)
+            return
+        except queue.Full:
+            try:
+                frames.get_nowait()
+            except queue.Empty:
+                pass
+
+def produce(life, nextGeneration, cell_width, cell_height, frames, stop, sim_rate):
+    generation = 0
+    push(frames, (generation, boardCells(life, cell_width, cell_height).copy()))
+    period = 1.0 / sim_rate if sim_rate else 0.0
+    deadline = time.perf_counter()
+    while not stop.is_set():
+        life = nextGeneration(life)
+        generation += 1
+        push(frames, (generation, boardCells(life, cell_width, cell_height).copy()))
+        if period:
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                stop.wait(delay)
+            else:
+                deadline = time.perf_counter() # running late, don't try to catch up
+
+class frame_producer:
+
+    def __init__(self, life, nextGeneration, cell_width, cell_height, mode='thread',
+                 sim_rate=None, maxsize=QUEUE_SIZE):
+        # sim_rate is in generations per second, None runs as fast as possible.
+        # the worker owns life from here on, only the frames come back.
+        # 'process' mode steps a copy of life in a forked child process; the
+        # callers pass closures, which spawn can not pickle, so without fork
+        # it falls back to a thread
+        if mode == 'process' and 'fork' not in multiprocessing.get_all_start_methods():
+            mode = 'thread'
+        self.mode = mode
+        self.generation = None # generation of the last frame returned by latest()
+        if mode == 'process':
+            context = multiprocessing.get_context('fork')
+            self.frames = context.Queue(maxsize)
+            self.stopping = context.Event()
+            self.worker = context.Process(target=produce, daemon=True,
+                    args=(life, nextGeneration, cell_width, cell_height, self.frames, self.stopping, sim_rate))
+        else:
+            self.frames = queue.Queue(maxsize)
+            self.stopping = threading.Event()
+            self.worker = threading.Thread(target=produce, daemon=True,
+                    args=(life, nextGeneration, cell_width, cell_height, self.frames, self.stopping, sim_rate))
+        self.worker.start()
+
+    def latest(self):
+        # the newest frame as a {(x,y): state} board, None when nothing new arrived
+        frame = None
+        while True:
+            try:
+                frame = self.frames.get_nowait()
+            except queue.Empty:
+                break
+        if frame is None:
+            return None
+        self.generation, cells = frame
+        return life_array(cells)
+
+    def stop(self):
+        self.stopping.set()
+        if self.mode == 'process':
+            self.worker.join(1.0)
+            if self.worker.is_alive():
+                self.worker.terminate()
+        else:
+            self.worker.join()
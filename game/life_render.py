@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# surfarray renderer for the game of life
+#   the board is written into an 8-bit palette surface with one pixel per cell
+#   through pygame.surfarray, scaled up to the cell size and blitted in one call.
+#   the grid lines are drawn once into a cached colorkeyed overlay.
+
+import pygame
+import numpy as np
+
+
+GRID_KEY = (255, 0, 255) # transparent colour of the grid overlay
+
+def boardCells(life, cell_width, cell_height):
+    # 2D uint8 array [y, x] of any {(x,y): state} board
+    cells = getattr(life, 'cells', None)
+    if cells is not None:
+        return cells
+    if hasattr(life, 'windowCells'): # unbounded boards draw their visible window
+        return life.windowCells()
+    if hasattr(life, 'words'):
+        import life_bitpack
+        return life_bitpack.unpack(life)
+    states = (life[x, y] for y in range(cell_height) for x in range(cell_width))
+    cells = np.fromiter(states, dtype=np.uint8, count=cell_width * cell_height)
+    return cells.reshape(cell_height, cell_width)
+
+class surfarray_renderer:
+
+    def __init__(self, surface, cell_width, cell_height, cell_size, palette, grid_color=None):
+        self.surface = surface
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.cell_size = cell_size
+        # one pixel per cell, the palette maps a cell state to its colour
+        self.cells = pygame.Surface((cell_width, cell_height), depth=8)
+        self.cells.set_palette(list(palette) + [(0, 0, 0)] * (256 - len(palette)))
+        self.scaled = pygame.Surface((cell_width * cell_size, cell_height * cell_size), depth=8)
+        self.scaled.set_palette(self.cells.get_palette())
+        self.grid = None
+        if grid_color is not None:
+            self.grid = self.gridOverlay(grid_color)
+
+    def gridOverlay(self, grid_color):
+        width = self.cell_width * self.cell_size
+        height = self.cell_height * self.cell_size
+        grid = pygame.Surface((width, height))
+        grid.fill(GRID_KEY)
+        grid.set_colorkey(GRID_KEY)
+        for x in range(0, width, self.cell_size): # draw vertical lines
+            pygame.draw.line(grid, grid_color, (x,0),(x,height))
+        for y in range (0, height, self.cell_size): # draw horizontal lines
+            pygame.draw.line(grid, grid_color, (0,y), (width, y))
+        return grid
+
+    def draw(self, life):
+        cells = boardCells(life, self.cell_width, self.cell_height)
+        # surfarray is indexed [x, y]
+        pygame.surfarray.blit_array(self.cells, cells.T)
+        pygame.transform.scale(self.cells, self.scaled.get_size(), self.scaled)
+        self.surface.blit(self.scaled, (0, 0))
+        if self.grid is not None:
+            self.surface.blit(self.grid, (0, 0))
+
+def mergeRects(changed):
+    # changed cells -> (x, y, w, h) cell rectangles: runs of adjacent cells on a
+    # row, then runs with the same span on consecutive rows
+    rows = {}
+    for x, y in changed:
+        rows.setdefault(y, []).append(x)
+    runs = []
+    for y in sorted(rows):
+        xs = sorted(rows[y])
+        start = prev = xs[0]
+        for x in xs[1:]:
+            if x != prev + 1:
+                runs.append((start, prev, y))
+                start = x
+            prev = x
+        runs.append((start, prev, y))
+    spans = {} # (x0, x1) -> last rectangle with that span
+    rects = []
+    for x0, x1, y in runs:
+        rect = spans.get((x0, x1))
+        if rect is not None and rect[1] + rect[3] == y:
+            rect[3] += 1
+        else:
+            rect = [x0, y, x1 - x0 + 1, 1]
+            spans[x0, x1] = rect
+            rects.append(rect)
+    return rects
+
+class dirty_renderer(surfarray_renderer):
+    # repaints only the cells that flipped and reports the dirty rectangles,
+    # falls back to a full repaint when more than max_fraction of the board changed
+
+    def __init__(self, surface, cell_width, cell_height, cell_size, palette, grid_color=None,
+                 max_fraction=0.25):
+        super().__init__(surface, cell_width, cell_height, cell_size, palette, grid_color)
+        self.palette = list(palette)
+        self.max_fraction = max_fraction
+        self.drawn = None # cells of the last painted frame
+        self.painted = False
+
+    def draw(self, life, changed=None):
+        # returns the list of pixel rectangles to update, None for the whole window
+        if changed is None:
+            # no flips reported by the engine, diff against the last painted frame
+            cells = boardCells(life, self.cell_width, self.cell_height)
+            if self.drawn is not None:
+                ys, xs = np.nonzero(cells != self.drawn)
+                changed = list(zip(xs.tolist(), ys.tolist()))
+            self.drawn = cells.copy()
+        elif not self.painted:
+            changed = None
+        else:
+            self.drawn = None
+        self.painted = True
+        if changed is None or len(changed) > self.max_fraction * self.cell_width * self.cell_height:
+            super().draw(life)
+            return None
+        size = self.cell_size
+        for x, y in changed:
+            rect = pygame.Rect(x * size, y * size, size, size)
+            pygame.draw.rect(self.surface, self.palette[life[x, y]], rect)
+        rects = []
+        for x, y, w, h in mergeRects(changed):
+            rect = pygame.Rect(x * size, y * size, w * size, h * size)
+            if self.grid is not None:
+                self.surface.blit(self.grid, rect, rect)
+            rects.append(rect)
+        return rects
@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# outer-totalistic rules for the game of life
+#   a rule string is compiled once into a table[state, live neighbours] of
+#   next states, and a step is one vectorized gather from it, whatever the
+#   rule. rule strings:
+#     B3/S23, B36/S23, B2/S        birth and survival counts
+#     23/3                         the older S/B form
+#     B2/S345/C4, 345/2/4          Generations: a live cell that does not
+#                                  survive ages through the dying states
+#                                  2 .. C-1 before it is dead, only state 1
+#                                  counts as a live neighbour
+#   the board is a life_array, the rule and the edge mode travel with it:
+#   dead border (default) or toroidal wrap.
+
+from functools import lru_cache
+
+import numpy as np
+
+import life_numpy
+
+
+# common rules by name
+RULES = {
+    'life' : 'B3/S23',
+    'highlife' : 'B36/S23',
+    'daynight' : 'B3678/S34678',
+    'seeds' : 'B2/S',
+    'brianbrain' : 'B2/S/C3',
+}
+
+def parseRule(rule):
+    # (births, survivals, states) of a rule string
+    rule = RULES.get(rule.lower(), rule)
+    parts = rule.replace(' ', '').upper().split('/')
+    births = survivals = None
+    states = 2
+    if any(p[:1] in ('B', 'S', 'C', 'G') for p in parts):
+        for p in parts:
+            tag, digits = p[:1], p[1:]
+            if tag == 'B':
+                births = digits
+            elif tag == 'S':
+                survivals = digits
+            elif tag in ('C', 'G'):
+                states = int(digits)
+            else:
+                raise ValueError("bad rule " + rule)
+    elif len(parts) in (2, 3):
+        # S/B or S/B/C
+        survivals, births = parts[0], parts[1]
+        if len(parts) == 3:
+            states = int(parts[2])
+    if births is None or survivals is None:
+        raise ValueError("bad rule " + rule)
+    digits = births + survivals
+    if digits and not digits.isdigit() or '9' in digits or not 2 <= states <= 256:
+        raise ValueError("bad rule " + rule)
+    return frozenset(int(c) for c in births), frozenset(int(c) for c in survivals), states
+
+def ruleString(births, survivals, states=2):
+    rule = 'B%s/S%s' % (''.join(map(str, sorted(births))), ''.join(map(str, sorted(survivals))))
+    if states > 2:
+        rule += '/C%d' % states
+    return rule
+
+@lru_cache(maxsize=None)
+def compileRule(rule):
+    # table[state, live neighbours] -> next state, uint8
+    births, survivals, states = parseRule(rule)
+    table = np.zeros((states, 9), dtype=np.uint8)
+    for n in range(9):
+        table[0, n] = 1 if n in births else 0
+        # a live cell survives, or starts dying (dies at once with 2 states)
+        table[1, n] = 1 if n in survivals else 2 % states
+    for state in range(2, states):
+        table[state, :] = (state + 1) % states
+    table.setflags(write=False)
+    return table
+
+def countNeighbours(cells, wrap=False):
+    # live (state 1) neighbours of every cell
+    live = (cells == 1).view(np.uint8)
+    if not wrap:
+        return life_numpy.countNeighbours(live)
+    neighbours = np.zeros(cells.shape, dtype=np.uint8)
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            if dx == 0 and dy == 0: # self
+                continue
+            neighbours += np.roll(live, (dy, dx), axis=(0, 1))
+    return neighbours
+
+def nextCells(cells, table, wrap=False):
+    neighbours = countNeighbours(cells, wrap)
+    index = cells.astype(np.intp) * 9 + neighbours
+    return table.reshape(-1)[index]
+
+class life_rule(life_numpy.life_array):
+
+    def __init__(self, cells, rule='B3/S23', wrap=False):
+        super().__init__(cells)
+        self.rule = rule
+        self.wrap = wrap
+        self.table = compileRule(rule)
+        self.states = len(self.table)
+
+    def copy(self):
+        return life_rule(self.cells.copy(), self.rule, self.wrap)
+
+def blankGrid(cell_width, cell_height, rule='B3/S23', wrap=False):
+    return life_rule(np.zeros((cell_height, cell_width), dtype=np.uint8), rule, wrap)
+
+def initLife(life):
+    return life_numpy.initLife(life)
+
+def fromDict(life, cell_width, cell_height, rule='B3/S23', wrap=False):
+    return life_rule(life_numpy.fromDict(life, cell_width, cell_height).cells, rule, wrap)
+
+def fromCells(cells, rule='B3/S23', wrap=False):
+    # 2D array [y, x] of states
+    return life_rule(np.array(cells, dtype=np.uint8), rule, wrap)
+
+def toDict(life):
+    return life_numpy.toDict(life)
+
+def NextGeneration(life):
+    return life_rule(nextCells(life.cells, life.table, life.wrap), life.rule, life.wrap)
+
+def palette(cell_blank, cell_color, states):
+    # colours of the states: blank, live, then fading from live to blank
+    colours = [cell_blank, cell_color]
+    dying = states - 2
+    for i in range(1, dying + 1):
+        t = i / (dying + 1)
+        colours.append(tuple(int(c + (b - c) * t) for c, b in zip(cell_color, cell_blank)))
+    return colours
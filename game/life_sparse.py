@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# sparse, unbounded step engine for the game of life
+#   the state is only the set of live cells on an unbounded plane, so nothing
+#   dies at a border and memory follows the population. neighbours are
+#   counted around the live cells only.
+#   life_sparse is a {(x,y): state} view of a cell_width x cell_height
+#   viewport on the plane, which is what the renderer draws.
+
+from collections import Counter
+from collections.abc import MutableMapping
+import random
+
+import numpy as np
+
+
+OFFSETS = [(-1,-1), (0,-1), (1,-1), (-1,0), (1,0), (-1,1), (0,1), (1,1)]
+
+class life_sparse(MutableMapping):
+
+    def __init__(self, cell_width, cell_height, live=None):
+        self.cell_width = cell_width # viewport size
+        self.cell_height = cell_height
+        self.x0 = 0 # plane coordinates of the viewport's top left cell
+        self.y0 = 0
+        self.live = set() if live is None else live
+
+    # -- viewport --
+
+    def setViewport(self, x0, y0, cell_width=None, cell_height=None):
+        self.x0 = x0
+        self.y0 = y0
+        if cell_width is not None:
+            self.cell_width = cell_width
+        if cell_height is not None:
+            self.cell_height = cell_height
+
+    def moveViewport(self, dx, dy):
+        self.x0 += dx
+        self.y0 += dy
+
+    def visibleCells(self):
+        # live cells inside the viewport, in viewport coordinates
+        x0, y0 = self.x0, self.y0
+        w, h = self.cell_width, self.cell_height
+        for x, y in self.live:
+            x -= x0
+            y -= y0
+            if 0 <= x < w and 0 <= y < h:
+                yield (x, y)
+
+    def windowCells(self):
+        # 2D uint8 array [y, x] of the viewport
+        cells = np.zeros((self.cell_height, self.cell_width), dtype=np.uint8)
+        visible = list(self.visibleCells())
+        if visible:
+            xs, ys = zip(*visible)
+            cells[list(ys), list(xs)] = 1
+        return cells
+
+    def bounds(self):
+        # (x0, y0, x1, y1) of the live cells on the plane, None when empty
+        if not self.live:
+            return None
+        xs = [x for x, y in self.live]
+        ys = [y for x, y in self.live]
+        return (min(xs), min(ys), max(xs) + 1, max(ys) + 1)
+
+    # -- {(x,y): state} view of the viewport --
+
+    def __getitem__(self, cell):
+        x, y = cell
+        if x < 0 or y < 0 or x >= self.cell_width or y >= self.cell_height:
+            raise KeyError(cell)
+        return 1 if (x + self.x0, y + self.y0) in self.live else 0
+
+    def __setitem__(self, cell, state):
+        x, y = cell
+        if x < 0 or y < 0 or x >= self.cell_width or y >= self.cell_height:
+            raise KeyError(cell)
+        if state:
+            self.live.add((x + self.x0, y + self.y0))
+        else:
+            self.live.discard((x + self.x0, y + self.y0))
+
+    def __delitem__(self, cell):
+        raise TypeError("cells of the viewport can not be deleted")
+
+    def __iter__(self):
+        # same order as blankGrid(): row by row
+        for y in range(self.cell_height):
+            for x in range(self.cell_width):
+                yield (x, y)
+
+    def __len__(self):
+        return self.cell_width * self.cell_height
+
+    def __contains__(self, cell):
+        try:
+            x, y = cell
+        except (TypeError, ValueError):
+            return False
+        return 0 <= x < self.cell_width and 0 <= y < self.cell_height
+
+    def copy(self):
+        life = life_sparse(self.cell_width, self.cell_height, set(self.live))
+        life.setViewport(self.x0, self.y0)
+        return life
+
+def blankGrid(cell_width, cell_height):
+    return life_sparse(cell_width, cell_height)
+
+def initLife(life):
+    # same random draws, in the same order, as the dict engine
+    for y in range(life.cell_height):
+        for x in range(life.cell_width):
+            if random.randint(0,1):
+                life.live.add((x + life.x0, y + life.y0))
+    return life
+
+def fromDict(life, cell_width, cell_height):
+    return life_sparse(cell_width, cell_height, set(cell for cell, state in life.items() if state == 1))
+
+def fromCells(cells):
+    # 2D array [y, x] of states
+    cell_height, cell_width = cells.shape
+    ys, xs = np.nonzero(cells)
+    return life_sparse(cell_width, cell_height, set(zip(xs.tolist(), ys.tolist())))
+
+# rules
+# 1. Any live cell with fewer than two live neighbours dies, as if by underpopulation.
+# 2. Any live cell with two or three live neighbours lives on to the next generation.
+# 3. Any live cell with more than three live neighbours dies, as if by overpopulation.
+# 4. Any dead cell with exactly three live neighbours becomes a live cell, as if by reproduction.
+def nextLive(live):
+    # every cell next to a live cell, with its number of live neighbours
+    counts = Counter((x + dx, y + dy) for x, y in live for dx, dy in OFFSETS)
+    return set(cell for cell, n in counts.items() if n == 3 or (n == 2 and cell in live))
+
+def NextGeneration(life):
+    life.live = nextLive(life.live)
+    return life
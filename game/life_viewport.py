@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# zoomable, pannable view of a game of life board bigger than the window
+#   only the cells inside the window are read and drawn, so a frame costs
+#   what the window shows rather than the board size. from one pixel per cell
+#   upwards the visible cells are scaled up like the surfarray renderer;
+#   zoomed out further, blocks of k x k cells are reduced to one pixel with
+#   max(), so a live (or dying) cell is never lost.
+#   mouse wheel zooms around the pointer, dragging with the left button pans.
+
+import math
+
+import pygame
+import numpy as np
+
+from life_render import boardCells
+
+
+# pixels per cell
+ZOOMS = (1/16, 1/8, 1/4, 1/2, 1, 2, 3, 4, 6, 8, 10, 12, 16, 24, 32)
+GRID_ZOOM = 4 # grid lines from this zoom up
+OUTSIDE = (0, 0, 0) # colour around the board
+
+def visibleCells(life, x0, y0, width, height, cell_width, cell_height):
+    # 2D uint8 array [y, x] of a board region, reading as little as the board allows
+    cells = getattr(life, 'cells', None)
+    if cells is not None:
+        return cells[y0:y0 + height, x0:x0 + width]
+    if hasattr(life, 'region'): # life_memmap pages in the visible rows only
+        return life.region(x0, y0, width, height)
+    if hasattr(life, 'words'):
+        import life_bitpack
+        rows = life_bitpack.life_bits(life.words[y0:y0 + height], life.cell_width)
+        return life_bitpack.unpack(rows)[:, x0:x0 + width]
+    return boardCells(life, cell_width, cell_height)[y0:y0 + height, x0:x0 + width]
+
+def reduceCells(cells, k):
+    # max over k x k blocks, the last blocks padded with dead cells
+    height, width = cells.shape
+    h = -(-height // k)
+    w = -(-width // k)
+    padded = np.zeros((h * k, w * k), dtype=np.uint8)
+    padded[:height, :width] = cells
+    return padded.reshape(h, k, w, k).max(axis=(1, 3))
+
+class viewport:
+
+    def __init__(self, surface, cell_width, cell_height, cell_size, palette, grid_color=None):
+        self.surface = surface
+        self.cell_width = cell_width # board size
+        self.cell_height = cell_height
+        self.palette = list(palette) + [(0, 0, 0)] * (256 - len(palette))
+        self.grid_color = grid_color
+        # nearest zoom level to the cell size
+        self.level = min(range(len(ZOOMS)), key=lambda i: abs(ZOOMS[i] - cell_size))
+        self.x0 = 0.0 # board coordinates of the window's top left corner
+        self.y0 = 0.0
+        self.dragging = False
+
+    @property
+    def zoom(self):
+        return ZOOMS[self.level]
+
+    # -- navigation --
+
+    def windowSize(self):
+        return self.surface.get_size()
+
+    def toBoard(self, px, py):
+        return self.x0 + px / self.zoom, self.y0 + py / self.zoom
+
+    def pan(self, dx, dy):
+        # by pixels
+        self.x0 -= dx / self.zoom
+        self.y0 -= dy / self.zoom
+        self.clamp()
+
+    def zoomAt(self, px, py, steps):
+        # zooms in (steps > 0) or out keeping the cell under pixel (px, py) in place
+        x, y = self.toBoard(px, py)
+        self.level = max(0, min(self.level + steps, len(ZOOMS) - 1))
+        self.x0 = x - px / self.zoom
+        self.y0 = y - py / self.zoom
+        self.clamp()
+
+    def clamp(self):
+        # keep some of the board in the window
+        width, height = self.windowSize()
+        self.x0 = max(-width / self.zoom / 2, min(self.x0, self.cell_width - width / self.zoom / 2))
+        self.y0 = max(-height / self.zoom / 2, min(self.y0, self.cell_height - height / self.zoom / 2))
+
+    def handleEvent(self, event):
+        # True when the event was for the viewport
+        if event.type == pygame.MOUSEWHEEL:
+            px, py = pygame.mouse.get_pos()
+            self.zoomAt(px, py, event.y)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.dragging = True
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            self.pan(*event.rel)
+        else:
+            return False
+        return True
+
+    # -- drawing --
+
+    def draw(self, life):
+        width, height = self.windowSize()
+        zoom = self.zoom
+        # visible cells, clipped to the board
+        cx0 = max(0, math.floor(self.x0))
+        cy0 = max(0, math.floor(self.y0))
+        cx1 = min(self.cell_width, math.ceil(self.x0 + width / zoom))
+        cy1 = min(self.cell_height, math.ceil(self.y0 + height / zoom))
+        self.surface.fill(OUTSIDE)
+        if cx1 <= cx0 or cy1 <= cy0:
+            return
+        cells = visibleCells(life, cx0, cy0, cx1 - cx0, cy1 - cy0, self.cell_width, self.cell_height)
+        if zoom < 1:
+            k = round(1 / zoom)
+            cells = reduceCells(cells, k)
+            scale = 1
+        else:
+            scale = zoom
+        # one pixel per cell (or block) through an 8-bit palette surface, scaled up
+        pixels = pygame.surfarray.make_surface(np.ascontiguousarray(cells.T))
+        pixels.set_palette(self.palette)
+        h, w = cells.shape
+        left = round((cx0 - self.x0) * zoom)
+        top = round((cy0 - self.y0) * zoom)
+        if scale != 1:
+            pixels = pygame.transform.scale(pixels, (w * scale, h * scale))
+        self.surface.blit(pixels, (left, top))
+        if self.grid_color is not None and zoom >= GRID_ZOOM:
+            right = left + w * scale
+            bottom = top + h * scale
+            for x in range(left, right + 1, scale): # draw vertical lines
+                pygame.draw.line(self.surface, self.grid_color, (x, top), (x, bottom))
+            for y in range(top, bottom + 1, scale): # draw horizontal lines
+                pygame.draw.line(self.surface, self.grid_color, (left, y), (right, y))
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# checks for the object census and the soup ensemble, run with: python -m pytest game
+
+import numpy as np
+
+import life_census
+import life_ensemble
+import life_numpy
+
+
+def place(cells, rows, x0, y0):
+    pattern = life_census.fromRows(rows)
+    cells[y0:y0 + pattern.shape[0], x0:x0 + pattern.shape[1]] = pattern
+
+def test_ensemble_settles():
+    # a block, a blinker, and three cells that become a block after one generation
+    e = life_ensemble.ensemble(3, 12, 10)
+    e.boards[...] = 0
+    place(e.boards[0], life_census.OBJECTS['block'], 4, 4)
+    place(e.boards[1], life_census.OBJECTS['blinker'], 4, 4)
+    place(e.boards[2], ['OO', 'O.'], 4, 4)
+    population = e.run(10)
+    assert e.settled.tolist() == [0, 0, 1]
+    assert e.period.tolist() == [1, 2, 1]
+    assert population[:, -1].tolist() == [4, 3, 4]
+    assert [names for names, unknown in e.census()] == [{'block': 1}, {'blinker': 1}, {'block': 1}]
+
+def test_ensemble_census_of_soups():
+    e = life_ensemble.ensemble(4, 24, 20, seeds=[3, 4, 5, 6])
+    e.run(200)
+    census = e.census()
+    assert len(census) == 4
+    for board, (names, unknown) in zip(e.boards, census):
+        assert (names, unknown) == life_census.census(board)
+        assert sum(unknown.values()) == names['other']
+
+def test_census_names_every_phase():
+    # the beacon's second phase is two components, the glider moves
+    cells = np.zeros((40, 60), dtype=np.uint8)
+    for i, name in enumerate(['beacon', 'toad', 'glider', 'blinker', 'beehive']):
+        place(cells, life_census.OBJECTS[name], 4 + 11 * i, 4)
+        place(cells, life_census.OBJECTS[name], 4 + 11 * i, 24)
+    for generation in range(6):
+        names, unknown = life_census.census(cells)
+        assert names == {'beacon': 2, 'toad': 2, 'glider': 2, 'blinker': 2, 'beehive': 2}, generation
+        assert not unknown
+        cells = life_numpy.nextCells(cells)
+
+def test_census_of_half_a_beacon():
+    cells = np.zeros((10, 10), dtype=np.uint8)
+    place(cells, ['OO', 'O.'], 3, 3)
+    names, unknown = life_census.census(cells)
+    assert names == {'other': 1}
+    assert list(unknown) == [life_census.canonical(life_census.fromRows(['OO', 'O.']))]
+
+def test_components_cut_at_their_bounding_boxes():
+    rng = np.random.default_rng(2)
+    cells = (rng.random((60, 80)) < 0.3).astype(np.uint8)
+    labels = life_census.label(cells)
+    seen = np.zeros_like(cells)
+    for id, x0, y0, pattern in life_census.components(cells):
+        h, w = pattern.shape
+        assert (pattern == (labels[y0:y0 + h, x0:x0 + w] == id)).all()
+        assert pattern[0].any() and pattern[-1].any() and pattern[:, 0].any() and pattern[:, -1].any()
+        seen[y0:y0 + h, x0:x0 + w] |= pattern
+    assert (seen == cells).all()
@@ -0,0 +1,361 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# checks for the step engines, run with: python -m pytest game
+
+import importlib
+
+import numpy as np
+import pytest
+
+from gameoflife2 import ENGINES, game_of_life
+import life_render
+
+
+MARGIN = 12 # dead border around the soups, wider than the generations run
+GENERATIONS = 10
+
+def soup(seed, width=24, height=20, margin=MARGIN):
+    rng = np.random.default_rng(seed)
+    cells = np.zeros((height + 2*margin, width + 2*margin), dtype=np.uint8)
+    cells[margin:-margin, margin:-margin] = rng.random((height, width)) < 0.4
+    return cells
+
+def reference(cells, generations):
+    # the dict engine, game_of_life.stepLife
+    height, width = cells.shape
+    game = game_of_life(None, width, height, 1, None, None, None)
+    game.setCells(cells)
+    frames = []
+    for generation in range(generations):
+        game.stepLife()
+        frames.append(life_render.boardCells(game.life, width, height).copy())
+    return frames
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+def test_engines_match_the_dict_engine(engine, tmp_path):
+    # nothing reaches the edge of the board in GENERATIONS, so the bounded
+    # and the unbounded engines agree on it
+    stepper = importlib.import_module(ENGINES[engine])
+    for seed in range(3):
+        cells = soup(seed)
+        height, width = cells.shape
+        expected = reference(cells, GENERATIONS)
+        if engine == 'memmap':
+            life = stepper.fromCells(cells, path=str(tmp_path / f'board{seed}'))
+        elif engine == 'parallel':
+            life = stepper.fromCells(cells, workers=2)
+        else:
+            life = stepper.fromCells(cells)
+        try:
+            for generation in range(GENERATIONS):
+                life = stepper.NextGeneration(life)
+                assert (life_render.boardCells(life, width, height) == expected[generation]).all(), generation
+        finally:
+            if hasattr(life, 'close'):
+                life.close()
+
+def test_engines_step_a_blinker_at_the_edge():
+    # the bounded engines treat the outside of the board as dead
+    cells = np.zeros((5, 5), dtype=np.uint8)
+    cells[0, 0:3] = 1
+    expected = reference(cells, 2)
+    for engine in ('numpy', 'bitpack', 'active', 'rule', 'incremental'):
+        stepper = importlib.import_module(ENGINES[engine])
+        life = stepper.fromCells(cells)
+        for generation in range(2):
+            life = stepper.NextGeneration(life)
+            assert (life_render.boardCells(life, 5, 5) == expected[generation]).all(), engine
+
+def options(engine, tmp_path, width, height):
+    if engine == 'memmap':
+        return {'path': str(tmp_path / 'board'), 'board_width': width, 'board_height': height}
+    if engine == 'parallel':
+        return {'workers': 2}
+    return {}
+
+@pytest.mark.parametrize('engine', sorted(set(ENGINES) - {'sparse', 'hashlife'}))
+def test_rewind_restores_the_board_in_place(engine, tmp_path):
+    cells = soup(0)
+    height, width = cells.shape
+    game = game_of_life(None, width, height, 1, None, None, None, engine=engine, history=True,
+                        engine_options=options(engine, tmp_path, width, height))
+    try:
+        game.loadCells(cells)
+        life = game.life
+        frames = [cells] + reference(cells, GENERATIONS)
+        for generation in range(GENERATIONS):
+            game.NextGeneration()
+        for generation in range(GENERATIONS - 1, GENERATIONS - 5, -1):
+            assert game.stepBack()
+            assert game.generation == generation
+            assert (life_render.boardCells(game.life, width, height) == frames[generation]).all()
+        if engine in ('memmap', 'parallel', 'incremental'): # steps keep their board
+            assert game.life is life
+        if engine == 'memmap':
+            assert game.life.base == str(tmp_path / 'board')
+            assert game.life.generation == GENERATIONS - 4
+        game.NextGeneration() # branches off from the rewound generation
+        assert (life_render.boardCells(game.life, width, height) == frames[GENERATIONS - 3]).all()
+    finally:
+        if hasattr(game.life, 'close'):
+            game.life.close()
+
+@pytest.mark.parametrize('engine', ['sparse', 'hashlife', 'memmap'])
+def test_no_history_for_a_window_on_a_bigger_board(engine, tmp_path):
+    engine_options = {}
+    if engine == 'memmap':
+        engine_options = {'path': str(tmp_path / 'board'), 'board_width': 64, 'board_height': 64}
+    game = game_of_life(None, 16, 16, 1, None, None, None, engine=engine, history=True,
+                        engine_options=engine_options)
+    assert game.history is None
+    assert not game.stepBack()
+
+def pulsar(margin=3):
+    # period 3
+    cells = np.zeros((13 + 2*margin, 13 + 2*margin), dtype=np.uint8)
+    for a in (0, 5, 7, 12):
+        for b in (2, 3, 4, 8, 9, 10):
+            cells[margin + a, margin + b] = 1
+            cells[margin + b, margin + a] = 1
+    return cells
+
+@pytest.mark.parametrize('engine', ['active', 'incremental'])
+def test_changed_cells_of_a_cached_cycle(engine):
+    # generations served from the cycle cache report the cells they flip
+    cells = pulsar()
+    height, width = cells.shape
+    game = game_of_life(None, width, height, 1, None, None, None, engine=engine, detect_cycles=True)
+    game.loadCells(cells)
+    before = cells
+    for generation in range(15):
+        game.NextGeneration()
+        after = life_render.boardCells(game.life, width, height).copy()
+        ys, xs = np.nonzero(after != before)
+        assert sorted(game.changed) == sorted(zip(xs.tolist(), ys.tolist())), generation
+        before = after
+    assert game.cycle.period == 3
+
+def test_incremental_edits():
+    # cells set between steps, one by one or as a whole board
+    import life_incremental
+    import life_numpy
+    cells = soup(1)
+    life = life_incremental.fromCells(cells)
+    rng = np.random.default_rng(7)
+    for generation in range(12):
+        if generation % 3 == 0:
+            for y, x in rng.integers(0, cells.shape, size=(20, 2)):
+                life[x, y] = 1 - life[x, y]
+        elif generation % 3 == 1:
+            life.cells[...] = soup(generation)
+            life.everything = True
+        expected = life_numpy.nextCells(life.cells)
+        life = life_incremental.NextGeneration(life)
+        assert (life.cells == expected).all(), generation
+
+def test_incremental_verify(monkeypatch):
+    import life_incremental
+    for seed in range(3):
+        assert life_incremental.verify(soup(seed, margin=2), 8) is None
+    assert life_incremental.verify(pulsar(), 6) is None
+    # a step that goes wrong at the third generation
+    step = life_incremental.NextGeneration
+    steps = []
+    def wrong(life):
+        steps.append(1)
+        life = step(life)
+        if len(steps) == 3:
+            life[0, 0] = 1 - life[0, 0]
+        return life
+    monkeypatch.setattr(life_incremental, 'NextGeneration', wrong)
+    assert life_incremental.verify(soup(0, margin=2), 8) == 3
+
+@pytest.mark.parametrize('mode', ['thread', 'process'])
+def test_producer_frames(mode):
+    # the worker steps a closure over its own board, the frames match the dict engine
+    import time
+    import life_numpy
+    import life_producer
+    cells = soup(2, margin=2)
+    height, width = cells.shape
+    expected = [cells] + reference(cells, 40)
+    steps = []
+    def advance(life):
+        steps.append(1) # a closure, as in gameoflife.py and gameoflife2.py
+        return life_numpy.NextGeneration(life)
+    producer = life_producer.frame_producer(life_numpy.fromCells(cells), advance, width, height,
+                                            mode, sim_rate=200)
+    try:
+        seen = 0
+        deadline = time.perf_counter() + 10.0
+        while seen < 5 and time.perf_counter() < deadline:
+            frame = producer.latest()
+            if frame is None:
+                time.sleep(0.005)
+                continue
+            if producer.generation < len(expected):
+                assert (frame.cells == expected[producer.generation]).all(), producer.generation
+                seen += 1
+        assert seen == 5
+    finally:
+        producer.stop()
+
+@pytest.mark.parametrize('argv', [['--workers', '2'], ['--engine', 'bitpack', '--workers', '2'],
+                                  ['--engine', 'parallel', '--workers', '2', '--wrap']])
+def test_headless_workers_need_the_parallel_engine(argv):
+    from gameoflife2 import headless
+    with pytest.raises(SystemExit):
+        headless(argv + ['--size', '16', '--generations', '1'])
+
+def test_memmap_temporary_files_go_with_the_board():
+    import gc
+    import os
+    import life_memmap
+    life = life_memmap.fromCells(soup(0))
+    life = life_memmap.NextGeneration(life)
+    directory = os.path.dirname(life.base)
+    assert os.path.isdir(directory)
+    del life
+    gc.collect()
+    assert not os.path.exists(directory)
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+def test_cycle_cache_matches_the_engine(engine, tmp_path):
+    cells = pulsar()
+    height, width = cells.shape
+    game = game_of_life(None, width, height, 1, None, None, None, engine=engine, detect_cycles=True,
+                        engine_options=options(engine, tmp_path, width, height))
+    try:
+        game.loadCells(cells)
+        expected = reference(cells, 12)
+        for generation in range(12):
+            game.NextGeneration()
+            assert (life_render.boardCells(game.life, width, height) == expected[generation]).all(), generation
+        assert game.cycle.period == 3
+    finally:
+        if hasattr(game.life, 'close'):
+            game.life.close()
+
+def test_memmap_cycle_covers_the_whole_board(tmp_path):
+    # a blinker in the window, a glider on the rest of the board: no cycle
+    import life_memmap
+    life = life_memmap.blankGrid(16, 16, str(tmp_path / 'board'), board_width=64, board_height=64)
+    life.setRegion(6, 7, np.ones((1, 3), dtype=np.uint8))
+    life.setRegion(30, 30, np.array([[0, 1, 0], [0, 0, 1], [1, 1, 1]], dtype=np.uint8))
+    import life_cycle
+    cycle = life_cycle.cycle_detector()
+    for generation in range(12):
+        life = cycle.step(life, life_memmap.NextGeneration)
+    assert cycle.period is None
+    assert life.generation == 12
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+def test_load_stripes(engine, tmp_path):
+    # the same board as loadCells, written a few rows at a time
+    cells = soup(3)
+    height, width = cells.shape
+    game = game_of_life(None, width, height, 1, None, None, None, engine=engine, init_life=False,
+                        engine_options=options(engine, tmp_path, width, height))
+    try:
+        assert life_render.boardCells(game.life, width, height).sum() == 0
+        game.loadStripes((y0, cells[y0:y0 + 5]) for y0 in range(0, height, 5))
+        assert (life_render.boardCells(game.life, width, height) == cells).all()
+        game.NextGeneration()
+        assert (life_render.boardCells(game.life, width, height) == reference(cells, 1)[0]).all()
+    finally:
+        if hasattr(game.life, 'close'):
+            game.life.close()
+
+def naive(cells, rule, wrap):
+    # one generation of an outer-totalistic rule, cell by cell
+    import life_rule
+    births, survivals, states = life_rule.parseRule(rule)
+    height, width = cells.shape
+    after = np.zeros_like(cells)
+    for y in range(height):
+        for x in range(width):
+            n = 0
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    u, v = x + dx, y + dy
+                    if wrap:
+                        u, v = u % width, v % height
+                    elif not (0 <= u < width and 0 <= v < height):
+                        continue
+                    if (dx or dy) and cells[v, u] == 1:
+                        n += 1
+            state = cells[y, x]
+            if state == 0:
+                after[y, x] = 1 if n in births else 0
+            elif state == 1:
+                after[y, x] = 1 if n in survivals else 2 % states
+            else:
+                after[y, x] = (state + 1) % states
+    return after
+
+@pytest.mark.parametrize('rule', ['B3/S23', 'B36/S23', 'seeds', '23/36', 'B2/S345/C4', '345/2/4', 'brianbrain'])
+@pytest.mark.parametrize('wrap', [False, True])
+def test_rule_engine_matches_a_naive_stepper(rule, wrap):
+    import life_rule
+    rng = np.random.default_rng(6)
+    cells = (rng.random((14, 17)) < 0.35).astype(np.uint8) # live cells on every edge
+    life = life_rule.fromCells(cells, rule, wrap)
+    for generation in range(8):
+        expected = naive(life.cells, rule, wrap)
+        life = life_rule.NextGeneration(life)
+        assert (life.cells == expected).all(), generation
+    if life.states > 2:
+        assert (life.cells > 1).any() # the dying states were stepped
+
+def sparseSteps(live, generations):
+    import life_sparse
+    for generation in range(generations):
+        live = life_sparse.nextLive(live)
+    return live
+
+def liveSoup(seed, size=16):
+    ys, xs = np.nonzero(soup(seed, size, size, margin=1))
+    return set(zip(xs.tolist(), ys.tolist()))
+
+@pytest.mark.parametrize('j', range(6))
+def test_hashlife_advance(j):
+    # the unbounded plane, against life_sparse
+    import life_hashlife
+    for seed in range(3):
+        live = liveSoup(seed)
+        universe = life_hashlife.hashlife()
+        universe.build(live)
+        universe.advance(j)
+        assert universe.generation == 1 << j
+        assert set(universe.liveCells()) == sparseSteps(live, 1 << j), seed
+
+@pytest.mark.parametrize('generations', [1, 5, 37, 100])
+def test_hashlife_step(generations):
+    import life_hashlife
+    live = liveSoup(4)
+    universe = life_hashlife.hashlife()
+    universe.build(live)
+    universe.step(generations)
+    assert universe.generation == generations
+    assert set(universe.liveCells()) == sparseSteps(live, generations)
+
+def test_hashlife_collects_its_nodes():
+    # memoized results of collected nodes are dropped with them
+    import life_hashlife
+    live = liveSoup(5, 24)
+    universe = life_hashlife.hashlife(max_nodes=300)
+    collected = []
+    collect = universe.collect
+    def counted():
+        collected.append(len(universe.nodes))
+        collect()
+        assert all(n in universe.nodes.values() for n, j in universe.memo)
+    universe.collect = counted
+    universe.build(live)
+    for generations in [1] * 40 + [3, 16, 7, 64]:
+        universe.step(generations)
+        live = sparseSteps(live, generations)
+        assert set(universe.liveCells()) == live, universe.generation
+    assert len(collected) > 10
+    assert len(universe.nodes) < max(collected)
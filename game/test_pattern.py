@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# checks for the pattern files, run with: python -m pytest game
+
+import numpy as np
+import pytest
+
+from gameoflife2 import ENGINES, game_of_life
+import life_pattern
+import life_render
+
+
+GLIDER = 'x = 3, y = 3, rule = B3/S23\nbob$2bo$3o!\n'
+
+def loaded(engine, path, width=16, height=12, **kwargs):
+    game = game_of_life(None, width, height, 1, None, None, None, engine=engine, **kwargs)
+    game.load_pattern(str(path))
+    cells = life_render.boardCells(game.life, width, height).copy()
+    if hasattr(game.life, 'close'):
+        game.life.close()
+    return cells
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+def test_load_pattern(engine, tmp_path):
+    path = tmp_path / 'glider.rle'
+    path.write_text(GLIDER)
+    expected = np.zeros((12, 16), dtype=np.uint8)
+    expected[4:7, 6:9] = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+    assert (loaded('dict', path) == expected).all()
+    assert (loaded(engine, path) == expected).all()
+
+@pytest.mark.parametrize('bits', [False, True])
+def test_load_pattern_into_a_memmap_window(bits, tmp_path):
+    # the pattern goes into the viewport, the rest of the board is cleared
+    import life_memmap
+    path = tmp_path / 'glider.rle'
+    path.write_text(GLIDER)
+    life = life_memmap.blankGrid(16, 12, str(tmp_path / 'board'), bits, board_width=100, board_height=40)
+    life.setRegion(0, 0, np.ones((40, 100), dtype=np.uint8))
+    life.setViewport(70, 20)
+    life_pattern.loadPattern(life, str(path), 16, 12)
+    board = life.region(0, 0, 100, 40)
+    assert board.sum() == 5
+    assert (board[24:27, 76:79] == [[0, 1, 0], [0, 0, 1], [1, 1, 1]]).all()
+
+@pytest.mark.parametrize('fmt', ['rle', 'life106', 'cells'])
+def test_save_and_load_round_trip(fmt, tmp_path):
+    cells = (np.random.default_rng(4).random((12, 16)) < 0.3).astype(np.uint8)
+    cells[0, 0] = cells[-1, -1] = 1 # the bounds are the whole board, the pattern loads in place
+    path = tmp_path / ('soup.' + {'rle': 'rle', 'life106': 'lif', 'cells': 'cells'}[fmt])
+    game = game_of_life(None, 16, 12, 1, None, None, None, engine='numpy')
+    game.loadCells(cells)
+    game.save_pattern(str(path))
+    assert life_pattern.patternFormat(str(path)) == fmt
+    assert (loaded('numpy', path) == cells).all()
+
+def test_rle_run_count_on_the_next_line(tmp_path):
+    # 1 / 2o is a run of 12, 2 / $ skips a row
+    path = tmp_path / 'rows.rle'
+    path.write_text('x = 12, y = 3\n1\n2o2\n$3bo!\n')
+    assert list(life_pattern.readRuns(str(path))) == [(0, 0, 12), (3, 2, 1)]
+    expected = np.zeros((3, 12), dtype=np.uint8)
+    expected[0] = 1
+    expected[2, 3] = 1
+    assert (loaded('numpy', path, 12, 3) == expected).all()
+
+def test_cells_ignore_trailing_whitespace(tmp_path):
+    path = tmp_path / 'blinker.cells'
+    path.write_text('!Name: blinker\n.O. \t\n.*.\r\n.O.\n')
+    assert list(life_pattern.readRuns(str(path))) == [(1, 0, 1), (1, 1, 1), (1, 2, 1)]
+
+def test_save_the_rule(tmp_path):
+    path = tmp_path / 'soup.rle'
+    cells = (np.random.default_rng(5).random((12, 16)) < 0.3).astype(np.uint8)
+    game = game_of_life(None, 16, 12, 1, None, None, None, rule='highlife')
+    game.loadCells(cells)
+    game.save_pattern(str(path))
+    assert path.read_text().startswith('x = 16, y = 12, rule = B36/S23\n')
+
+def test_save_dying_states(tmp_path):
+    # multi-state RLE: . dead, A live, B .. dying; dying cells load as dead
+    path = tmp_path / 'generations.rle'
+    cells = np.zeros((3, 30), dtype=np.uint8)
+    cells[0, :4] = [1, 2, 0, 3]
+    cells[2, 1:28] = 27
+    game = game_of_life(None, 30, 3, 1, (255, 255, 255), (0, 0, 0), None, rule='B2/S345/C28')
+    game.loadCells(cells)
+    game.save_pattern(str(path))
+    assert path.read_text() == 'x = 30, y = 3, rule = B2/S345/C28\nAB.C2$.27pC!\n'
+    expected = np.zeros((3, 30), dtype=np.uint8)
+    expected[0, 0] = 1
+    assert (loaded('numpy', path, 30, 3) == expected).all()
+    with pytest.raises(ValueError):
+        game.save_pattern(str(tmp_path / 'generations.cells'))
+    assert not (tmp_path / 'generations.cells').exists()
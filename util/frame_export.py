@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# headless frame export for the pygame animations
+#   a frame is copied out of the surface as raw RGB bytes and queued; a
+#   writer thread encodes it (PNG with zlib, which releases the GIL) and
+#   writes it, so encoding overlaps the simulation. the queue is bounded: a
+#   producer faster than the writer waits instead of piling up frames.
+#   formats:
+#     png   numbered files frame_000000.png ... in a directory
+#     raw   RGB bytes back to back on a stream (stdout for '-'), e.g.
+#           ... | ffmpeg -f rawvideo -pix_fmt rgb24 -s WxH -r 30 -i - out.mp4
+
+import os
+import queue
+import struct
+import sys
+import threading
+import zlib
+
+import pygame
+
+
+QUEUE_SIZE = 8 # frames waiting for the writer
+COMPRESS_LEVEL = 6
+
+def surfaceRGB(surface):
+    # (width, height, RGB bytes) of a surface
+    tobytes = getattr(pygame.image, 'tobytes', None) or pygame.image.tostring
+    width, height = surface.get_size()
+    return width, height, tobytes(surface, 'RGB')
+
+def pngChunk(tag, data):
+    chunk = tag + data
+    return struct.pack('>I', len(data)) + chunk + struct.pack('>I', zlib.crc32(chunk) & 0xffffffff)
+
+def encodePNG(width, height, rgb, level=COMPRESS_LEVEL):
+    # 8-bit RGB, no interlace, filter type 0 on every row
+    stride = width * 3
+    raw = b''.join(b'\x00' + rgb[y * stride:(y + 1) * stride] for y in range(height))
+    return (b'\x89PNG\r\n\x1a\n'
+            + pngChunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + pngChunk(b'IDAT', zlib.compress(raw, level))
+            + pngChunk(b'IEND', b''))
+
+class frame_writer:
+
+    def __init__(self, target, fmt='png', maxsize=QUEUE_SIZE, level=COMPRESS_LEVEL, pattern='frame_%06d.png'):
+        # target is a directory for 'png', a path, a binary stream or '-' for 'raw'
+        self.fmt = fmt
+        self.level = level
+        self.count = 0 # frames queued
+        self.size = None # (width, height) of the first frame, every frame must match
+        self.error = None
+        self.stream = None
+        self.owned = False
+        if fmt == 'png':
+            os.makedirs(target, exist_ok=True)
+            self.path = os.path.join(target, pattern)
+        elif fmt == 'raw':
+            if target == '-':
+                self.stream = sys.stdout.buffer
+            elif isinstance(target, str):
+                self.stream = open(target, 'wb')
+                self.owned = True
+            else:
+                self.stream = target
+        else:
+            raise ValueError("unknown frame format " + fmt)
+        self.frames = queue.Queue(maxsize)
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def write(self, surface):
+        # queues the surface's current image, waits while the queue is full
+        if self.error:
+            raise self.error
+        width, height, rgb = surfaceRGB(surface)
+        if self.size is None:
+            self.size = (width, height)
+        elif self.size != (width, height):
+            raise ValueError("frame size changed from %dx%d" % self.size)
+        self.frames.put((self.count, width, height, rgb))
+        self.count += 1
+
+    def run(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                return
+            if self.error:
+                continue # drain, the error is raised in the producer
+            index, width, height, rgb = frame
+            try:
+                if self.fmt == 'png':
+                    with open(self.path % index, 'wb') as f:
+                        f.write(encodePNG(width, height, rgb, self.level))
+                else:
+                    self.stream.write(rgb)
+            except Exception as e:
+                self.error = e
+
+    def close(self):
+        # writes the queued frames and stops the writer
+        self.frames.put(None)
+        self.worker.join()
+        if self.stream is not None:
+            self.stream.flush()
+            if self.owned:
+                self.stream.close()
+        if self.error:
+            raise self.error
@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# checks for the Voronoi modules, run with: python -m pytest util
+
+import random
+
+import numpy as np
+
+import voronoi_clip
+from voronoi_fortune_algorithm import Voronoi
+from voronoi_incremental import DelaunayVoronoi, incircle, orient
+
+
+def equidistant(lines, sites, box, samples=(0.25, 0.5, 0.75)):
+    # points of the edges inside box that are not equally far from their two nearest sites
+    x0, y0, x1, y1 = box
+    bad = []
+    for a, b, c, d, *_ in lines:
+        for t in samples:
+            x = a + t * (c - a)
+            y = b + t * (d - b)
+            if not (x0 <= x <= x1 and y0 <= y <= y1):
+                continue
+            near = sorted((x - sx)**2 + (y - sy)**2 for sx, sy in sites)
+            if near[1] - near[0] > 1e-6 * (1.0 + near[0]):
+                bad.append((x, y))
+    return bad
+
+def sweep(sites):
+    v = Voronoi(sites)
+    v.process()
+    return v
+
+def test_site_on_breakpoint():
+    # (8, 5) lands on the breakpoint of (2, 3) and (2, 7) at y = 5
+    sites = [(8, 5), (2, 3), (2, 7), (5, 12)]
+    assert equidistant(sweep(sites).get_output(), sites, (-10, -10, 20, 20)) == []
+
+def test_same_sites_same_output():
+    rng = random.Random(4)
+    sites = list(dict.fromkeys((rng.randint(0, 100), rng.randint(0, 100)) for _ in range(60)))
+    first = sweep(sites).get_output()
+    for run in range(3):
+        assert sweep(sites).get_output() == first
+
+def test_random_sites():
+    rng = random.Random(3)
+    for trial in range(50):
+        sites = [(rng.uniform(0, 500), rng.uniform(0, 500)) for _ in range(rng.randint(2, 80))]
+        assert equidistant(sweep(sites).get_output(), sites, (0, 0, 500, 500)) == []
+
+def flat_triangles(dv):
+    return [t for t, (a, b, c) in dv.triangles.items()
+            if orient(dv.points[a], dv.points[b], dv.points[c]) <= 0]
+
+def edge_sites(dv):
+    # site pairs of the Voronoi edges longer than a point
+    return {tuple(sorted((dv.site(u), dv.site(v)))) for (u, v), (x0, y0, x1, y1) in dv.edges.items()
+            if abs(x1 - x0) + abs(y1 - y0) > 1e-7}
+
+def test_site_on_hull_edge():
+    # (60, 27) splits the hull edge (60, 24) - (60, 28), the circle across
+    # it goes through a super vertex at infinity
+    dv = DelaunayVoronoi(0, 0, 60, 60)
+    for x, y in [(0, 0), (0, 60), (30, 30), (60, 24), (60, 28), (60, 27)]:
+        dv.insert_site(x, y)
+    assert flat_triangles(dv) == []
+    pairs = edge_sites(dv)
+    assert ((60.0, 24.0), (60.0, 27.0)) in pairs
+    assert ((60.0, 27.0), (60.0, 28.0)) in pairs
+    assert ((60.0, 24.0), (60.0, 28.0)) not in pairs
+
+def test_insert_remove_integer_sites():
+    # many colinear and cocircular sites on a small grid
+    rng = random.Random(19)
+    dv = DelaunayVoronoi(0, 0, 20, 20)
+    live = {}
+    for step in range(400):
+        if live and rng.random() < 0.4:
+            dv.remove_site(live.pop(rng.choice(sorted(live))))
+        else:
+            p = (rng.randint(0, 20), rng.randint(0, 20))
+            if p not in live:
+                live[p] = dv.insert_site(*p)
+        assert flat_triangles(dv) == []
+    sites = [dv.site(s) for s in dv.sites()]
+    for a, b, c in dv.triangles.values():
+        if min(a, b, c) >= 3:
+            assert not any(incircle(dv.points[a], dv.points[b], dv.points[c], q) > 0 for q in sites)
+    fresh = DelaunayVoronoi(0, 0, 20, 20)
+    for p in live:
+        fresh.insert_site(*p)
+    assert edge_sites(dv) == edge_sites(fresh)
+
+def fortune_sites(v):
+    # site pairs of the edges of the sweep longer than a point
+    pairs = set()
+    for o in v.output:
+        if o.sites is not None and o.start is not None and o.end is not None:
+            if abs(o.end.x - o.start.x) + abs(o.end.y - o.start.y) > 1e-7:
+                pairs.add(tuple(sorted(tuple(map(float, p.get())) for p in o.sites)))
+    return pairs
+
+def test_edges_match_fortune():
+    # nearly colinear hull sites keep their edge, which a finite super-triangle loses
+    rng = random.Random(8)
+    for trial in range(200):
+        sites = list(dict.fromkeys((rng.randint(0, 500), rng.randint(0, 500)) for _ in range(rng.randint(3, 40))))
+        dv = DelaunayVoronoi(0, 0, 500, 500)
+        for p in sites:
+            dv.insert_site(*p)
+        assert edge_sites(dv) == fortune_sites(sweep(sites)), trial
+        assert equidistant(dv.get_output(), sites, (0, 0, 500, 500)) == []
+
+def check_dcel(dcel, box):
+    x0, y0, x1, y1 = box
+    areas = dcel.areas()
+    assert (areas >= -1e-9).all()
+    assert abs(areas.sum() - (x1 - x0) * (y1 - y0)) < 1e-6 * (x1 - x0) * (y1 - y0)
+    inner = np.flatnonzero(dcel.twin >= 0)
+    twin = dcel.twin[inner]
+    assert (dcel.twin[twin] == inner).all()
+    assert (dcel.origin[twin] == dcel.origin[dcel.next[inner]]).all()
+    assert (dcel.cell[twin] == dcel.across[inner]).all()
+    # every centroid lies in its own site's cell
+    centroids = dcel.centroids()
+    full = np.flatnonzero(areas > 0)
+    nearest = ((centroids[full, None, :] - dcel.sites[None]) ** 2).sum(axis=2).argmin(axis=1)
+    assert (nearest == dcel.cell_site[full]).all()
+
+def test_dcel():
+    rng = random.Random(1)
+    box = (0, 0, 500, 500)
+    for trial in range(30):
+        sites = [(rng.uniform(0, 500), rng.uniform(0, 500)) for _ in range(rng.randint(2, 60))]
+        fortune = sweep(sites).get_dcel(box)
+        check_dcel(fortune, box)
+        dv = DelaunayVoronoi(*box)
+        ids = [dv.insert_site(*p) for p in sites]
+        delaunay = dv.get_dcel(box)
+        check_dcel(delaunay, box)
+        order = [dv.sites().index(i) for i in ids]
+        assert np.allclose(fortune.areas(), delaunay.areas()[order], atol=1e-6)
+        pairs = {tuple(sorted((order.index(a), order.index(b)))) for a, b in delaunay.neighbours().tolist()}
+        assert set(map(tuple, fortune.neighbours().tolist())) == pairs
+
+def test_dcel_integer_sites():
+    rng = random.Random(2)
+    box = (-1, -1, 101, 101)
+    for trial in range(30):
+        sites = list(dict.fromkeys((rng.randint(0, 100), rng.randint(0, 100)) for _ in range(40)))
+        dv = DelaunayVoronoi(*box)
+        for p in sites:
+            dv.insert_site(*p)
+        check_dcel(dv.get_dcel(box), box)
+
+def clip_reference(segment, box):
+    # one segment at a time, Liang-Barsky
+    x0, y0, x1, y1 = segment
+    dx = x1 - x0
+    dy = y1 - y0
+    u0, u1 = 0.0, 1.0
+    for p, q in ((-dx, x0 - box[0]), (dx, box[2] - x0), (-dy, y0 - box[1]), (dy, box[3] - y0)):
+        if p == 0:
+            if q < 0:
+                return None
+        elif p < 0:
+            u0 = max(u0, q / p)
+        else:
+            u1 = min(u1, q / p)
+    if u0 > u1:
+        return None
+    return (x0 + u0*dx, y0 + u0*dy, x0 + u1*dx, y0 + u1*dy)
+
+def test_clip_segments():
+    rng = random.Random(5)
+    box = (0.0, 0.0, 500.0, 500.0)
+    segments = [tuple(rng.uniform(-300, 800) for _ in range(4)) for _ in range(2000)]
+    # on, along and outside the sides, and single points
+    segments += [(100, -10, 100, 600), (-10, 100, 600, 100), (600, 0, 700, 10),
+                 (600, 100, 600, 200), (0, 0, 0, 0), (250, 250, 250, 250), (0, 0, 500, 0)]
+    clipped, index = voronoi_clip.clip_segments(segments, box)
+    reference = [(i, clip_reference(s, box)) for i, s in enumerate(segments)]
+    reference = [(i, s) for i, s in reference if s is not None]
+    assert index.tolist() == [i for i, s in reference]
+    assert np.allclose(clipped, [s for i, s in reference])
+
+def test_box_edges_close_the_cells():
+    rng = random.Random(6)
+    box = (0.0, 0.0, 500.0, 500.0)
+    sites = [(rng.uniform(0, 500), rng.uniform(0, 500)) for _ in range(100)]
+    v = sweep(sites)
+    clipped, index = voronoi_clip.clip_segments([line[:4] for line in v.get_output()], box)
+    sides = voronoi_clip.box_edges(clipped, box)
+    length = np.hypot(sides[:, 2] - sides[:, 0], sides[:, 3] - sides[:, 1])
+    assert abs(length.sum() - 2000.0) < 1e-6
+    assert (length > 0).all()
+    # one side piece per cell along the border
+    assert len(sides) == (v.get_dcel(box).twin < 0).sum()
@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# Clipping of Voronoi edges to a rectangle, all segments at once.
+#   clip_segments: Liang-Barsky over an (N, 4) array x0, y0, x1, y1. Each
+#                  segment is x = p + u * d, u in [0, 1]; every box side
+#                  raises the entering u or lowers the leaving u, and a
+#                  segment is kept when entering <= leaving.
+#   box_edges:     the box sides between the points where edges meet the
+#                  box, so the cells along the border are closed.
+#
+# reference
+# https://en.wikipedia.org/wiki/Liang%E2%80%93Barsky_algorithm
+
+import numpy as np
+
+
+TOLERANCE = 1e-9 # relative to the box size, for points on the box
+
+def clip_segments(segments, box):
+    # (clipped (M, 4), indices of the kept segments in segments)
+    s = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    xmin, ymin, xmax, ymax = box
+    x0, y0 = s[:, 0], s[:, 1]
+    dx = s[:, 2] - x0
+    dy = s[:, 3] - y0
+    u0 = np.zeros(len(s))
+    u1 = np.ones(len(s))
+    keep = np.ones(len(s), dtype=bool)
+    for p, q in ((-dx, x0 - xmin), (dx, xmax - x0), (-dy, y0 - ymin), (dy, ymax - y0)):
+        # parallel to this side and outside it
+        keep &= (p != 0) | (q >= 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            u = q / p
+        u0 = np.where(p < 0, np.maximum(u0, u), u0)
+        u1 = np.where(p > 0, np.minimum(u1, u), u1)
+    keep &= u0 <= u1
+    index = np.flatnonzero(keep)
+    u0 = u0[index]
+    u1 = u1[index]
+    x0, y0, dx, dy = x0[index], y0[index], dx[index], dy[index]
+    clipped = np.stack((x0 + u0*dx, y0 + u0*dy, x0 + u1*dx, y0 + u1*dy), axis=1)
+    return clipped, index
+
+def perimeter(points, box):
+    # distance along the box boundary, counter clockwise from (xmin, ymin),
+    # nan for points not on the boundary
+    xmin, ymin, xmax, ymax = box
+    w = xmax - xmin
+    h = ymax - ymin
+    tolerance = TOLERANCE * max(w, h, 1.0)
+    x, y = points[:, 0], points[:, 1]
+    s = np.full(len(points), np.nan)
+    # the later sides win at the corners, which fall on both
+    for on, where in ((np.abs(y - ymin) <= tolerance, x - xmin),
+                      (np.abs(x - xmax) <= tolerance, w + (y - ymin)),
+                      (np.abs(y - ymax) <= tolerance, w + h + (xmax - x)),
+                      (np.abs(x - xmin) <= tolerance, 2*w + h + (ymax - y))):
+        s = np.where(on, where, s)
+    return np.mod(s, 2*(w + h))
+
+def along(s, box):
+    # points at distances s along the box boundary
+    xmin, ymin, xmax, ymax = box
+    w = xmax - xmin
+    h = ymax - ymin
+    s = np.mod(s, 2*(w + h))
+    x = np.select((s <= w, s <= w + h, s <= 2*w + h), (xmin + s, xmax, xmax - (s - w - h)), xmin)
+    y = np.select((s <= w, s <= w + h, s <= 2*w + h), (ymin, ymin + (s - w), ymax), ymax - (s - 2*w - h))
+    return np.stack((x, y), axis=1)
+
+def box_edges(segments, box):
+    # (K, 4) box sides split at the segment end points lying on the box
+    s = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    xmin, ymin, xmax, ymax = box
+    w = xmax - xmin
+    h = ymax - ymin
+    tolerance = TOLERANCE * max(w, h, 1.0)
+    hits = perimeter(np.concatenate((s[:, :2], s[:, 2:])), box)
+    hits = hits[~np.isnan(hits)]
+    # the corners split the sides too
+    stops = np.sort(np.concatenate((hits, [0.0, w, w + h, 2*w + h])))
+    stops = stops[np.concatenate(([True], np.diff(stops) > tolerance))]
+    if stops[-1] > 2*(w + h) - tolerance: # the same point as 0, round the box
+        stops = stops[:-1]
+    start = along(stops, box)
+    end = along(np.roll(stops, -1), box)
+    return np.hstack((start, end))
+
+def clip_lines(lines, box, close=True, color=(0, 0, 0)):
+    # lines as from Voronoi.get_output, (x0, y0, x1, y1, color); the box
+    # sides come last, in color, when close is set
+    if not lines:
+        return []
+    clipped, index = clip_segments([line[:4] for line in lines], box)
+    res = [(x0, y0, x1, y1, lines[i][4]) for (x0, y0, x1, y1), i in zip(clipped.tolist(), index.tolist())]
+    if close:
+        res += [(x0, y0, x1, y1, color) for x0, y0, x1, y1 in box_edges(clipped, box).tolist()]
+    return res
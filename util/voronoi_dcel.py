@@ -0,0 +1,175 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# Voronoi diagram as a half-edge structure (DCEL) in flat NumPy arrays.
+#   Every cell is the bounding box clipped by the bisector half-planes of the
+#   site and each of its neighbours (the site pairs of the diagram's edges),
+#   so unbounded cells end at the box. Each half-edge remembers the neighbour
+#   across it, which gives the twins exactly; half-edges along the box have
+#   no twin (-1).
+#
+#   vertices      (V, 2) float   vertex coordinates
+#   origin        (E,) int       vertex a half-edge starts at
+#   twin          (E,) int       opposite half-edge, -1 on the box
+#   next          (E,) int       next half-edge around the same cell
+#   cell          (E,) int       cell on the left of a half-edge
+#   cell_offsets  (C+1,) int     half-edges of cell c are cell_offsets[c]:cell_offsets[c+1]
+#   cell_site     (C,) int       site of each cell
+#   sites         (S, 2) float   site coordinates
+
+import numpy as np
+
+
+BOX_EDGE = -1 # neighbour across a half-edge on the box
+TOLERANCE = 1e-9 # relative to the box size, for merging vertices
+
+def clip(polygon, s, t, label):
+    # Sutherland-Hodgman: keeps the part of polygon closer to s than to t.
+    # polygon is [(x, y, label of the edge to the next vertex)]
+    nx = 2.0 * (t[0] - s[0])
+    ny = 2.0 * (t[1] - s[1])
+    c = (t[0]**2 + t[1]**2) - (s[0]**2 + s[1]**2)
+    result = []
+    n = len(polygon)
+    for i in range(n):
+        px, py, edge = polygon[i]
+        qx, qy, _ = polygon[(i + 1) % n]
+        dp = nx*px + ny*py - c
+        dq = nx*qx + ny*qy - c
+        if dp <= 0:
+            if dq <= 0:
+                result.append((px, py, edge))
+            else:
+                # leaving: along the bisector to where the polygon comes back
+                result.append((px, py, edge))
+                r = dp / (dp - dq)
+                result.append((px + r*(qx - px), py + r*(qy - py), label))
+        elif dq <= 0:
+            # entering: the rest of this edge
+            r = dp / (dp - dq)
+            result.append((px + r*(qx - px), py + r*(qy - py), edge))
+    return result
+
+def clean(polygon, tolerance):
+    # drops zero length edges, the later vertex keeps its label
+    changed = True
+    while changed and len(polygon) > 2:
+        changed = False
+        n = len(polygon)
+        for i in range(n):
+            px, py, _ = polygon[i]
+            qx, qy, _ = polygon[(i + 1) % n]
+            if abs(px - qx) <= tolerance and abs(py - qy) <= tolerance:
+                del polygon[i]
+                changed = True
+                break
+    return polygon if len(polygon) > 2 else []
+
+def clip_cell(sites, s, neighbours, box, tolerance):
+    x0, y0, x1, y1 = box
+    polygon = [(x0, y0, BOX_EDGE), (x1, y0, BOX_EDGE), (x1, y1, BOX_EDGE), (x0, y1, BOX_EDGE)]
+    for t in neighbours:
+        polygon = clip(polygon, sites[s], sites[t], t)
+        if not polygon:
+            break
+    return clean(polygon, tolerance)
+
+def find_vertex(vertex_ids, vertices, x, y, tolerance):
+    # index of the vertex at (x, y), a new one unless there is one within
+    # tolerance; the 3 x 3 grid cells around catch neighbours rounded apart
+    kx = round(x / tolerance)
+    ky = round(y / tolerance)
+    for dx in (0, -1, 1):
+        for dy in (0, -1, 1):
+            v = vertex_ids.get((kx + dx, ky + dy))
+            if v is not None and abs(vertices[v][0] - x) <= tolerance and abs(vertices[v][1] - y) <= tolerance:
+                return v
+    v = vertex_ids[(kx, ky)] = len(vertices)
+    vertices.append((x, y))
+    return v
+
+class VoronoiDCEL:
+    def __init__(self, sites, pairs, box):
+        # sites: [(x, y)], pairs: neighbouring site indices, box: (x0, y0, x1, y1)
+        self.box = box
+        self.sites = np.asarray(sites, dtype=np.float64).reshape(-1, 2)
+        count = len(self.sites)
+        neighbours = [set() for s in range(count)]
+        for a, b in pairs:
+            if a != b:
+                neighbours[a].add(b)
+                neighbours[b].add(a)
+        tolerance = TOLERANCE * max(box[2] - box[0], box[3] - box[1], 1.0)
+        sites = [tuple(p) for p in self.sites.tolist()]
+
+        vertex_ids = {} # (x, y) rounded to tolerance -> vertex
+        vertices = []
+        origin = []
+        across = []
+        cell = []
+        offsets = [0]
+        for s in range(count):
+            polygon = clip_cell(sites, s, sorted(neighbours[s]), box, tolerance)
+            for x, y, label in polygon:
+                v = find_vertex(vertex_ids, vertices, x, y, tolerance)
+                origin.append(v)
+                across.append(label)
+                cell.append(s)
+            offsets.append(len(origin))
+
+        self.vertices = np.array(vertices, dtype=np.float64).reshape(-1, 2)
+        self.origin = np.array(origin, dtype=np.int64)
+        self.cell = np.array(cell, dtype=np.int64)
+        self.cell_offsets = np.array(offsets, dtype=np.int64)
+        self.cell_site = np.arange(count, dtype=np.int64)
+        # next: the following half-edge of the cell, wrapping around
+        index = np.arange(len(origin), dtype=np.int64)
+        self.next = index + 1
+        last = self.cell_offsets[1:][np.diff(self.cell_offsets) > 0] - 1
+        self.next[last] = self.cell_offsets[:-1][np.diff(self.cell_offsets) > 0]
+        # twin: the half-edge of the neighbour's cell across from this one
+        self.across = np.array(across, dtype=np.int64)
+        half = {(c, a): e for e, (c, a) in enumerate(zip(cell, across)) if a != BOX_EDGE}
+        self.twin = np.array([half.get((a, c), -1) if a != BOX_EDGE else -1
+                              for c, a in zip(cell, across)], dtype=np.int64)
+
+    # -- queries, vectorized over all cells --
+
+    def cross(self):
+        # per half-edge x_i * y_next - x_next * y_i
+        p = self.vertices[self.origin]
+        q = self.vertices[self.origin[self.next]]
+        return p, q, p[:, 0]*q[:, 1] - q[:, 0]*p[:, 1]
+
+    def areas(self):
+        p, q, cross = self.cross()
+        return 0.5 * np.bincount(self.cell, cross, minlength=len(self.cell_site))
+
+    def centroids(self):
+        # (C, 2), nan for empty cells
+        p, q, cross = self.cross()
+        count = len(self.cell_site)
+        area = 0.5 * np.bincount(self.cell, cross, minlength=count)
+        cx = np.bincount(self.cell, (p[:, 0] + q[:, 0]) * cross, minlength=count)
+        cy = np.bincount(self.cell, (p[:, 1] + q[:, 1]) * cross, minlength=count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.stack((cx, cy), axis=1) / (6.0 * area)[:, None]
+
+    def neighbours(self):
+        # (M, 2) cell pairs sharing an edge, each pair once
+        inner = self.twin >= 0
+        a = self.cell[inner]
+        b = self.cell[self.twin[inner]]
+        keep = a < b
+        return np.stack((a[keep], b[keep]), axis=1)
+
+    def cell_polygon(self, c):
+        # (k, 2) vertices of a cell, in order
+        return self.vertices[self.origin[self.cell_offsets[c]:self.cell_offsets[c + 1]]]
+
+    def segments(self):
+        # (M, 4) x0, y0, x1, y1 of the edges, each inner edge once, box edges included
+        e = np.flatnonzero((self.twin < 0) | (self.twin > np.arange(len(self.twin))))
+        p = self.vertices[self.origin[e]]
+        q = self.vertices[self.origin[self.next[e]]]
+        return np.hstack((p, q))
@@ -1,6 +1,9 @@
 #!/usr/bin/python3
 # -*- coding: UTF-8 -*-
 
+import os
+# no pygame banner on stdout, it may carry raw frames (--export -)
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
 import pygame, sys
 from pygame.locals import *
 import random
@@ -8,6 +11,10 @@ import math
 import heapq
 import itertools
 import re
+import argparse
+
+import voronoi_clip
+import voronoi_incremental
 
 
 #Number of frames per second
@@ -33,8 +40,7 @@ dark_gray = (100, 100, 100)
 # http://www.cs.hmc.edu/~mbrubeck/voronoi.html (C++).
 
 class Point:
-    x = 0.0
-    y = 0.0
+    __slots__ = ('x', 'y')
    
     def __init__(self, x, y):
         self.x = x
@@ -45,25 +51,18 @@ class Point:
   
 
 class Event:
-    x = 0.0
-    y = 0.0 # dummy
-    p = None
-    a = None
-    valid = True
+    __slots__ = ('x', 'y', 'p', 'a', 'valid')
     
     def __init__(self, x, p, a):
         self.x = x
+        self.y = 0.0 # dummy
         self.p = p
         self.a = a
         self.valid = True
 
 class Arc:
-    p = None
-    pprev = None
-    pnext = None
-    e = None
-    s0 = None
-    s1 = None
+    # left, right, parent, priority: node of the BeachLine treap
+    __slots__ = ('p', 'pprev', 'pnext', 'e', 's0', 's1', 'left', 'right', 'parent', 'priority')
     
     def __init__(self, p, a=None, b=None):
         self.p = p
@@ -72,17 +71,94 @@ class Arc:
         self.e = None
         self.s0 = None
         self.s1 = None
+        self.left = None
+        self.right = None
+        self.parent = None
+        self.priority = 0.0
+
+# The arcs of the beach line, bottom to top, as a treap: a binary tree in
+# pprev/pnext order, balanced by random priorities (a heap on priority), so
+# an arc is found in O(log n) by comparing with the breakpoints at the sweep
+# line, and inserted or removed with O(log n) rotations.
+class BeachLine:
+    def __init__(self):
+        self.root = None
+        self.random = random.Random(0) # seeded, the same sites build the same tree; the module's random is untouched
+
+    def first(self):
+        i = self.root
+        while i != None and i.left != None:
+            i = i.left
+        return i
+
+    def last(self):
+        i = self.root
+        while i != None and i.right != None:
+            i = i.right
+        return i
+
+    def insert_first(self, a):
+        a.priority = self.random.random()
+        self.root = a
+
+    def insert_after(self, i, a):
+        # a becomes the next arc after i
+        a.priority = self.random.random()
+        if i.right == None:
+            i.right = a
+        else:
+            i = i.right
+            while i.left != None:
+                i = i.left
+            i.left = a
+        a.parent = i
+        while a.parent != None and a.parent.priority < a.priority:
+            self.rotate_up(a)
+
+    def remove(self, a):
+        # rotate a down to a leaf, then unlink it
+        while a.left != None and a.right != None:
+            if a.left.priority > a.right.priority:
+                self.rotate_up(a.left)
+            else:
+                self.rotate_up(a.right)
+        child = a.left if a.left != None else a.right
+        self.replace(a, child)
+        a.left = a.right = a.parent = None
+
+    def replace(self, a, b):
+        # b takes a's place under a's parent
+        if b != None:
+            b.parent = a.parent
+        if a.parent == None:
+            self.root = b
+        elif a.parent.left is a:
+            a.parent.left = b
+        else:
+            a.parent.right = b
+
+    def rotate_up(self, a):
+        p = a.parent
+        self.replace(p, a)
+        if p.left is a:
+            p.left = a.right
+            if a.right != None: a.right.parent = p
+            a.right = p
+        else:
+            p.right = a.left
+            if a.left != None: a.left.parent = p
+            a.left = p
+        p.parent = a
 
 class Segment:
-    start = None
-    end = None
-    done = False
+    __slots__ = ('start', 'end', 'done', 'color', 'sites')
     
-    def __init__(self, p, color = BLACK):
+    def __init__(self, p, color = BLACK, sites = None):
         self.start = p
         self.end = None
         self.done = False
         self.color = color
+        self.sites = sites # the two site Points the edge separates
 
     def finish(self, p):
         if self.done: return
@@ -99,52 +175,80 @@ class Segment:
         else:
             return None
 
-class PriorityQueue:
-    def __init__(self):
-        self.pq = []
-        self.entry_finder = {}
-        self.counter = itertools.count()
+# Site events: all known up front, sorted once by (x, y) and read with a cursor.
+class SiteQueue:
+    def __init__(self, points):
+        self.points = sorted(points, key=lambda p: (p.x, p.y)) # stable, equal sites keep their order
+        self.cursor = 0
 
-    def push(self, item):
-        # check for duplicate
-        if item in self.entry_finder: return
-        count = next(self.counter)
-        # use x-coordinate as a primary key (heapq in python is min-heap)
-        entry = [(item.x,item.y), count, item]
-        self.entry_finder[item] = entry
-        heapq.heappush(self.pq, entry)
+    def pop(self):
+        if self.cursor >= len(self.points):
+            raise KeyError('pop from an empty site queue')
+        p = self.points[self.cursor]
+        self.cursor += 1
+        return p
 
-    def remove_entry(self, item):
-        entry = self.entry_finder.pop(item)
-        entry[-1] = 'Removed'
+    def top(self):
+        if self.cursor >= len(self.points):
+            raise KeyError('top from an empty site queue')
+        return self.points[self.cursor]
+
+    def empty(self):
+        return self.cursor >= len(self.points)
+
+# Circle events: a heap on x. Invalidated events stay in the heap as
+# tombstones and are skipped when they reach the top; once they are more than
+# COMPACT_FRACTION of the heap it is rebuilt without them.
+COMPACT_FRACTION = 0.5
+COMPACT_MIN = 64 # no rebuild for small heaps
+
+class CircleQueue:
+    def __init__(self):
+        self.pq = [] # (x, y, count, event)
+        self.counter = itertools.count()
+        self.dead = 0 # tombstones in pq
+
+    def push(self, e):
+        heapq.heappush(self.pq, (e.x, e.y, next(self.counter), e))
+
+    def invalidate(self, e):
+        if not e.valid: return
+        e.valid = False
+        self.dead += 1
+        if self.dead > COMPACT_MIN and self.dead > COMPACT_FRACTION * len(self.pq):
+            self.pq = [entry for entry in self.pq if entry[3].valid]
+            heapq.heapify(self.pq)
+            self.dead = 0
+
+    def discard(self):
+        # drop the tombstones at the top
+        while self.pq and not self.pq[0][3].valid:
+            heapq.heappop(self.pq)
+            self.dead -= 1
 
     def pop(self):
-        while self.pq:
-            priority, count, item = heapq.heappop(self.pq)
-            if item != 'Removed':
-                del self.entry_finder[item]
-                return item
-        raise KeyError('pop from an empty priority queue')
+        self.discard()
+        if not self.pq:
+            raise KeyError('pop from an empty priority queue')
+        return heapq.heappop(self.pq)[3]
 
     def top(self):
-        while self.pq:
-            priority, count, item = heapq.heappop(self.pq)
-            if item != 'Removed':
-                del self.entry_finder[item]
-                self.push(item)
-                return item
-        raise KeyError('top from an empty priority queue')
+        self.discard()
+        if not self.pq:
+            raise KeyError('top from an empty priority queue')
+        return self.pq[0][3]
 
     def empty(self):
+        self.discard()
         return len(self.pq) == 0
 
 class Voronoi:
     def __init__(self, points):
         self.output = [] # list of line segment
-        self.arc = None  # binary tree for parabola arcs
+        self.arc = None  # first parabola arc, the arcs are linked by pprev/pnext
+        self.beach = BeachLine() # the same arcs as a balanced tree, to locate an arc
 
-        self.points = PriorityQueue() # site events
-        self.event = PriorityQueue() # circle events
+        self.event = CircleQueue() # circle events
 
         # bounding box
         self.X0 = -50.0
@@ -153,14 +257,19 @@ class Voronoi:
         self.Y1 = 550.0
 
         # insert points to site event
+        sites = []
+        self.site_index = {} # id of a site Point -> its index in points
         for pts in points:
             point = Point(pts[0], pts[1])
-            self.points.push(point)
+            self.site_index[id(point)] = len(sites)
+            sites.append(point)
             # keep track of bounding box size
             if point.x < self.X0: self.X0 = point.x
             if point.y < self.Y0: self.Y0 = point.y
             if point.x > self.X1: self.X1 = point.x
             if point.y > self.Y1: self.Y1 = point.y
+        self.sites = sites
+        self.points = SiteQueue(sites) # site events
 
         # add 20% margins to the bounding box
         dx = (self.X1 - self.X0 + 1.0) / 5.0
@@ -196,11 +305,12 @@ class Voronoi:
 
         if e.valid:
             # start new edge
-            s = Segment(e.p, RED)
+            s = Segment(e.p, RED, (e.a.pprev.p, e.a.pnext.p))
             self.output.append(s)
 
             # remove associated arc (parabola) from the front
             a = e.a
+            self.beach.remove(a)
             if a.pprev != None:
                 a.pprev.pnext = a.pnext
                 a.pprev.s1 = s
@@ -220,66 +330,105 @@ class Voronoi:
             if a.pnext != None: 
                 self.check_circle_event(a.pnext, e.x)
 
+    # The arc above height p.y at sweep line x = p.x: the first arc whose upper
+    # breakpoint is not below p.y, so of two arcs meeting at p.y the lower one.
+    def locate_arc(self, p):
+        found = None
+        i = self.beach.root
+        while i != None:
+            if i.pnext == None or self.intersection_y(i.p, i.pnext.p, 1.0*p.x) >= p.y:
+                found = i
+                i = i.left
+            else:
+                i = i.right
+        return found
+
     def front_insert(self, p):
         if self.arc == None:
             self.arc = Arc(p)
+            self.beach.insert_first(self.arc)
             return
         
         # find the current arc(s) at height p.y (if there are any).
-        i = self.arc # root
-        while i != None:
-            flag1, z = self.intersect(p, i)
-            if flag1:
-                # New parabola intersects arc i. If necessary, duplicate i.
-                if i.pnext == None:
-                    i.pnext = Arc(i.p, i)
-                else:
-                    flag2, zz = self.intersect(p, i.pnext)
-                    if (not flag2):
-                        i.pnext.pprev = Arc(i.p, i, i.pnext)
-                        i.pnext = i.pnext.pprev
-                    else:
-                        i.pnext = Arc(i.p, i)
-                i.pnext.s1 = i.s1
-
-                # add p between i and i.pnext
-                i.pnext.pprev = Arc(p, i, i.pnext)
-                i.pnext = i.pnext.pprev
-
-                i = i.pnext # now i points to the new arc
-
-                # add new half-edges connected to i's endpoints
-                seg = Segment(z, BLUE)
-                self.output.append(seg)
-                i.s0 = seg
-                i.pprev.s1 = i.s0
-
-                seg = Segment(z, GREEN)
-                self.output.append(seg)
-                i.s1 = seg
-                i.pnext.s0 = i.s1
-
-                # check for new circle events around the new arc
-                self.check_circle_event(i, p.x)
-                self.check_circle_event(i.pprev, p.x)
-                self.check_circle_event(i.pnext, p.x)
-
-                return
-                    
-            i = i.pnext
+        i = self.locate_arc(p)
+        flag1, z = self.intersect(p, i)
+        if not flag1:
+            # degenerate arc at the same x as p (sites sharing the smallest x),
+            # look at the arcs in order as the linear scan does
+            i = self.arc # root
+            while i != None:
+                flag1, z = self.intersect(p, i)
+                if flag1:
+                    break
+                i = i.pnext
+        if flag1 and i.pnext != None and self.on_breakpoint(p, i):
+            # p sits right on the breakpoint of i and i.pnext: a Voronoi vertex,
+            # the new arc goes between them and i is not split
+            j = Arc(p, i, i.pnext)
+            i.pnext.pprev = j
+            i.pnext = j
+            self.beach.insert_after(i, j)
+            if i.s1 != None:
+                i.s1.finish(z)
+
+            seg = Segment(z, BLUE, (i.p, p))
+            self.output.append(seg)
+            i.s1 = j.s0 = seg
+
+            seg = Segment(z, GREEN, (p, j.pnext.p))
+            self.output.append(seg)
+            j.s1 = j.pnext.s0 = seg
+
+            self.check_circle_event(i, p.x)
+            self.check_circle_event(j, p.x)
+            self.check_circle_event(j.pnext, p.x)
+
+            return
+        if flag1:
+            # New parabola intersects arc i. Duplicate i, the copy goes
+            # between the new arc and the old i.pnext.
+            i.pnext = Arc(i.p, i, i.pnext)
+            if i.pnext.pnext != None:
+                i.pnext.pnext.pprev = i.pnext
+            self.beach.insert_after(i, i.pnext)
+            i.pnext.s1 = i.s1
+
+            # add p between i and i.pnext
+            i.pnext.pprev = Arc(p, i, i.pnext)
+            i.pnext = i.pnext.pprev
+            self.beach.insert_after(i, i.pnext)
+
+            i = i.pnext # now i points to the new arc
+
+            # add new half-edges connected to i's endpoints
+            seg = Segment(z, BLUE, (i.pprev.p, p))
+            self.output.append(seg)
+            i.s0 = seg
+            i.pprev.s1 = i.s0
+
+            seg = Segment(z, GREEN, (p, i.pnext.p))
+            self.output.append(seg)
+            i.s1 = seg
+            i.pnext.s0 = i.s1
+
+            # check for new circle events around the new arc
+            self.check_circle_event(i, p.x)
+            self.check_circle_event(i.pprev, p.x)
+            self.check_circle_event(i.pnext, p.x)
+
+            return
 
         # special case: If p never intersects an arc, append it to the list
-        i = self.arc # root
-        while i.pnext != None: # Fine the last node.
-            i = i.pnext
+        i = self.beach.last() # the last node.
         
         i.pnext = Arc(p, i)
+        self.beach.insert_after(i, i.pnext)
         # insert new segment between p and i
         x = self.X0
         y = (i.pnext.p.y + i.p.y) / 2.0
         start = Point(x, y)
 
-        seg = Segment(start, BLACK) # BUG
+        seg = Segment(start, BLACK, (i.p, p)) # BUG
         i.s1 = i.pnext.s0 = seg
         self.output.append(seg)
 
@@ -287,7 +436,7 @@ class Voronoi:
     def check_circle_event(self, i, x0_):
         # Invalidate any old event.
         if (i.e != None) and (i.e.x  != x0_):
-            i.e.valid = False
+            self.event.invalidate(i.e)
         i.e = None
 
         if (i.pprev == None) or (i.pnext == None): return
@@ -323,6 +472,12 @@ class Voronoi:
            
         return True, x_, o_
         
+    # Is p on the breakpoint between arc i and the next one?
+    def on_breakpoint(self, p, i):
+        if i.p.x == p.x or i.pnext.p.x == p.x: return False
+        y = self.intersection_y(i.p, i.pnext.p, 1.0*p.x)
+        return abs(y - p.y) <= 1e-9 * (1.0 + abs(p.y))
+
     # Will a new parabola at point p intersect with arc i ?
     def intersect(self, p, i):
         #if (i == None): return False, None
@@ -346,14 +501,23 @@ class Voronoi:
     # Where do two parabolas intersect?
     def intersection(self, p0, p1, l_):
         
-        p = p0
+        p = p1 if (p0.x != p1.x and p1.x != l_ and p0.x == l_) else p0
+        py = self.intersection_y(p0, p1, l_)
+            
+        # Plug back into one of the parabola equations.
+        px = 1.0 * (p.x**2 + (p.y-py)**2 - l_**2) / (2*p.x-2*l_)
+        res = Point(px, py)
+        return res
+
+    # Height of the breakpoint of two parabolas, also when both are
+    # degenerate (sites on the sweep line) and the breakpoint has no x.
+    def intersection_y(self, p0, p1, l_):
         if (p0.x == p1.x):
             py = (p0.y + p1.y) / 2.0
         elif (p1.x == l_):
             py = p1.y
         elif (p0.x == l_):
             py = p0.y
-            p = p1
         else:
             # use quadratic formula
             z0 = 2.0 * (p0.x - l_)
@@ -364,11 +528,7 @@ class Voronoi:
             c = (1.0 * (p0.y**2 + p0.x**2 - l_**2) / z0) - (1.0 * (p1.y**2 + p1.x**2 - l_**2) / z1)
 
             py = 1.0 * ((-b - math.sqrt(b*b - 4.0*a*c)) / (2.0*a))
-            
-        # Plug back into one of the parabola equations.
-        px = 1.0 * (p.x**2 + (p.y-py)**2 - l_**2) / (2*p.x-2*l_)
-        res = Point(px, py)
-        return res
+        return py
 
     def finish_edges(self):
         # Advance the sweep line so no parabolas can cross the bounding box
@@ -399,6 +559,27 @@ class Voronoi:
                 res.append((p0.x, p0.y, p1.x, p1.y, o.color))
         return res
 
+    def get_clipped_output(self, box=None, close=True):
+        # get_output clipped to box (x0, y0, x1, y1), by default the bounding
+        # box, with the box sides between the edges when close is set
+        if box is None:
+            box = (self.X0, self.Y0, self.X1, self.Y1)
+        return voronoi_clip.clip_lines(self.get_output(), box, close)
+
+    def get_dcel(self, box=None):
+        # half-edge structure of the cells as NumPy arrays (voronoi_dcel.py),
+        # clipped to box (x0, y0, x1, y1), by default the bounding box
+        import voronoi_dcel
+        if box is None:
+            box = (self.X0, self.Y0, self.X1, self.Y1)
+        pairs = set()
+        for o in self.output:
+            if o.sites != None:
+                a = self.site_index[id(o.sites[0])]
+                b = self.site_index[id(o.sites[1])]
+                pairs.add((min(a, b), max(a, b)))
+        return voronoi_dcel.VoronoiDCEL([p.get() for p in self.sites], pairs, box)
+
 class funcBottons:
     def __init__(self, owner, surface, position=(0,0), width=100, height=40, **kwargs):
         self.surface = surface
@@ -452,6 +633,17 @@ class fortune_sweep:
         self.init_random_count = kwargs.get('init_random_count', 100)
         self.output_points_log = kwargs.get('output_points_log', False)
         self.draw_single_color = kwargs.get('draw_single_color', False)
+        self.exporter = kwargs.get('exporter', None) # frame_export.frame_writer, gets every diagram drawn
+        # keep the diagram up to date as points come and go (voronoi_incremental.py)
+        # instead of running Fortune's sweep over all points for every frame
+        self.incremental = kwargs.get('incremental', True)
+        self.diagram = None
+        self.site_ids = {} # point -> site of self.diagram
+        self.lines = {} # site pair -> (x0, y0, x1, y1, color)
+        self.changed = None # (removed site pairs, updated site pairs) of the last calculate_voronoi
+        # clip the edges to the drawing area in one pass (voronoi_clip.py), the
+        # sides of the area close the border cells
+        self.clip = kwargs.get('clip', True)
         self.win_area = pygame.Rect(0, 0, voi_width, voi_height)
         self.draw_area = pygame.Rect(self.x_offset, self.y_offset, voi_width+self.x_offset, voi_height+self.y_offset)
         self.image = pygame.Surface((voi_width, voi_height))
@@ -464,6 +656,7 @@ class fortune_sweep:
         #self.child.addButton("verify", self.debug_points)
         #self.child.addButton("show", self.debug_draw)
         self.points = []
+        self.new_diagram()
         self.add_random_points(self.init_random_count)
         if self.output_points_log:
             for x in self.points:
@@ -488,22 +681,55 @@ class fortune_sweep:
         for i in range(count_min):
             if (x[i], y[i]) not in self.points:
                 self.points.append((x[i], y[i]))
+                if self.diagram:
+                    self.site_ids[(x[i], y[i])] = self.diagram.insert_site(x[i], y[i])
             else:
-                print(f'duplicated!!')
+                print(f'duplicated!!', file=sys.stderr) # stdout may carry raw frames (--export -)
+
+    def remove_point(self, point):
+        self.points.remove(point)
+        if self.diagram:
+            self.diagram.remove_site(self.site_ids.pop(point))
+
+    def new_diagram(self):
+        # incremental diagram of the current points
+        if not self.incremental:
+            return
+        self.diagram = voronoi_incremental.DelaunayVoronoi(0, 0, self.voi_width, self.voi_height)
+        self.site_ids = {}
+        self.lines = {}
+        for point in self.points:
+            self.site_ids[point] = self.diagram.insert_site(point[0], point[1])
 
     def calculate_voronoi(self):
         if self.isPause:
             return # just skip
+        if self.diagram:
+            # only the edges changed since the last frame
+            removed, updated = self.diagram.take_changes()
+            for key in removed:
+                del self.lines[key]
+            for key, (x0, y0, x1, y1) in updated.items():
+                self.lines[key] = (x0, y0, x1, y1, BLACK)
+            self.changed = (removed, set(updated))
+            self.drawEdge(self.clip_lines(list(self.lines.values())))
+            return
         # create voronoi instance
         voronoi_ = Voronoi(self.points)
         # generate voronoi diagram according to input points
         voronoi_.process()
         # get the lines of voronoi diagram
         lines = voronoi_.get_output()
-        self.drawEdge(lines)
+        self.drawEdge(self.clip_lines(lines))
+
+    def clip_lines(self, lines):
+        if not self.clip:
+            return lines
+        return voronoi_clip.clip_lines(lines, (0, 0, self.voi_width, self.voi_height))
 
     def reset(self):
         self.points = []
+        self.new_diagram()
         self.isPause = False
 
     def pause(self):
@@ -521,6 +747,7 @@ class fortune_sweep:
                 #print(f'{point[0]} {point[1]}')
                 if len(point) == 2:
                     self.points.append((int(point[0]), int(point[1])))
+        self.new_diagram()
         if len(self.points) > 1:
             self.isPause = False
             print(f'>>>>>>>>>>>>>>>>> DEBUG STRT >>>>>>>>>>>>>>')
@@ -544,6 +771,15 @@ class fortune_sweep:
         if len(debug_line) > 1:
             self.drawEdge(debug_line)
 
+    def get_dcel(self):
+        # cells of the current points clipped to the drawing area, see voronoi_dcel.py
+        box = (0, 0, self.voi_width, self.voi_height)
+        if self.diagram:
+            return self.diagram.get_dcel(box)
+        voronoi_ = Voronoi(self.points)
+        voronoi_.process()
+        return voronoi_.get_dcel(box)
+
     def get_points_count(self):
         return len(self.points)
     
@@ -568,6 +804,8 @@ class fortune_sweep:
             pygame.draw.circle(self.image, RED, (a[0], a[1]), 2)
         # draw off screen surface frame
         pygame.draw.rect(self.image, dark_gray, self.win_area, 1)
+        if self.exporter:
+            self.exporter.write(self.image)
         # copy to diaply surface
         self.surface.blit(self.image, self.draw_area)
 
@@ -617,5 +855,38 @@ def main():
         pygame.display.update()
         fpsClock.tick(FPS)
 
+# headless export of the diagram as points are added, e.g.
+#  python voronoi_fortune_algorithm.py --export frames --points 500
+def export(argv):
+    parser = argparse.ArgumentParser(prog='voronoi_fortune_algorithm.py',
+                                     description='draw the diagram without a window, one frame per step')
+    parser.add_argument('--export', required=True,
+                        help="a directory of PNGs, or a file / '-' (stdout) for raw RGB")
+    parser.add_argument('--export-format', default='png', choices=['png', 'raw'])
+    parser.add_argument('--points', type=int, default=100, help='points in the last frame (default 100)')
+    parser.add_argument('--steps', type=int, default=2, help='points added per frame (default 2)')
+    parser.add_argument('--size', type=int, default=500, help='diagram size in pixels (default 500)')
+    parser.add_argument('--seed', type=int, default=None, help='random seed')
+    args = parser.parse_args(argv)
+
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    pygame.init()
+    surface = pygame.display.set_mode((args.size, args.size + 60))
+    random.seed(args.seed)
+    import frame_export
+    writer = frame_export.frame_writer(args.export, args.export_format)
+    fortune = fortune_sweep(surface, args.size, args.size + 60, args.size, args.size,
+                            init_random_count=min(args.steps, args.points), draw_single_color=True,
+                            exporter=writer)
+    fortune.calculate_voronoi()
+    while fortune.get_points_count() < args.points:
+        fortune.add_random_points(args.steps)
+        fortune.calculate_voronoi()
+    writer.close()
+    pygame.quit()
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    if '--export' in sys.argv[1:]:
+        export(sys.argv[1:])
+    else:
+        main()
\ No newline at end of file
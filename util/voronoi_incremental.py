@@ -0,0 +1,441 @@
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+
+# Incremental Voronoi diagram, as the dual of a Delaunay triangulation.
+#   insert_site: Bowyer-Watson. The triangles whose circumcircle contains the
+#                new site (found by walking from the last triangle and then
+#                flooding over neighbours) are replaced by a fan around it.
+#   remove_site: the triangles around the site are removed and the hole (its
+#                link polygon) is filled again by cutting off ears whose
+#                circumcircle holds no other polygon vertex.
+# Only the triangles touched are rebuilt, and the Voronoi edges dual to their
+# Delaunay edges are reported as changed. Everything sits inside a
+# super-triangle whose vertices are points at infinity: a super vertex is
+# (x, y, dx, dy), the point (x + R*dx, y + R*dy) for R larger than any size,
+# and the predicates take the sign of their leading term in R. The edges
+# between hull sites are rays, drawn RAY_LENGTH bounding box sizes long.
+#
+# reference
+# https://en.wikipedia.org/wiki/Bowyer%E2%80%93Watson_algorithm
+# O. Devillers, On deletion in Delaunay triangulations (1999).
+
+from fractions import Fraction
+
+RAY_LENGTH = 100.0 # edges going to infinity end this far out, in bounding box sizes
+GRID = 64 # walks start at a site in the same cell of a GRID x GRID grid on the box
+FILTER = 1e-12 # float results smaller than this times their terms are redone exactly
+
+def lift(p):
+    # coordinates of a point as polynomials in R, lowest power first
+    if len(p) == 2:
+        return [Fraction(p[0])], [Fraction(p[1])]
+    return [Fraction(p[0]), Fraction(p[2])], [Fraction(p[1]), Fraction(p[3])]
+
+def padd(u, v):
+    if len(u) < len(v):
+        u, v = v, u
+    return [c + (v[i] if i < len(v) else 0) for i, c in enumerate(u)]
+
+def psub(u, v):
+    return padd(u, [-c for c in v])
+
+def pmul(u, v):
+    w = [Fraction(0)] * (len(u) + len(v) - 1)
+    for i, a in enumerate(u):
+        for j, b in enumerate(v):
+            w[i + j] += a * b
+    return w
+
+def leading(u):
+    # sign for R large enough, from the highest non zero coefficient
+    for c in reversed(u):
+        if c:
+            return 1.0 if c > 0 else -1.0
+    return 0.0
+
+def polynomial_orient(a, b, c):
+    (ax, ay), (bx, by), (cx, cy) = lift(a), lift(b), lift(c)
+    return leading(psub(pmul(psub(bx, ax), psub(cy, ay)), pmul(psub(by, ay), psub(cx, ax))))
+
+def polynomial_incircle(a, b, c, d):
+    (ax, ay), (bx, by), (cx, cy), (dx, dy) = lift(a), lift(b), lift(c), lift(d)
+    adx, ady = psub(ax, dx), psub(ay, dy)
+    bdx, bdy = psub(bx, dx), psub(by, dy)
+    cdx, cdy = psub(cx, dx), psub(cy, dy)
+    al = padd(pmul(adx, adx), pmul(ady, ady))
+    bl = padd(pmul(bdx, bdx), pmul(bdy, bdy))
+    cl = padd(pmul(cdx, cdx), pmul(cdy, cdy))
+    det = padd(padd(pmul(al, psub(pmul(bdx, cdy), pmul(cdx, bdy))),
+                    pmul(bl, psub(pmul(cdx, ady), pmul(adx, cdy)))),
+               pmul(cl, psub(pmul(adx, bdy), pmul(bdx, ady))))
+    return leading(det)
+
+def cross(p, q, dx, dy):
+    # (q - p) x (dx, dy) for sites p, q (exact sign)
+    l = (q[0] - p[0])*dy
+    r = (q[1] - p[1])*dx
+    det = l - r
+    if abs(det) > FILTER * (abs(l) + abs(r)):
+        return det
+    return float((Fraction(q[0]) - Fraction(p[0]))*Fraction(dy) - (Fraction(q[1]) - Fraction(p[1]))*Fraction(dx))
+
+def rotated(a, b, c):
+    # the cyclic rotation of a, b, c with the super vertices last
+    for p in ((a, b, c), (b, c, a), (c, a, b)):
+        if [len(q) > 2 for q in p] in ([False, False, True], [False, True, True], [True, True, True]):
+            return p
+
+def orient_at_infinity(a, b, c):
+    # the leading terms in closed form, sites a, b first
+    a, b, c = rotated(a, b, c)
+    if len(b) == 2: # R * (b - a) x dc + orient(a, b, (cx, cy))
+        det = cross(a, b, c[2], c[3])
+        return det if det else orient(a, b, c[:2])
+    if len(a) == 2: # R^2 * db x dc
+        return b[2]*c[3] - b[3]*c[2]
+    return (b[2] - a[2])*(c[3] - a[3]) - (b[3] - a[3])*(c[2] - a[2])
+
+def incircle_at_infinity(a, b, c, d):
+    # the leading term in closed form for a site d and one or two super
+    # vertices among a, b, c; term by term in R when it vanishes
+    if len(d) == 2:
+        a, b, c = rotated(a, b, c)
+        if len(b) == 2: # R^2 * |dc|^2 * orient(a, b, d)
+            det = orient(a, b, d)
+            if det:
+                return det
+        elif len(a) == 2: # R^3 * (a - d) x (|dc|^2 db - |db|^2 dc)
+            bl = b[2]**2 + b[3]**2
+            cl = c[2]**2 + c[3]**2
+            det = cross(d, a, cl*b[2] - bl*c[2], cl*b[3] - bl*c[3])
+            if det:
+                return det
+    return polynomial_incircle(a, b, c, d)
+
+def orient(a, b, c):
+    # > 0 when a, b, c turn counter clockwise, 0 when colinear (exact sign)
+    if len(a) > 2 or len(b) > 2 or len(c) > 2:
+        return orient_at_infinity(a, b, c)
+    l = (b[0] - a[0])*(c[1] - a[1])
+    r = (b[1] - a[1])*(c[0] - a[0])
+    det = l - r
+    if abs(det) > FILTER * (abs(l) + abs(r)):
+        return det
+    a, b, c = [(Fraction(p[0]), Fraction(p[1])) for p in (a, b, c)]
+    return float((b[0] - a[0])*(c[1] - a[1]) - (b[1] - a[1])*(c[0] - a[0]))
+
+def incircle(a, b, c, d):
+    # > 0 when d is inside the circle through a, b, c (counter clockwise),
+    # 0 on it (exact sign)
+    if len(a) > 2 or len(b) > 2 or len(c) > 2 or len(d) > 2:
+        return incircle_at_infinity(a, b, c, d)
+    adx, ady = a[0] - d[0], a[1] - d[1]
+    bdx, bdy = b[0] - d[0], b[1] - d[1]
+    cdx, cdy = c[0] - d[0], c[1] - d[1]
+    al = adx*adx + ady*ady
+    bl = bdx*bdx + bdy*bdy
+    cl = cdx*cdx + cdy*cdy
+    det = al*(bdx*cdy - cdx*bdy) + bl*(cdx*ady - adx*cdy) + cl*(adx*bdy - bdx*ady)
+    terms = (al*(abs(bdx*cdy) + abs(cdx*bdy)) + bl*(abs(cdx*ady) + abs(adx*cdy))
+             + cl*(abs(adx*bdy) + abs(bdx*ady)))
+    if abs(det) > FILTER * terms:
+        return det
+    a, b, c, d = [(Fraction(p[0]), Fraction(p[1])) for p in (a, b, c, d)]
+    adx, ady = a[0] - d[0], a[1] - d[1]
+    bdx, bdy = b[0] - d[0], b[1] - d[1]
+    cdx, cdy = c[0] - d[0], c[1] - d[1]
+    return float((adx*adx + ady*ady)*(bdx*cdy - cdx*bdy) + (bdx*bdx + bdy*bdy)*(cdx*ady - adx*cdy)
+                 + (cdx*cdx + cdy*cdy)*(adx*bdy - bdx*ady))
+
+def circumcircle(a, b, c):
+    # (cx, cy, r^2), None for colinear points
+    ax, ay = a
+    bx, by = b
+    cx, cy = c
+    d = 2.0 * (ax*(by - cy) + bx*(cy - ay) + cx*(ay - by))
+    if d == 0: return None
+    a2 = ax*ax + ay*ay
+    b2 = bx*bx + by*by
+    c2 = cx*cx + cy*cy
+    ox = (a2*(by - cy) + b2*(cy - ay) + c2*(ay - by)) / d
+    oy = (a2*(cx - bx) + b2*(ax - cx) + c2*(bx - ax)) / d
+    return (ox, oy, (ax - ox)**2 + (ay - oy)**2)
+
+class DelaunayVoronoi:
+    def __init__(self, x0, y0, x1, y1, ray_length=RAY_LENGTH):
+        # sites are expected inside the box (x0, y0) - (x1, y1)
+        mx = (x0 + x1) / 2.0
+        my = (y0 + y1) / 2.0
+        # vertices 0, 1, 2 are the super-triangle at infinity, sites start at 3
+        self.points = [(mx, my, -2.0, -1.0), (mx, my, 2.0, -1.0), (mx, my, 0.0, 2.0)]
+        self.centre = (mx, my)
+        self.ray_length = max(x1 - x0, y1 - y0, 1.0) * ray_length
+        self.triangles = {} # id -> (a, b, c), counter clockwise
+        self.circles = {}   # id -> circumcircle, None with a super vertex
+        self.edge_tri = {}  # directed edge (a, b) -> id of the triangle it belongs to
+        self.vertex_tri = {} # vertex -> a triangle around it
+        self.site_ids = {}  # (x, y) -> site
+        self.counter = 0
+        self.last = None    # start of the next walk
+        self.x0 = x0
+        self.y0 = y0
+        self.x1 = x1
+        self.y1 = y1
+        self.cell_size = max(x1 - x0, y1 - y0, 1.0) / GRID
+        self.buckets = {}   # grid cell -> a site in it
+        self.edges = {}     # Voronoi edges, site pair (u, v), u < v -> (x0, y0, x1, y1)
+        self.removed = set() # site pairs whose edge is gone since take_changes
+        self.updated = set() # site pairs whose edge is new or moved since take_changes
+        self.fresh = set()   # site pairs with no edge at the last take_changes
+        self.add_triangle(0, 1, 2)
+
+    # -- triangles --
+
+    def add_triangle(self, a, b, c):
+        t = self.counter
+        self.counter += 1
+        self.triangles[t] = (a, b, c)
+        self.circles[t] = circumcircle(self.points[a], self.points[b], self.points[c]) if min(a, b, c) >= 3 else None
+        self.edge_tri[(a, b)] = t
+        self.edge_tri[(b, c)] = t
+        self.edge_tri[(c, a)] = t
+        self.vertex_tri[a] = self.vertex_tri[b] = self.vertex_tri[c] = t
+        self.last = t
+        return t
+
+    def remove_triangle(self, t):
+        a, b, c = self.triangles.pop(t)
+        del self.circles[t]
+        for e in ((a, b), (b, c), (c, a)):
+            if self.edge_tri.get(e) == t:
+                del self.edge_tri[e]
+
+    def in_circle(self, t, p):
+        # p strictly inside the circumcircle of t, points on it are outside
+        a, b, c = self.triangles[t]
+        return incircle(self.points[a], self.points[b], self.points[c], p) > 0
+
+    def neighbour(self, t, a, b):
+        # triangle across edge a -> b of t
+        return self.edge_tri.get((b, a))
+
+    def bucket(self, p):
+        return (int((p[0] - self.x0) // self.cell_size), int((p[1] - self.y0) // self.cell_size))
+
+    def locate(self, p):
+        # triangle containing p: walk towards p from a site nearby (or the
+        # last triangle made), scan everything if the walk gets lost
+        near = self.buckets.get(self.bucket(p))
+        if near is not None:
+            t = self.vertex_tri[near]
+        else:
+            t = self.last if self.last in self.triangles else next(iter(self.triangles))
+        for step in range(len(self.triangles) + 3):
+            a, b, c = self.triangles[t]
+            for u, v in ((a, b), (b, c), (c, a)):
+                if orient(self.points[u], self.points[v], p) < 0:
+                    t = self.neighbour(t, u, v)
+                    break
+            else:
+                return t
+            if t is None:
+                raise ValueError('site outside the super-triangle')
+        for t, (a, b, c) in self.triangles.items():
+            pa, pb, pc = self.points[a], self.points[b], self.points[c]
+            if orient(pa, pb, p) >= 0 and orient(pb, pc, p) >= 0 and orient(pc, pa, p) >= 0:
+                return t
+        raise ValueError('site outside the super-triangle')
+
+    # -- sites --
+
+    def insert_site(self, x, y):
+        # returns the new site's id
+        p = (float(x), float(y))
+        if p in self.site_ids:
+            raise ValueError('duplicate site %s' % (p,))
+        start = self.locate(p)
+        # cavity: triangles whose circumcircle contains p, connected to start
+        cavity = {start}
+        todo = [start]
+        while todo:
+            t = todo.pop()
+            a, b, c = self.triangles[t]
+            for u, v in ((a, b), (b, c), (c, a)):
+                n = self.neighbour(t, u, v)
+                if n is not None and n not in cavity and self.in_circle(n, p):
+                    cavity.add(n)
+                    todo.append(n)
+        # boundary edges, p must see each of them counter clockwise; p on an
+        # edge (colinear) takes the triangle across too, splitting the edge
+        while True:
+            boundary = []
+            across = set()
+            for t in cavity:
+                a, b, c = self.triangles[t]
+                for u, v in ((a, b), (b, c), (c, a)):
+                    n = self.neighbour(t, u, v)
+                    if n in cavity:
+                        continue
+                    if n is not None and orient(self.points[u], self.points[v], p) <= 0:
+                        across.add(n)
+                    boundary.append((u, v))
+            if not across:
+                break
+            cavity |= across
+        s = len(self.points)
+        self.points.append(p)
+        self.site_ids[p] = s
+        self.buckets[self.bucket(p)] = s
+        self.replace(cavity, [(u, v, s) for u, v in boundary])
+        return s
+
+    def remove_site(self, s):
+        if s < 3 or s >= len(self.points) or self.points[s] is None:
+            raise KeyError(s)
+        # star of s, and its link polygon counter clockwise
+        star = []
+        following = {}
+        t = self.vertex_tri[s]
+        while True:
+            star.append(t)
+            a, b, c = self.triangles[t]
+            while a != s: # rotate s first
+                a, b, c = b, c, a
+            following[b] = c
+            t = self.edge_tri[(s, c)]
+            if t == star[0]:
+                break
+        polygon = [b]
+        while following[polygon[-1]] != polygon[0]:
+            polygon.append(following[polygon[-1]])
+        self.replace(set(star), self.fill(polygon))
+        p = self.points[s]
+        del self.site_ids[p]
+        if self.buckets.get(self.bucket(p)) == s:
+            del self.buckets[self.bucket(p)]
+        self.points[s] = None
+        del self.vertex_tri[s]
+
+    def fill(self, polygon):
+        # Delaunay triangles of a star-shaped hole, by cutting off ears
+        triangles = []
+        polygon = list(polygon)
+        while len(polygon) > 3:
+            best = None
+            n = len(polygon)
+            for i in range(n):
+                u, v, w = polygon[i - 1], polygon[i], polygon[(i + 1) % n]
+                pu, pv, pw = self.points[u], self.points[v], self.points[w]
+                if orient(pu, pv, pw) <= 0:
+                    continue # reflex or flat corner, not an ear
+                others = [self.points[q] for q in polygon if q not in (u, v, w)]
+                if any(orient(pu, pv, q) >= 0 and orient(pv, pw, q) >= 0 and orient(pw, pu, q) >= 0 for q in others):
+                    continue # another vertex inside, not an ear
+                if not any(incircle(pu, pv, pw, q) > 0 for q in others):
+                    best = i
+                    break
+                if best is None:
+                    best = i # a valid ear, in case rounding rejects them all
+            u, v, w = polygon[best - 1], polygon[best], polygon[(best + 1) % n]
+            triangles.append((u, v, w))
+            del polygon[best]
+        triangles.append(tuple(polygon))
+        return triangles
+
+    def replace(self, old, new):
+        # swaps triangles, keeps the Voronoi edges of their Delaunay edges up to date
+        touched = set()
+        for t in old:
+            a, b, c = self.triangles[t]
+            touched.update(((a, b), (b, c), (c, a)))
+            self.remove_triangle(t)
+        for a, b, c in new:
+            self.add_triangle(a, b, c)
+            touched.update(((a, b), (b, c), (c, a)))
+        for u, v in touched:
+            if u < v:
+                self.update_edge(u, v)
+            else:
+                self.update_edge(v, u)
+
+    # -- Voronoi edges --
+
+    def update_edge(self, u, v):
+        if u < 3: return # an edge of the super-triangle, no site there
+        key = (u, v)
+        t1 = self.edge_tri.get((u, v)) # on the left of u -> v
+        t2 = self.edge_tri.get((v, u))
+        segment = None
+        if t1 is not None and t2 is not None:
+            segment = self.segment(u, v, t1, t2)
+        if segment is None:
+            if self.edges.pop(key, None) is not None:
+                self.updated.discard(key)
+                if key in self.fresh:
+                    self.fresh.discard(key) # came and went, nothing to report
+                else:
+                    self.removed.add(key)
+            return
+        old = self.edges.get(key)
+        if old != segment:
+            if old is None:
+                if key in self.removed:
+                    self.removed.discard(key) # went and came back
+                else:
+                    self.fresh.add(key)
+            self.edges[key] = segment
+            self.updated.add(key)
+
+    def segment(self, u, v, t1, t2):
+        # Voronoi edge of sites u, v between the circumcentres of t1 (left of
+        # u -> v) and t2; a triangle with a super vertex has its circumcentre at
+        # infinity on that side, the edge goes ray_length past the other end.
+        # None for a flat triangle
+        c1 = self.circles[t1]
+        c2 = self.circles[t2]
+        infinite1 = min(self.triangles[t1]) < 3
+        infinite2 = min(self.triangles[t2]) < 3
+        if (c1 is None and not infinite1) or (c2 is None and not infinite2):
+            return None
+        (ux, uy), (vx, vy) = self.points[u], self.points[v]
+        nx, ny = uy - vy, vx - ux # normal to u -> v, to the left
+        length = (nx*nx + ny*ny) ** 0.5
+        nx, ny = nx / length, ny / length
+        if infinite1 and infinite2:
+            base = ((ux + vx) / 2.0, (uy + vy) / 2.0)
+        else:
+            base = c2[:2] if infinite1 else c1[:2]
+        far = self.ray_length + ((base[0] - self.centre[0])**2 + (base[1] - self.centre[1])**2) ** 0.5
+        start = (base[0] + far*nx, base[1] + far*ny) if infinite1 else c1[:2]
+        end = (base[0] - far*nx, base[1] - far*ny) if infinite2 else c2[:2]
+        return (start[0], start[1], end[0], end[1])
+
+    def take_changes(self):
+        # (removed site pairs, {site pair: segment} new or moved) since the last call
+        removed = self.removed
+        updated = {key: self.edges[key] for key in self.updated}
+        self.removed = set()
+        self.updated = set()
+        self.fresh = set()
+        return removed, updated
+
+    def site(self, s):
+        return self.points[s]
+
+    def sites(self):
+        return [s for s in range(3, len(self.points)) if self.points[s] is not None]
+
+    def get_output(self):
+        # same shape as Voronoi.get_output: (x0, y0, x1, y1, color)
+        return [(x0, y0, x1, y1, (0, 0, 0)) for x0, y0, x1, y1 in self.edges.values()]
+
+    def get_dcel(self, box=None):
+        # half-edge structure of the cells as NumPy arrays (voronoi_dcel.py),
+        # cell i is the site sites()[i], clipped to box, by default the bounds
+        import voronoi_dcel
+        if box is None:
+            box = (self.x0, self.y0, self.x1, self.y1)
+        sites = self.sites()
+        index = {s: i for i, s in enumerate(sites)}
+        pairs = [(index[u], index[v]) for u, v in self.edges]
+        return voronoi_dcel.VoronoiDCEL([self.points[s] for s in sites], pairs, box)